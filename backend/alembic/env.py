@@ -21,19 +21,35 @@ def get_url() -> str:
     return get_settings().database_url
 
 
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    # transition_history's partitions are made at runtime by
+    # history_service.ensure_partitions, not by migrations: autogenerate must
+    # not drop them
+    table = obj if type_ == "table" else getattr(obj, "table", None)
+    return not (
+        reflected
+        and compare_to is None
+        and table is not None
+        and table.name.startswith("transition_history_")
+    )
+
+
 def run_migrations_offline() -> None:
     context.configure(
         url=get_url(),
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
     with context.begin_transaction():
         context.run_migrations()
 
 
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_object=include_object
+    )
     with context.begin_transaction():
         context.run_migrations()
 
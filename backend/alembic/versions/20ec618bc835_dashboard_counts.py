@@ -0,0 +1,38 @@
+"""dashboard counts
+
+Revision ID: 20ec618bc835
+Revises: d431912c3b9a
+Create Date: 2026-10-17 03:53:49.936579
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20ec618bc835'
+down_revision: Union[str, Sequence[str], None] = 'd431912c3b9a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # IF NOT EXISTS: the app's create_all may have made the table first. The
+    # counts are filled by aggregate_service.ensure_initialized at startup,
+    # while the table is empty.
+    op.create_table(
+        "dashboard_counts",
+        sa.Column("metric", sa.String(length=30), nullable=False),
+        sa.Column("key", sa.String(length=30), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("metric", "key"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("dashboard_counts")
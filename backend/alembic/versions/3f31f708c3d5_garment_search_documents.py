@@ -0,0 +1,59 @@
+"""garment search documents
+
+Revision ID: 3f31f708c3d5
+Revises: 45cf98165425
+Create Date: 2026-10-17 03:53:19.880371
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f31f708c3d5'
+down_revision: Union[str, Sequence[str], None] = '45cf98165425'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # IF NOT EXISTS: the app's create_all may have made the table first.
+    # Existing garments get their documents from search_service.backfill_missing
+    # at startup.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_table(
+        "garment_search_documents",
+        sa.Column("garment_id", sa.Integer(), nullable=False),
+        sa.Column("document", sa.Text(), nullable=False),
+        sa.Column("search_vector", postgresql.TSVECTOR(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["garment_id"], ["garments.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("garment_id"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_garment_search_documents_vector",
+        "garment_search_documents",
+        ["search_vector"],
+        postgresql_using="gin",
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_garment_search_documents_trgm",
+        "garment_search_documents",
+        ["document"],
+        postgresql_using="gin",
+        postgresql_ops={"document": "gin_trgm_ops"},
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_garment_search_documents_trgm", table_name="garment_search_documents")
+    op.drop_index("ix_garment_search_documents_vector", table_name="garment_search_documents")
+    op.drop_table("garment_search_documents")
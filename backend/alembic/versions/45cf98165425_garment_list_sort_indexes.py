@@ -0,0 +1,35 @@
+"""garment list sort indexes
+
+Revision ID: 45cf98165425
+Revises: fa22dbce3e75
+Create Date: 2026-10-17 03:53:00.409636
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '45cf98165425'
+down_revision: Union[str, Sequence[str], None] = 'fa22dbce3e75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (sort column, id) pairs backing keyset pagination of the garment list
+    op.create_index("ix_garments_updated_at_id", "garments", ["updated_at", "id"])
+    op.create_index("ix_garments_created_at_id", "garments", ["created_at", "id"])
+    op.create_index("ix_garments_name_id", "garments", ["name", "id"])
+    op.create_index("ix_garments_lifecycle_stage_id", "garments", ["lifecycle_stage", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_garments_lifecycle_stage_id", table_name="garments")
+    op.drop_index("ix_garments_name_id", table_name="garments")
+    op.drop_index("ix_garments_created_at_id", table_name="garments")
+    op.drop_index("ix_garments_updated_at_id", table_name="garments")
@@ -0,0 +1,38 @@
+"""supplier portfolio indexes
+
+Revision ID: 4d94fb7d0fe7
+Revises: 6a7d7c6d36e4
+Create Date: 2026-10-17 03:54:46.234990
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d94fb7d0fe7'
+down_revision: Union[str, Sequence[str], None] = '6a7d7c6d36e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A supplier's portfolio, keyset on id
+    op.create_index(
+        "ix_garment_suppliers_supplier_id_id", "garment_suppliers", ["supplier_id", "id"]
+    )
+    # Sample set counts per status without visiting the table
+    op.create_index(
+        "ix_sample_sets_garment_supplier_id_status",
+        "sample_sets",
+        ["garment_supplier_id", "status"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_sample_sets_garment_supplier_id_status", table_name="sample_sets")
+    op.drop_index("ix_garment_suppliers_supplier_id_id", table_name="garment_suppliers")
@@ -0,0 +1,32 @@
+"""garment children version
+
+Revision ID: 5ced9806d1e3
+Revises: 20ec618bc835
+Create Date: 2026-10-17 03:53:57.799280
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5ced9806d1e3'
+down_revision: Union[str, Sequence[str], None] = '20ec618bc835'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Part of the garment ETag; a constant default adds it without a rewrite
+    op.add_column(
+        "garments",
+        sa.Column("children_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("garments", "children_version")
@@ -0,0 +1,75 @@
+"""transition history
+
+Revision ID: 6a7d7c6d36e4
+Revises: d80c1f2f84d2
+Create Date: 2026-10-17 03:54:37.298139
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a7d7c6d36e4'
+down_revision: Union[str, Sequence[str], None] = 'd80c1f2f84d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL meaning since created_at, so existing rows need no backfill
+    op.add_column("garments", sa.Column("stage_entered_at", sa.DateTime(), nullable=True))
+    op.add_column(
+        "garment_suppliers", sa.Column("status_entered_at", sa.DateTime(), nullable=True)
+    )
+
+    # IF NOT EXISTS: the app's create_all may have made the tables first. The
+    # monthly partitions are created by history_service.ensure_partitions.
+    op.create_table(
+        "transition_history",
+        sa.Column("id", sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column("transitioned_at", sa.DateTime(), nullable=False),
+        sa.Column("entity", sa.String(length=20), nullable=False),
+        sa.Column("garment_id", sa.Integer(), nullable=False),
+        sa.Column("supplier_id", sa.Integer(), nullable=True),
+        sa.Column("from_state", sa.String(length=20), nullable=False),
+        sa.Column("to_state", sa.String(length=20), nullable=False),
+        sa.Column("entered_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", "transitioned_at"),
+        postgresql_partition_by="RANGE (transitioned_at)",
+        if_not_exists=True,
+    )
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS transition_history_default "
+        "PARTITION OF transition_history DEFAULT"
+    )
+    op.create_index(
+        "ix_transition_history_garment",
+        "transition_history",
+        ["garment_id", "transitioned_at"],
+        if_not_exists=True,
+    )
+    op.create_table(
+        "transition_rollups",
+        sa.Column("entity", sa.String(length=20), nullable=False),
+        sa.Column("week", sa.Date(), nullable=False),
+        sa.Column("from_state", sa.String(length=20), nullable=False),
+        sa.Column("to_state", sa.String(length=20), nullable=False),
+        sa.Column("bucket", sa.SmallInteger(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("total_seconds", sa.Double(), nullable=False),
+        sa.PrimaryKeyConstraint("entity", "week", "from_state", "to_state", "bucket"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("transition_rollups")
+    # Takes its partitions with it
+    op.drop_table("transition_history")
+    op.drop_column("garment_suppliers", "status_entered_at")
+    op.drop_column("garments", "stage_entered_at")
@@ -0,0 +1,58 @@
+"""garment lineage
+
+Revision ID: 9bab9cfc5051
+Revises: 5ced9806d1e3
+Create Date: 2026-10-17 03:54:08.931011
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9bab9cfc5051'
+down_revision: Union[str, Sequence[str], None] = '5ced9806d1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "garments",
+        sa.Column(
+            "lineage", postgresql.ARRAY(sa.Integer()), server_default="{}", nullable=False
+        ),
+    )
+    op.add_column(
+        "garments",
+        sa.Column("lineage_depth", sa.Integer(), server_default="0", nullable=False),
+    )
+    # Existing variations: each path is its parent's plus the parent, walked
+    # down from the roots. Roots keep the empty defaults.
+    op.execute(
+        """
+        WITH RECURSIVE paths (id, lineage) AS (
+            SELECT id, ARRAY[]::integer[] FROM garments WHERE parent_garment_id IS NULL
+            UNION ALL
+            SELECT g.id, p.lineage || g.parent_garment_id
+            FROM garments g JOIN paths p ON g.parent_garment_id = p.id
+        )
+        UPDATE garments
+        SET lineage = paths.lineage, lineage_depth = cardinality(paths.lineage)
+        FROM paths
+        WHERE garments.id = paths.id AND cardinality(paths.lineage) > 0
+        """
+    )
+    # Built after the backfill rather than maintained through it
+    op.create_index("ix_garments_lineage", "garments", ["lineage"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_garments_lineage", table_name="garments")
+    op.drop_column("garments", "lineage_depth")
+    op.drop_column("garments", "lineage")
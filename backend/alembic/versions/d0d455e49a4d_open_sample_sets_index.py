@@ -0,0 +1,35 @@
+"""open sample sets index
+
+Revision ID: d0d455e49a4d
+Revises: 4d94fb7d0fe7
+Create Date: 2026-10-17 03:54:54.575990
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0d455e49a4d'
+down_revision: Union[str, Sequence[str], None] = '4d94fb7d0fe7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The QA inbox: open sample sets only. The predicate must match the
+    # model's, which the inbox query repeats.
+    op.create_index(
+        "ix_sample_sets_open_created_at_id",
+        "sample_sets",
+        ["created_at", "id"],
+        postgresql_where=sa.text("status IN ('PENDING', 'RECEIVED')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_sample_sets_open_created_at_id", table_name="sample_sets")
@@ -0,0 +1,29 @@
+"""garment parent index
+
+Revision ID: d431912c3b9a
+Revises: 3f31f708c3d5
+Create Date: 2026-10-17 03:53:38.629480
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd431912c3b9a'
+down_revision: Union[str, Sequence[str], None] = '3f31f708c3d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Variations of each garment in an export batch
+    op.create_index("ix_garments_parent_garment_id", "garments", ["parent_garment_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_garments_parent_garment_id", table_name="garments")
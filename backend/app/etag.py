@@ -0,0 +1,42 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def compute_etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, **(headers or {})},
+    )
+
+
+def cached_json_response(
+    request: Request, etag: str, body: bytes, max_age: int = 0
+) -> Response:
+    # max_age 0 lets clients store the body but revalidate it every time
+    headers = {
+        "Cache-Control": f"public, max-age={max_age}" if max_age > 0 else "no-cache",
+    }
+    if etag_matches(request, etag):
+        return not_modified(etag, headers)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, **headers},
+    )
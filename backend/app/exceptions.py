@@ -33,6 +33,15 @@ class IncompatibleAttributeError(AppException):
         )
 
 
+class AttributeConflictsError(AppException):
+    def __init__(self, conflicts: list[str]):
+        super().__init__(
+            status_code=409,
+            error_code="INCOMPATIBLE_ATTRIBUTE",
+            detail=f"Incompatible attributes: {'; '.join(conflicts)}",
+        )
+
+
 class DeletionProtectedError(AppException):
     def __init__(self, garment_name: str):
         super().__init__(
@@ -0,0 +1,360 @@
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable
+
+from sqlalchemy import func, select
+
+from app.database import Base, engine, async_session
+from app.models import Garment
+from app.services import aggregate_service, search_service
+
+# Synthetic catalog generator for load testing.
+#
+# Builds reference data (materials, attributes, incompatibility rules,
+# suppliers) and `scale * 1000` garments with compositions, compatible
+# attribute sets, variation trees, supplier offers and sample set histories.
+# Rows are generated in Python from a seeded RNG, so the same seed and scale
+# always produce the same catalog, and COPY'd in batches with explicit ids.
+#
+#     python -m app.generate --scale 1000 --seed 42 --reset
+
+_BATCH_SIZE = 50_000
+_BASE_TIME = datetime(2024, 1, 1)
+_MAX_VARIATION_DEPTH = 8
+
+_MATERIALS = [
+    "denim", "cotton", "lycra", "polyester", "silk", "wool", "linen", "nylon",
+    "viscose", "cashmere", "modal", "hemp", "bamboo", "alpaca", "mohair",
+    "tencel", "acrylic", "elastane", "leather", "suede", "corduroy", "fleece",
+    "jersey", "satin",
+]
+
+_ATTRIBUTES = {
+    "SLEEVE_TYPE": [
+        "long sleeve", "short sleeve", "sleeveless", "cap sleeve", "puff sleeve",
+        "three-quarter sleeve",
+    ],
+    "NECKLINE": ["crew neck", "v-neck", "mock neck", "turtleneck", "scoop neck", "boat neck"],
+    "GARMENT_CATEGORY": [
+        "nightwear", "activewear", "casual", "formal", "outerwear", "swimwear", "workwear",
+    ],
+    "FIT": ["slim", "regular", "oversized", "relaxed", "tailored", "cropped"],
+    "FEATURE": [
+        "with logo", "with pocket", "with zipper", "with hood", "with drawstring",
+        "with buttons", "reversible", "water repellent",
+    ],
+}
+
+# A garment has one sleeve type, so those are all mutually exclusive
+_RULES = [
+    (a, b)
+    for i, a in enumerate(_ATTRIBUTES["SLEEVE_TYPE"])
+    for b in _ATTRIBUTES["SLEEVE_TYPE"][i + 1:]
+] + [
+    ("nightwear", "activewear"),
+    ("formal", "activewear"),
+    ("swimwear", "workwear"),
+    ("swimwear", "with pocket"),
+    ("nightwear", "water repellent"),
+    ("formal", "with hood"),
+    ("tailored", "oversized"),
+    ("turtleneck", "sleeveless"),
+]
+
+_STAGE_WEIGHTS = {
+    "CONCEPT": 25, "DESIGN": 25, "DEVELOPMENT": 20, "SAMPLING": 15, "PRODUCTION": 15,
+}
+# Supplier offers per garment and the statuses they can have, by garment stage
+_OFFERS = {
+    "CONCEPT": ((0, 0, 0, 1), ("OFFERED",)),
+    "DESIGN": ((0, 1, 1, 2), ("OFFERED", "OFFERED", "REJECTED")),
+    "DEVELOPMENT": ((1, 2, 3), ("OFFERED", "SAMPLING", "SAMPLING", "REJECTED")),
+    "SAMPLING": ((1, 2, 3, 4), ("SAMPLING", "APPROVED", "REJECTED")),
+    "PRODUCTION": ((1, 2, 3, 4), ("APPROVED", "REJECTED")),
+}
+
+_ADJECTIVES = [
+    "Classic", "Urban", "Coastal", "Heritage", "Essential", "Midnight", "Alpine",
+    "Studio", "Vintage", "Everyday", "Summit", "Harbor", "Meadow", "Metro",
+]
+_PIECES = [
+    "Jacket", "Tee", "Blouse", "Coat", "Hoodie", "Trousers", "Dress", "Skirt",
+    "Cardigan", "Shirt", "Parka", "Jumpsuit", "Shorts", "Sweater",
+]
+
+
+class _Catalog:
+    __slots__ = ("materials", "attributes_by_category", "conflicts", "suppliers")
+
+    def __init__(self, materials, attributes_by_category, conflicts, suppliers):
+        self.materials = materials
+        self.attributes_by_category = attributes_by_category
+        self.conflicts = conflicts
+        self.suppliers = suppliers
+
+
+def _reference_rows(rng: random.Random, garments: int) -> tuple[dict[str, list[tuple]], _Catalog]:
+    materials = [(i, name) for i, name in enumerate(_MATERIALS, 1)]
+
+    attributes = []
+    ids: dict[str, int] = {}
+    by_category: dict[str, list[int]] = {}
+    for category, names in _ATTRIBUTES.items():
+        for name in names:
+            attribute_id = len(attributes) + 1
+            attributes.append((attribute_id, name, category))
+            ids[name] = attribute_id
+            by_category.setdefault(category, []).append(attribute_id)
+
+    rules = []
+    conflicts: dict[int, set[int]] = {}
+    for a, b in _RULES:
+        low, high = sorted((ids[a], ids[b]))
+        rules.append((len(rules) + 1, low, high))
+        conflicts.setdefault(low, set()).add(high)
+        conflicts.setdefault(high, set()).add(low)
+
+    suppliers = [
+        (
+            i,
+            f"{rng.choice(_ADJECTIVES)} {rng.choice(('Textiles', 'Mills', 'Apparel', 'Knits', 'Garments'))} {i}",
+            f"supplier{i}@example.com",
+            _BASE_TIME - timedelta(days=rng.randint(30, 3650)),
+        )
+        for i in range(1, max(10, garments // 200) + 1)
+    ]
+
+    rows = {
+        "materials": materials,
+        "attributes": attributes,
+        "attribute_incompatibilities": rules,
+        "suppliers": suppliers,
+    }
+    return rows, _Catalog(
+        [m[0] for m in materials], by_category, conflicts, [s[0] for s in suppliers]
+    )
+
+
+def _composition(rng: random.Random, material_ids: list[int]) -> list[tuple[int, int]]:
+    count = rng.choice((1, 2, 2, 3, 3, 4))
+    # Most garments are fully specified; the rest still have room to add
+    total = 100 if rng.random() < 0.85 else rng.randint(40, 95)
+    cuts = sorted(rng.sample(range(1, total), count - 1))
+    shares = [b - a for a, b in zip([0, *cuts], [*cuts, total])]
+    return list(zip(rng.sample(material_ids, count), shares))
+
+
+def _attribute_set(rng: random.Random, catalog: _Catalog) -> list[int]:
+    candidates = [
+        rng.choice(ids)
+        for category, ids in catalog.attributes_by_category.items()
+        if category != "FEATURE" and rng.random() < 0.8
+    ]
+    candidates += rng.sample(catalog.attributes_by_category["FEATURE"], rng.randint(0, 3))
+    rng.shuffle(candidates)
+    chosen: list[int] = []
+    for attribute_id in candidates:
+        if not catalog.conflicts.get(attribute_id, set()).intersection(chosen):
+            chosen.append(attribute_id)
+    return chosen
+
+
+def _pick_suppliers(rng: random.Random, supplier_ids: list[int], count: int) -> list[int]:
+    # Skewed towards the first suppliers, as real sourcing concentrates on a few
+    picked: dict[int, None] = {}
+    while len(picked) < count:
+        picked[supplier_ids[int(len(supplier_ids) * rng.random() ** 2)]] = None
+    return list(picked)
+
+
+def _sample_history(rng: random.Random, status: str) -> list[str]:
+    if status == "SAMPLING":
+        return ["REJECTED"] * rng.randint(0, 2) + [rng.choice(("PENDING", "RECEIVED"))]
+    if status in ("APPROVED", "IN_PRODUCTION", "IN_STORE"):
+        return ["REJECTED"] * rng.randint(0, 2) + ["APPROVED"]
+    if status == "REJECTED" and rng.random() < 0.5:
+        return ["REJECTED"] * rng.randint(1, 2)
+    return []
+
+
+class _Ids:
+    __slots__ = ("garment_material", "garment_attribute", "garment_supplier", "sample_set")
+
+    def __init__(self):
+        self.garment_material = self.garment_attribute = 0
+        self.garment_supplier = self.sample_set = 0
+
+
+def _garment_batch(
+    rng: random.Random, catalog: _Catalog, first_id: int, count: int, ids: _Ids
+) -> dict[str, list[tuple]]:
+    garments, materials, attributes, offers, samples = [], [], [], [], []
+    # Variation parents come from earlier garments in the same batch
+    roots: dict[int, tuple[str, list[int]]] = {}
+    recent: list[int] = []
+    stages = list(_STAGE_WEIGHTS)
+    weights = list(_STAGE_WEIGHTS.values())
+
+    for garment_id in range(first_id, first_id + count):
+        stage = rng.choices(stages, weights)[0]
+        created = _BASE_TIME + timedelta(seconds=garment_id * 30 + rng.randint(0, 29))
+        updated = created + timedelta(hours=rng.randint(0, 24 * 180))
+
+        parent_id = None
+        if recent and rng.random() < 0.35:
+            parent_id = rng.choice(recent[-200:])
+        if parent_id is not None:
+            base, parent_lineage = roots[parent_id]
+            lineage = [*parent_lineage, parent_id]
+            name = f"{base} v{len(lineage)}.{garment_id}"
+        else:
+            base = f"{rng.choice(_ADJECTIVES)} {rng.choice(_PIECES)} {garment_id}"
+            lineage = []
+            name = base
+        roots[garment_id] = (base, lineage)
+        if len(lineage) < _MAX_VARIATION_DEPTH:
+            recent.append(garment_id)
+        garments.append((
+            garment_id, name, f"Synthetic {stage.lower()} garment {garment_id}",
+            stage, parent_id, lineage, len(lineage), created, updated, 0,
+        ))
+
+        for material_id, share in _composition(rng, catalog.materials):
+            ids.garment_material += 1
+            materials.append((ids.garment_material, garment_id, material_id, Decimal(share)))
+        for attribute_id in _attribute_set(rng, catalog):
+            ids.garment_attribute += 1
+            attributes.append((ids.garment_attribute, garment_id, attribute_id))
+
+        counts, statuses = _OFFERS[stage]
+        picked = _pick_suppliers(rng, catalog.suppliers, rng.choice(counts))
+        for i, supplier_id in enumerate(picked):
+            status = rng.choice(statuses)
+            if stage == "PRODUCTION" and i == 0:
+                status = rng.choice(("IN_PRODUCTION", "IN_STORE"))
+            ids.garment_supplier += 1
+            offered = created + timedelta(days=rng.randint(0, 30))
+            offers.append((
+                ids.garment_supplier, garment_id, supplier_id, status,
+                Decimal(rng.randint(500, 25_000)) / 100, rng.randint(7, 120),
+                None, offered, offered + timedelta(days=rng.randint(0, 60)),
+            ))
+            submitted = offered
+            for sample_status in _sample_history(rng, status):
+                ids.sample_set += 1
+                submitted += timedelta(days=rng.randint(3, 21))
+                samples.append((
+                    ids.sample_set, ids.garment_supplier, sample_status, None,
+                    submitted if sample_status != "PENDING" else None,
+                    submitted, submitted + timedelta(days=rng.randint(0, 14)),
+                ))
+
+    return {
+        "garments": garments,
+        "garment_materials": materials,
+        "garment_attributes": attributes,
+        "garment_suppliers": offers,
+        "sample_sets": samples,
+    }
+
+
+_COLUMNS = {
+    "materials": ["id", "name"],
+    "attributes": ["id", "name", "category"],
+    "attribute_incompatibilities": ["id", "attribute_id_1", "attribute_id_2"],
+    "suppliers": ["id", "name", "contact_info", "created_at"],
+    "garments": [
+        "id", "name", "description", "lifecycle_stage", "parent_garment_id",
+        "lineage", "lineage_depth", "created_at", "updated_at", "children_version",
+    ],
+    "garment_materials": ["id", "garment_id", "material_id", "percentage"],
+    "garment_attributes": ["id", "garment_id", "attribute_id"],
+    "garment_suppliers": [
+        "id", "garment_id", "supplier_id", "status", "offer_price", "lead_time_days",
+        "notes", "created_at", "updated_at",
+    ],
+    "sample_sets": [
+        "id", "garment_supplier_id", "status", "notes", "submitted_date",
+        "created_at", "updated_at",
+    ],
+}
+
+
+async def _copy(driver, rows: dict[str, list[tuple]]) -> None:
+    for table, records in rows.items():
+        if records:
+            await driver.copy_records_to_table(table, records=records, columns=_COLUMNS[table])
+
+
+async def generate(
+    garments: int, seed: int = 42, reset: bool = False, log: Callable[[str], None] = print
+) -> None:
+    async with engine.begin() as conn:
+        if reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session() as db:
+        existing = (await db.execute(select(func.count()).select_from(Garment))).scalar_one()
+        if existing:
+            raise SystemExit(f"database already holds {existing} garments; pass --reset")
+
+    start = time.perf_counter()
+    reference, catalog = _reference_rows(random.Random(f"{seed}:reference"), garments)
+    ids = _Ids()
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+        async with driver.transaction():
+            await _copy(driver, reference)
+        for first_id in range(1, garments + 1, _BATCH_SIZE):
+            # Seeded per batch so a batch's rows don't depend on earlier batches
+            rng = random.Random(f"{seed}:{first_id}")
+            rows = _garment_batch(
+                rng, catalog, first_id, min(_BATCH_SIZE, garments - first_id + 1), ids
+            )
+            async with driver.transaction():
+                await _copy(driver, rows)
+            log(f"  {first_id + len(rows['garments']) - 1}/{garments} garments")
+        # Explicit ids bypass the serial sequences
+        for table in _COLUMNS:
+            await driver.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"coalesce((SELECT max(id) FROM {table}), 0) + 1, false)"
+            )
+        await driver.execute("ANALYZE")
+    log(f"copied rows in {time.perf_counter() - start:.1f}s")
+
+    async with async_session() as db:
+        # By id range rather than backfill_missing: its anti-join rescans the
+        # document table it is filling, which is quadratic at this size
+        for first_id in range(1, garments + 1, _BATCH_SIZE):
+            await search_service.refresh_search_documents(
+                db, Garment.id.between(first_id, first_id + _BATCH_SIZE - 1)
+            )
+            await db.commit()
+        await aggregate_service.rebuild(db)
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.execute("ANALYZE")
+    log(f"generated {garments} garments in {time.perf_counter() - start:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic garment catalog")
+    parser.add_argument(
+        "--scale", type=float, default=10, help="thousands of garments (1000 = 1M)"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--reset", action="store_true", help="drop and recreate all tables first"
+    )
+    args = parser.parse_args()
+    asyncio.run(generate(int(args.scale * 1000), seed=args.seed, reset=args.reset))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,15 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 
 from app.config import get_settings
 from app.exceptions import AppException
-from app.routers import garments, materials, attributes, suppliers
+from app.database import engine, pool_stats
+from app.metrics import APP_EXCEPTIONS, MetricsMiddleware, instrument_engine, render
+from app.services.change_feed import OriginMiddleware
+from app.routers import garments, materials, attributes, suppliers, samples, dashboard, jobs, events
 
 settings = get_settings()
 
@@ -16,12 +19,20 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     from app.database import Base, engine, async_session
     from app.seed import seed_data
+    from app.services.search_service import backfill_missing
+    from app.services.aggregate_service import ensure_initialized
+    from app.services.change_feed import feed
+    from app.services.history_service import ensure_partitions
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await ensure_partitions(conn)
     async with async_session() as db:
         await seed_data(db)
+        await backfill_missing(db)
+        await ensure_initialized(db)
     yield
+    await feed.close()
 
 
 app = FastAPI(
@@ -38,11 +49,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Metrics
+instrument_engine(engine)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(OriginMiddleware)
+
 
 @app.exception_handler(AppException)
 async def app_exception_handler(request: Request, exc: AppException):
+    APP_EXCEPTIONS.inc((exc.error_code,))
     return JSONResponse(
         status_code=exc.status_code,
         content={
@@ -68,8 +86,22 @@ app.include_router(garments.router, prefix="/api")
 app.include_router(materials.router, prefix="/api")
 app.include_router(attributes.router, prefix="/api")
 app.include_router(suppliers.router, prefix="/api")
+app.include_router(samples.router, prefix="/api")
+app.include_router(dashboard.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
 
 
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/api/health/pool")
+async def pool_health():
+    return pool_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render(pool_stats()), media_type="text/plain; version=0.0.4")
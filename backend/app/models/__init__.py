@@ -3,6 +3,10 @@ from app.models.material import Material, GarmentMaterial
 from app.models.attribute import Attribute, GarmentAttribute, AttributeIncompatibility, AttributeCategory
 from app.models.supplier import Supplier, GarmentSupplier, SupplierStatus
 from app.models.sample_set import SampleSet, SampleStatus
+from app.models.search import GarmentSearchDocument
+from app.models.dashboard import DashboardCount
+from app.models.job import Job, JobStatus
+from app.models.history import TransitionHistory, TransitionRollup
 
 __all__ = [
     "Garment",
@@ -18,4 +22,10 @@ __all__ = [
     "SupplierStatus",
     "SampleSet",
     "SampleStatus",
+    "GarmentSearchDocument",
+    "DashboardCount",
+    "Job",
+    "JobStatus",
+    "TransitionHistory",
+    "TransitionRollup",
 ]
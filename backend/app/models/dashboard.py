@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from sqlalchemy import String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# Running counts behind the dashboard, e.g. ("garment_stage", "SAMPLING").
+# Adjusted by the service layer in the same transaction as each mutation.
+class DashboardCount(Base):
+    __tablename__ = "dashboard_counts"
+
+    metric: Mapped[str] = mapped_column(String(30), primary_key=True)
+    key: Mapped[str] = mapped_column(String(30), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -3,7 +3,8 @@ from __future__ import annotations
 import enum
 from datetime import datetime
 
-from sqlalchemy import String, Text, ForeignKey, DateTime
+from sqlalchemy import String, Text, ForeignKey, DateTime, Index, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -35,6 +36,23 @@ class Garment(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+    # When the garment entered its current stage; NULL until its first
+    # transition, meaning since created_at
+    stage_entered_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Materialized variation path: ancestor ids from the root down to the
+    # parent, and its length. Set once by create_variation; a garment never
+    # changes parent, so only deleting an ancestor rewrites it.
+    lineage: Mapped[list[int]] = mapped_column(
+        ARRAY(Integer), nullable=False, default=list, server_default="{}"
+    )
+    lineage_depth: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    # Bumped whenever a child row shown in the garment detail changes
+    # (materials, attributes, suppliers, variations); part of the ETag
+    children_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     # Self-referential relationship for design variations
     parent: Mapped[Garment | None] = relationship(
@@ -60,3 +78,14 @@ class Garment(Base):
         back_populates="garment",
         cascade="all, delete-orphan",
     )
+
+    # Composite (sort column, id) indexes backing keyset pagination of the list
+    __table_args__ = (
+        Index("ix_garments_updated_at_id", "updated_at", "id"),
+        Index("ix_garments_created_at_id", "created_at", "id"),
+        Index("ix_garments_name_id", "name", "id"),
+        Index("ix_garments_lifecycle_stage_id", "lifecycle_stage", "id"),
+        Index("ix_garments_parent_garment_id", "parent_garment_id"),
+        # Descendants of X are the rows whose lineage contains X
+        Index("ix_garments_lineage", "lineage", postgresql_using="gin"),
+    )
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import (
+    DDL, BigInteger, Date, DateTime, Double, Identity, Index, Integer, SmallInteger, String, event
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# Append-only log of lifecycle transitions: garment stages ("garment") and
+# garment-supplier pipeline statuses ("supplier"). Written by the service
+# layer in the same transaction as the transition. Range-partitioned by month
+# on transitioned_at; history_service.ensure_partitions creates the months
+# ahead, at startup and again as each month begins, and the DEFAULT
+# partition catches rows outside them (with a warning). There are no
+# foreign keys: history outlives the garments it describes.
+class TransitionHistory(Base):
+    __tablename__ = "transition_history"
+
+    # The partition key must be part of the primary key
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    transitioned_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    entity: Mapped[str] = mapped_column(String(20), nullable=False)
+    garment_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    supplier_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    from_state: Mapped[str] = mapped_column(String(20), nullable=False)
+    to_state: Mapped[str] = mapped_column(String(20), nullable=False)
+    # When from_state was entered, so the row carries the time spent in it
+    entered_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_transition_history_garment", "garment_id", "transitioned_at"),
+        {"postgresql_partition_by": "RANGE (transitioned_at)"},
+    )
+
+
+event.listen(
+    TransitionHistory.__table__,
+    "after_create",
+    DDL("CREATE TABLE transition_history_default PARTITION OF transition_history DEFAULT"),
+)
+
+
+# Transition counts and time spent in from_state, per week (Monday) of the
+# transition and duration bucket (history_service.DURATION_BUCKETS). Adjusted
+# with each history row, so the analytics endpoints read a few rows per week
+# instead of scanning history.
+class TransitionRollup(Base):
+    __tablename__ = "transition_rollups"
+
+    entity: Mapped[str] = mapped_column(String(20), primary_key=True)
+    week: Mapped[date] = mapped_column(Date, primary_key=True)
+    from_state: Mapped[str] = mapped_column(String(20), primary_key=True)
+    to_state: Mapped[str] = mapped_column(String(20), primary_key=True)
+    bucket: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    total_seconds: Mapped[float] = mapped_column(Double, nullable=False, default=0.0)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import enum
 from datetime import datetime
 
-from sqlalchemy import String, Text, ForeignKey, DateTime
+from sqlalchemy import String, Text, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -38,3 +38,17 @@ class SampleSet(Base):
     garment_supplier: Mapped["GarmentSupplier"] = relationship(
         back_populates="sample_sets",
     )
+
+    __table_args__ = (
+        # Sample sets of one garment supplier, with their statuses for
+        # counting without visiting the table
+        Index("ix_sample_sets_garment_supplier_id_status", "garment_supplier_id", "status"),
+        # The QA inbox: only open sample sets, however much terminal history
+        # accumulates. Queries must repeat the predicate to use it.
+        Index(
+            "ix_sample_sets_open_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status IN ('PENDING', 'RECEIVED')"),
+        ),
+    )
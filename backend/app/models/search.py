@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DDL, ForeignKey, DateTime, Index, Text, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# Denormalized search text per garment (name, description, material, attribute
+# and supplier names). Refreshed by the service layer in the same transaction
+# as the mutation that changes it.
+class GarmentSearchDocument(Base):
+    __tablename__ = "garment_search_documents"
+
+    garment_id: Mapped[int] = mapped_column(
+        ForeignKey("garments.id", ondelete="CASCADE"), primary_key=True
+    )
+    document: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_garment_search_documents_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_garment_search_documents_trgm",
+            "document",
+            postgresql_using="gin",
+            postgresql_ops={"document": "gin_trgm_ops"},
+        ),
+    )
+
+
+# Trigram operators and index ops come from the pg_trgm extension
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import enum
 from datetime import datetime
 
-from sqlalchemy import String, Text, ForeignKey, DateTime, Integer, Numeric, UniqueConstraint
+from sqlalchemy import String, Text, ForeignKey, DateTime, Index, Integer, Numeric, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -46,6 +46,8 @@ class GarmentSupplier(Base):
     status: Mapped[str] = mapped_column(
         String(20), nullable=False, default=SupplierStatus.OFFERED.value
     )
+    # NULL until the first transition, meaning since created_at
+    status_entered_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     offer_price: Mapped[float | None] = mapped_column(Numeric(10, 2), nullable=True)
     lead_time_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -65,4 +67,6 @@ class GarmentSupplier(Base):
 
     __table_args__ = (
         UniqueConstraint("garment_id", "supplier_id", name="uq_garment_supplier"),
+        # A supplier's portfolio, newest first (keyset on id)
+        Index("ix_garment_suppliers_supplier_id_id", "supplier_id", "id"),
     )
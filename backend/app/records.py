@@ -0,0 +1,43 @@
+import dataclasses
+from typing import Iterable
+
+import orjson
+from pydantic import BaseModel
+
+from app.schemas.attribute import AttributeResponse
+from app.schemas.garment import GarmentResponse
+from app.schemas.material import MaterialResponse
+from app.schemas.supplier import SupplierResponse
+
+# ORM-free read path for list endpoints.
+#
+# List queries select plain columns rather than entities, so nothing enters
+# the session's identity map, and each row becomes a slotted record whose
+# fields are those of a response model. orjson encodes the records natively
+# (dataclasses, datetimes) straight to bytes. Routes keep their
+# response_model, which documents the schema, but return the bytes, so the
+# model does not revalidate every row.
+
+
+def record_type(model: type[BaseModel]) -> type:
+    name = model.__name__.removesuffix("Response") + "Record"
+    return dataclasses.make_dataclass(name, list(model.model_fields), slots=True)
+
+
+GarmentRecord = record_type(GarmentResponse)
+MaterialRecord = record_type(MaterialResponse)
+AttributeRecord = record_type(AttributeResponse)
+SupplierRecord = record_type(SupplierResponse)
+
+
+def columns(entity, record: type) -> list:
+    # The entity's columns for the record's fields, in field order
+    return [getattr(entity, field.name) for field in dataclasses.fields(record)]
+
+
+def from_rows(record: type, rows: Iterable) -> list:
+    return [record(*row) for row in rows]
+
+
+def encode(records: list) -> bytes:
+    return orjson.dumps(records)
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, Query, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import records
+from app.config import get_settings
 from app.database import get_db
+from app.etag import cached_json_response
 from app.schemas.attribute import (
     AttributeCreate,
     AttributeResponse,
     IncompatibilityCreate,
     IncompatibilityResponse,
 )
-from app.services import attribute_service
+from app.services import attribute_service, reference_cache
 
 router = APIRouter(
     prefix="/attributes",
@@ -18,10 +23,20 @@ router = APIRouter(
 
 @router.get("", response_model=list[AttributeResponse])
 async def list_attributes(
-    category: str | None = Query(None),
+    request: Request,
+    # A fixed set: each category is cached under its own key
+    category: Literal["SLEEVE_TYPE", "NECKLINE", "GARMENT_CATEGORY", "FIT", "FEATURE"] | None = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
-    return await attribute_service.get_attributes(db, category=category)
+    async def load() -> bytes:
+        return records.encode(await attribute_service.get_attributes(db, category=category))
+
+    etag, body = await reference_cache.get(
+        reference_cache.ATTRIBUTES, category or "", load
+    )
+    return cached_json_response(
+        request, etag, body, get_settings().reference_max_age_seconds
+    )
 
 
 @router.post("", response_model=AttributeResponse, status_code=status.HTTP_201_CREATED)
@@ -32,18 +47,27 @@ async def create_attribute(
 
 
 @router.get("/incompatibilities", response_model=list[IncompatibilityResponse])
-async def list_incompatibilities(db: AsyncSession = Depends(get_db)):
-    rules = await attribute_service.get_incompatibilities(db)
-    return [
-        IncompatibilityResponse(
-            id=r.id,
-            attribute_id_1=r.attribute_id_1,
-            attribute_id_2=r.attribute_id_2,
-            attribute_1_name=r.attribute_1.name if r.attribute_1 else None,
-            attribute_2_name=r.attribute_2.name if r.attribute_2 else None,
+async def list_incompatibilities(request: Request, db: AsyncSession = Depends(get_db)):
+    async def load() -> bytes:
+        rules = await attribute_service.get_incompatibilities(db)
+        return reference_cache.serialize(
+            IncompatibilityResponse,
+            [
+                IncompatibilityResponse(
+                    id=r.id,
+                    attribute_id_1=r.attribute_id_1,
+                    attribute_id_2=r.attribute_id_2,
+                    attribute_1_name=r.attribute_1.name if r.attribute_1 else None,
+                    attribute_2_name=r.attribute_2.name if r.attribute_2 else None,
+                )
+                for r in rules
+            ],
         )
-        for r in rules
-    ]
+
+    etag, body = await reference_cache.get(reference_cache.INCOMPATIBILITIES, "", load)
+    return cached_json_response(
+        request, etag, body, get_settings().reference_max_age_seconds
+    )
 
 
 @router.post(
@@ -54,12 +78,4 @@ async def list_incompatibilities(db: AsyncSession = Depends(get_db)):
 async def create_incompatibility(
     data: IncompatibilityCreate, db: AsyncSession = Depends(get_db)
 ):
-    rule = await attribute_service.create_incompatibility(db, data)
-    await db.refresh(rule, ["attribute_1", "attribute_2"])
-    return IncompatibilityResponse(
-        id=rule.id,
-        attribute_id_1=rule.attribute_id_1,
-        attribute_id_2=rule.attribute_id_2,
-        attribute_1_name=rule.attribute_1.name if rule.attribute_1 else None,
-        attribute_2_name=rule.attribute_2.name if rule.attribute_2 else None,
-    )
+    return await attribute_service.create_incompatibility(db, data)
@@ -0,0 +1,43 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.schemas.dashboard import DashboardAggregates, TimeInStageDistribution, TransitionThroughput
+from app.services import aggregate_service, history_service
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["dashboard"],
+)
+
+
+@router.get("/aggregates", response_model=DashboardAggregates)
+async def get_aggregates(db: AsyncSession = Depends(get_db)):
+    return await aggregate_service.get_aggregates(db)
+
+
+# Transition analytics, from weekly rollups. `entity` picks garment stages or
+# garment-supplier statuses; since/until select whole weeks.
+
+
+@router.get("/time-in-stage", response_model=TimeInStageDistribution)
+async def get_time_in_stage(
+    entity: Literal["garment", "supplier"] = Query("garment"),
+    since: date | None = Query(None),
+    until: date | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    return await history_service.get_time_in_stage(db, entity, since, until)
+
+
+@router.get("/throughput", response_model=TransitionThroughput)
+async def get_throughput(
+    entity: Literal["garment", "supplier"] = Query("garment"),
+    since: date | None = Query(None),
+    until: date | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    return await history_service.get_throughput(db, entity, since, until)
@@ -0,0 +1,51 @@
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from app.services.change_feed import Subscriber, feed
+
+router = APIRouter(
+    prefix="/events",
+    tags=["events"],
+)
+
+# Comment lines keep idle streams alive through proxies
+_KEEPALIVE_SECONDS = 15.0
+
+
+async def stream(subscriber: Subscriber) -> AsyncIterator[str]:
+    try:
+        # Reconnect after 3s; anything committed meanwhile is not replayed, so
+        # a client refetches what it shows on every (re)connect
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                async with asyncio.timeout(_KEEPALIVE_SECONDS):
+                    payload = await subscriber.queue.get()
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if payload is None:
+                return
+            yield f"data: {payload}\n\n"
+    finally:
+        feed.unsubscribe(subscriber)
+
+
+@router.get(
+    "",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def change_events(garment_id: int | None = Query(None)):
+    # Server-Sent Events: one JSON change per `data:` line, e.g.
+    # {"type": "garment.transitioned", "garment_id": 7, "lifecycle_stage": ...}.
+    # `garment_id` limits the stream to that garment's changes.
+    subscriber = await feed.subscribe(garment_id)
+    return StreamingResponse(
+        stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
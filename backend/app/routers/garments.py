@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends, Response, status, Query
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import records
 from app.database import get_db
 from app.schemas.garment import (
     GarmentCreate,
@@ -13,12 +17,23 @@ from app.schemas.garment import (
     GarmentAttributeResponse,
     GarmentSupplierSummary,
     GarmentVariationSummary,
+    GarmentLineageNode,
+    GarmentImportResult,
+    GarmentBulkTransition,
+    GarmentBulkTransitionResult,
 )
 from app.schemas.material import GarmentMaterialCreate
-from app.schemas.attribute import GarmentAttributeCreate
+from app.schemas.attribute import (
+    GarmentAttributeCreate,
+    GarmentAttributeBulkCreate,
+    BulkAttributeAssign,
+    BulkAttributeAssignResult,
+)
 from app.schemas.supplier import GarmentSupplierCreate, GarmentSupplierTransition, GarmentSupplierResponse
 from app.schemas.sample_set import SampleSetCreate, SampleSetUpdate, SampleSetResponse
-from app.services import garment_service, supplier_service
+from app.services import garment_service, supplier_service, import_service, export_service
+from app.exceptions import ValidationError
+from app.etag import compute_etag, etag_matches, not_modified
 
 router = APIRouter(
     prefix="/garments",
@@ -28,11 +43,38 @@ router = APIRouter(
 
 @router.get("", response_model=list[GarmentResponse])
 async def list_garments(
+    request: Request,
     stage: str | None = Query(None),
     search: str | None = Query(None),
+    sort: Literal["updated_at", "created_at", "name", "lifecycle_stage"] = Query("updated_at"),
+    order: Literal["asc", "desc"] = Query("desc"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
-    return await garment_service.get_garments(db, stage=stage, search=search)
+    # `search` results are ranked by relevance and ignore `sort`/`order`
+    garments, next_cursor = await garment_service.get_garments(
+        db,
+        stage=stage,
+        search=search,
+        sort=sort,
+        order=order,
+        limit=limit,
+        cursor=cursor,
+    )
+    etag = compute_etag(
+        str(request.query_params),
+        next_cursor,
+        [(g.id, g.updated_at) for g in garments],
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    headers = {"ETag": etag}
+    # Pass this value back as `cursor` to fetch the next page
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    # Already in the GarmentResponse shape; skips response_model validation
+    return Response(records.encode(garments), media_type="application/json", headers=headers)
 
 
 @router.post("", response_model=GarmentResponse, status_code=status.HTTP_201_CREATED)
@@ -40,9 +82,102 @@ async def create_garment(data: GarmentCreate, db: AsyncSession = Depends(get_db)
     return await garment_service.create_garment(db, data)
 
 
+@router.post(
+    "/import",
+    response_model=GarmentImportResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_garments(
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    # CSV columns: name, description, lifecycle_stage (CONCEPT, if given),
+    #   materials ("material_id:percentage;..."), attributes ("attribute_id;...")
+    # NDJSON: one GarmentImportRow object per line
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("text/csv"):
+            format = "csv"
+        elif content_type.startswith(("application/x-ndjson", "application/jsonl")):
+            format = "ndjson"
+        else:
+            raise ValidationError(
+                "Unsupported import format; send text/csv or application/x-ndjson"
+            )
+    return await import_service.import_garments(db, request.stream(), format)
+
+
+@router.post(
+    "/bulk/attributes",
+    response_model=BulkAttributeAssignResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_add_attributes(
+    data: BulkAttributeAssign, db: AsyncSession = Depends(get_db)
+):
+    created = await garment_service.add_attributes(
+        db, data.garment_ids, data.attribute_ids
+    )
+    return BulkAttributeAssignResult(
+        garment_ids=data.garment_ids,
+        attribute_ids=data.attribute_ids,
+        created=created,
+    )
+
+
+@router.post("/bulk/transition", response_model=GarmentBulkTransitionResult)
+async def bulk_transition_garments(
+    data: GarmentBulkTransition, db: AsyncSession = Depends(get_db)
+):
+    return await garment_service.transition_garments(
+        db, data.garment_ids, data.target_stage
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def export_garments(
+    stage: str | None = Query(None),
+    gzip: bool = Query(False),
+):
+    # One GarmentDetailResponse document per line
+    body = export_service.export_garments(stage=stage)
+    headers = {"Content-Disposition": 'attachment; filename="garments.ndjson"'}
+    if gzip:
+        body = export_service.gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
 @router.get("/{garment_id}", response_model=GarmentDetailResponse)
-async def get_garment_detail(garment_id: int, db: AsyncSession = Depends(get_db)):
+async def get_garment_detail(
+    garment_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    # Revalidation only needs the version columns, not the full detail load
+    if request.headers.get("if-none-match"):
+        etag = compute_etag(garment_id, *await garment_service.get_garment_version(db, garment_id))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
     garment = await garment_service.get_garment(db, garment_id)
+    response.headers["ETag"] = compute_etag(
+        garment.id, garment.updated_at, garment.children_version
+    )
     return GarmentDetailResponse(
         id=garment.id,
         name=garment.name,
@@ -85,6 +220,42 @@ async def get_garment_detail(garment_id: int, db: AsyncSession = Depends(get_db)
     )
 
 
+@router.get("/{garment_id}/ancestors", response_model=list[GarmentLineageNode])
+async def list_ancestors(
+    garment_id: int,
+    response: Response,
+    max_depth: int | None = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    # Parent first, up to the root
+    ancestors, next_cursor = await garment_service.get_ancestors(
+        db, garment_id, max_depth=max_depth, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return ancestors
+
+
+@router.get("/{garment_id}/descendants", response_model=list[GarmentLineageNode])
+async def list_descendants(
+    garment_id: int,
+    response: Response,
+    max_depth: int | None = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    # Direct variations first, then each further generation
+    descendants, next_cursor = await garment_service.get_descendants(
+        db, garment_id, max_depth=max_depth, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return descendants
+
+
 @router.put("/{garment_id}", response_model=GarmentResponse)
 async def update_garment(
     garment_id: int, data: GarmentUpdate, db: AsyncSession = Depends(get_db)
@@ -127,13 +298,7 @@ async def add_material(
     data: GarmentMaterialCreate,
     db: AsyncSession = Depends(get_db),
 ):
-    gm = await garment_service.add_material(db, garment_id, data)
-    await db.refresh(gm, ["material"])
-    return {
-        "id": gm.material.id,
-        "name": gm.material.name,
-        "percentage": float(gm.percentage),
-    }
+    return await garment_service.add_material(db, garment_id, data)
 
 
 @router.delete(
@@ -156,13 +321,25 @@ async def add_attribute(
     data: GarmentAttributeCreate,
     db: AsyncSession = Depends(get_db),
 ):
-    ga = await garment_service.add_attribute(db, garment_id, data)
-    await db.refresh(ga, ["attribute"])
-    return {
-        "id": ga.attribute.id,
-        "name": ga.attribute.name,
-        "category": ga.attribute.category,
-    }
+    return await garment_service.add_attribute(db, garment_id, data)
+
+
+@router.post(
+    "/{garment_id}/attributes/bulk",
+    response_model=BulkAttributeAssignResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def add_attributes(
+    garment_id: int,
+    data: GarmentAttributeBulkCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    created = await garment_service.add_attributes(db, [garment_id], data.attribute_ids)
+    return BulkAttributeAssignResult(
+        garment_ids=[garment_id],
+        attribute_ids=data.attribute_ids,
+        created=created,
+    )
 
 
 @router.delete(
@@ -189,21 +366,7 @@ async def associate_supplier(
     data: GarmentSupplierCreate,
     db: AsyncSession = Depends(get_db),
 ):
-    gs = await supplier_service.associate_supplier(db, garment_id, data)
-    # Load supplier name for response
-    await db.refresh(gs, ["supplier"])
-    return GarmentSupplierResponse(
-        id=gs.id,
-        garment_id=gs.garment_id,
-        supplier_id=gs.supplier_id,
-        supplier_name=gs.supplier.name,
-        status=gs.status,
-        offer_price=float(gs.offer_price) if gs.offer_price else None,
-        lead_time_days=gs.lead_time_days,
-        notes=gs.notes,
-        created_at=gs.created_at,
-        updated_at=gs.updated_at,
-    )
+    return await supplier_service.associate_supplier(db, garment_id, data)
 
 
 @router.post(
@@ -216,22 +379,9 @@ async def transition_supplier(
     data: GarmentSupplierTransition,
     db: AsyncSession = Depends(get_db),
 ):
-    gs = await supplier_service.transition_supplier(
+    return await supplier_service.transition_supplier(
         db, garment_id, supplier_id, data.target_status
     )
-    await db.refresh(gs, ["supplier"])
-    return GarmentSupplierResponse(
-        id=gs.id,
-        garment_id=gs.garment_id,
-        supplier_id=gs.supplier_id,
-        supplier_name=gs.supplier.name,
-        status=gs.status,
-        offer_price=float(gs.offer_price) if gs.offer_price else None,
-        lead_time_days=gs.lead_time_days,
-        notes=gs.notes,
-        created_at=gs.created_at,
-        updated_at=gs.updated_at,
-    )
 
 
 @router.get(
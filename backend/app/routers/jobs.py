@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.schemas.job import JobCreate, JobResponse
+from app.services import job_service
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+)
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(data: JobCreate, db: AsyncSession = Depends(get_db)):
+    # Run by app.worker; poll GET /jobs/{job_id} for progress and the result
+    return await job_service.enqueue(db, data)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    return await job_service.get_job(db, job_id)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    return await job_service.cancel_job(db, job_id)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import records
+from app.config import get_settings
 from app.database import get_db
+from app.etag import cached_json_response
 from app.schemas.material import MaterialCreate, MaterialResponse
-from app.services import material_service
+from app.services import material_service, reference_cache
 
 router = APIRouter(
     prefix="/materials",
@@ -12,8 +15,14 @@ router = APIRouter(
 
 
 @router.get("", response_model=list[MaterialResponse])
-async def list_materials(db: AsyncSession = Depends(get_db)):
-    return await material_service.get_materials(db)
+async def list_materials(request: Request, db: AsyncSession = Depends(get_db)):
+    async def load() -> bytes:
+        return records.encode(await material_service.get_materials(db))
+
+    etag, body = await reference_cache.get(reference_cache.MATERIALS, "", load)
+    return cached_json_response(
+        request, etag, body, get_settings().reference_max_age_seconds
+    )
 
 
 @router.post("", response_model=MaterialResponse, status_code=status.HTTP_201_CREATED)
@@ -0,0 +1,43 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.schemas.sample_set import SampleInboxItem
+from app.services import supplier_service
+
+router = APIRouter(
+    prefix="/samples",
+    tags=["samples"],
+)
+
+
+@router.get("/inbox", response_model=list[SampleInboxItem])
+async def sample_inbox(
+    response: Response,
+    status: Literal["PENDING", "RECEIVED"] | None = Query(None),
+    supplier_id: int | None = Query(None),
+    stage: Literal["CONCEPT", "DESIGN", "DEVELOPMENT", "SAMPLING", "PRODUCTION"] | None = Query(None),
+    min_age_days: int | None = Query(None, ge=0),
+    order: Literal["asc", "desc"] = Query("asc"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    # PENDING and RECEIVED sample sets across all garments and suppliers, by
+    # created_at (oldest first unless order=desc); min_age_days keeps those
+    # created at least that many days ago
+    samples, next_cursor = await supplier_service.get_sample_inbox(
+        db,
+        status=status,
+        supplier_id=supplier_id,
+        stage=stage,
+        min_age_days=min_age_days,
+        order=order,
+        limit=limit,
+        cursor=cursor,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return samples
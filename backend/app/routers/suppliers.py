@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, Response, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import records
+from app.config import get_settings
 from app.database import get_db
-from app.schemas.supplier import SupplierCreate, SupplierUpdate, SupplierResponse
-from app.services import supplier_service
+from app.etag import cached_json_response
+from app.schemas.supplier import (
+    SupplierCreate, SupplierUpdate, SupplierResponse, OfferComparison, SupplierOfferBands,
+    SupplierPortfolio,
+)
+from app.services import supplier_service, offer_service, reference_cache
 
 router = APIRouter(
     prefix="/suppliers",
@@ -12,8 +20,14 @@ router = APIRouter(
 
 
 @router.get("", response_model=list[SupplierResponse])
-async def list_suppliers(db: AsyncSession = Depends(get_db)):
-    return await supplier_service.get_suppliers(db)
+async def list_suppliers(request: Request, db: AsyncSession = Depends(get_db)):
+    async def load() -> bytes:
+        return records.encode(await supplier_service.get_suppliers(db))
+
+    etag, body = await reference_cache.get(reference_cache.SUPPLIERS, "", load)
+    return cached_json_response(
+        request, etag, body, get_settings().reference_max_age_seconds
+    )
 
 
 @router.post("", response_model=SupplierResponse, status_code=status.HTTP_201_CREATED)
@@ -21,11 +35,85 @@ async def create_supplier(data: SupplierCreate, db: AsyncSession = Depends(get_d
     return await supplier_service.create_supplier(db, data)
 
 
+@router.get("/offers", response_model=OfferComparison)
+async def compare_offers(
+    response: Response,
+    stage: Literal["CONCEPT", "DESIGN", "DEVELOPMENT", "SAMPLING", "PRODUCTION"] | None = Query(None),
+    garment_id: list[int] | None = Query(None),
+    price_weight: float = Query(0.5, ge=0, le=1),
+    include_rejected: bool = Query(False),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    # Offers ranked per garment by price, lead time and a score weighting the
+    # two (price_weight 1 = price only), for garments filtered by stage and/or
+    # id, in garment id order
+    comparison, next_cursor = await offer_service.compare_offers(
+        db,
+        stage=stage,
+        garment_ids=garment_id,
+        price_weight=price_weight,
+        include_rejected=include_rejected,
+        limit=limit,
+        cursor=cursor,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return comparison
+
+
+@router.get("/offers/bands", response_model=list[SupplierOfferBands])
+async def supplier_offer_bands(
+    response: Response,
+    stage: Literal["CONCEPT", "DESIGN", "DEVELOPMENT", "SAMPLING", "PRODUCTION"] | None = Query(None),
+    garment_id: list[int] | None = Query(None),
+    supplier_id: list[int] | None = Query(None),
+    include_rejected: bool = Query(False),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    # Each supplier's price and lead-time bands over its offers on the
+    # garments /offers compares (same filter), in supplier id order; pass
+    # supplier_id for just the suppliers on a page of /offers
+    bands, next_cursor = await offer_service.supplier_bands(
+        db,
+        stage=stage,
+        garment_ids=garment_id,
+        supplier_ids=supplier_id,
+        include_rejected=include_rejected,
+        limit=limit,
+        cursor=cursor,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return bands
+
+
 @router.get("/{supplier_id}", response_model=SupplierResponse)
 async def get_supplier(supplier_id: int, db: AsyncSession = Depends(get_db)):
     return await supplier_service.get_supplier(db, supplier_id)
 
 
+@router.get("/{supplier_id}/portfolio", response_model=SupplierPortfolio)
+async def get_portfolio(
+    supplier_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    # The supplier's garment offers, newest first, with status counts,
+    # averages and sample approval rate over all of them
+    portfolio, next_cursor = await supplier_service.get_portfolio(
+        db, supplier_id, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return portfolio
+
+
 @router.put("/{supplier_id}", response_model=SupplierResponse)
 async def update_supplier(
     supplier_id: int, data: SupplierUpdate, db: AsyncSession = Depends(get_db)
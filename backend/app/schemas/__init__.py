@@ -3,3 +3,4 @@ from app.schemas.material import *  # noqa: F401, F403
 from app.schemas.attribute import *  # noqa: F401, F403
 from app.schemas.supplier import *  # noqa: F401, F403
 from app.schemas.sample_set import *  # noqa: F401, F403
+from app.schemas.dashboard import *  # noqa: F401, F403
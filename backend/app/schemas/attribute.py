@@ -20,6 +20,20 @@ class GarmentAttributeCreate(BaseModel):
     attribute_id: int
 
 
+class GarmentAttributeBulkCreate(BaseModel):
+    attribute_ids: list[int] = Field(..., min_length=1, max_length=100)
+
+
+class BulkAttributeAssign(GarmentAttributeBulkCreate):
+    garment_ids: list[int] = Field(..., min_length=1, max_length=10_000)
+
+
+class BulkAttributeAssignResult(BaseModel):
+    garment_ids: list[int]
+    attribute_ids: list[int]
+    created: int
+
+
 class IncompatibilityCreate(BaseModel):
     attribute_id_1: int
     attribute_id_2: int
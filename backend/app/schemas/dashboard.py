@@ -0,0 +1,51 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class DashboardAggregates(BaseModel):
+    garments_by_stage: dict[str, int]
+    suppliers_by_status: dict[str, int]
+    samples_by_status: dict[str, int]
+
+
+class DurationBucket(BaseModel):
+    min_seconds: int
+    # None for the open-ended last bucket
+    max_seconds: int | None
+    count: int
+
+
+class TimeInStage(BaseModel):
+    state: str
+    # Completed stays, i.e. transitions out of the state
+    count: int
+    mean_seconds: float
+    # Bucket upper bounds, so approximate
+    p50_seconds: int | None
+    p90_seconds: int | None
+    buckets: list[DurationBucket]
+
+
+class TimeInStageDistribution(BaseModel):
+    entity: str
+    since: date | None
+    until: date | None
+    stages: list[TimeInStage]
+
+
+class StageThroughput(BaseModel):
+    state: str
+    entered: int
+    exited: int
+
+
+class ThroughputWeek(BaseModel):
+    # Monday of the week
+    week: date
+    stages: list[StageThroughput]
+
+
+class TransitionThroughput(BaseModel):
+    entity: str
+    weeks: list[ThroughputWeek]
@@ -3,6 +3,8 @@ from typing import Literal
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
+from app.schemas.material import GarmentMaterialCreate
+
 
 class GarmentBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=200)
@@ -22,6 +24,22 @@ class GarmentTransition(BaseModel):
     target_stage: Literal["CONCEPT", "DESIGN", "DEVELOPMENT", "SAMPLING", "PRODUCTION"]
 
 
+class GarmentBulkTransition(GarmentTransition):
+    garment_ids: list[int] = Field(..., min_length=1, max_length=10_000)
+
+
+class GarmentTransitionRejection(BaseModel):
+    garment_id: int
+    error: str
+    detail: str
+
+
+class GarmentBulkTransitionResult(BaseModel):
+    target_stage: str
+    transitioned: list[int] = []
+    rejected: list[GarmentTransitionRejection] = []
+
+
 class GarmentVariationCreate(GarmentBase):
     pass
 
@@ -71,8 +89,34 @@ class GarmentVariationSummary(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class GarmentLineageNode(GarmentVariationSummary):
+    parent_garment_id: int | None
+    # Generations away from the requested garment (1 = parent or child)
+    depth: int
+
+
 class GarmentDetailResponse(GarmentResponse):
     materials: list[GarmentMaterialResponse] = []
     attributes: list[GarmentAttributeResponse] = []
     suppliers: list[GarmentSupplierSummary] = []
     variations: list[GarmentVariationSummary] = []
+
+
+class GarmentImportRow(GarmentBase):
+    # Imported garments start in CONCEPT like created ones; later stages are
+    # reached through the lifecycle transitions only
+    lifecycle_stage: Literal["CONCEPT"] = "CONCEPT"
+    materials: list[GarmentMaterialCreate] = []
+    attributes: list[int] = []
+
+
+class GarmentImportError(BaseModel):
+    row: int
+    detail: str
+
+
+class GarmentImportResult(BaseModel):
+    received: int
+    imported: int
+    failed: int
+    errors: list[GarmentImportError] = []
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Annotated, Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+Stage = Literal["CONCEPT", "DESIGN", "DEVELOPMENT", "SAMPLING", "PRODUCTION"]
+
+
+class JobOptions(BaseModel):
+    max_attempts: int = Field(5, ge=1, le=20)
+
+
+class TransitionGarmentsJob(JobOptions):
+    # Moves the listed garments, or every garment in `stage`, or (neither
+    # given) every garment that may move to the target
+    kind: Literal["transition_garments"]
+    target_stage: Stage
+    stage: Stage | None = None
+    garment_ids: list[int] | None = Field(None, min_length=1)
+
+
+class ExportGarmentsJob(JobOptions):
+    # Writes the catalog export to a file in the job files directory
+    kind: Literal["export_garments"]
+    stage: Stage | None = None
+    gzip: bool = False
+
+
+class ImportGarmentsJob(JobOptions):
+    # Imports a file already placed in the job files directory
+    kind: Literal["import_garments"]
+    file: str = Field(..., pattern=r"^[\w-][\w.-]*$", max_length=200)
+    format: Literal["csv", "ndjson"]
+
+
+JobCreate = Annotated[
+    TransitionGarmentsJob | ExportGarmentsJob | ImportGarmentsJob,
+    Field(discriminator="kind"),
+]
+job_spec = TypeAdapter(JobCreate)
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    payload: dict[str, Any]
+    progress: int
+    total: int | None
+    result: dict[str, Any] | None
+    error: str | None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    run_after: datetime
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -26,3 +26,11 @@ class SampleSetResponse(BaseModel):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SampleInboxItem(SampleSetResponse):
+    garment_id: int
+    garment_name: str
+    lifecycle_stage: str
+    supplier_id: int
+    supplier_name: str
@@ -51,3 +51,73 @@ class GarmentSupplierResponse(BaseModel):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class RankedOffer(BaseModel):
+    supplier_id: int
+    supplier_name: str
+    status: str
+    offer_price: float | None
+    lead_time_days: int | None
+    # 1 = best within the garment; ties share a rank, missing values rank last
+    price_rank: int
+    lead_time_rank: int
+    # Weighted price and lead time percentile ranks within the garment, 0 best
+    score: float
+    score_rank: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class GarmentOfferRanking(BaseModel):
+    garment_id: int
+    garment_name: str
+    lifecycle_stage: str
+    best_price_supplier_id: int | None
+    best_lead_time_supplier_id: int | None
+    best_score_supplier_id: int
+    offers: list[RankedOffer]
+
+
+class SupplierOfferBands(BaseModel):
+    supplier_id: int
+    supplier_name: str
+    offers: int
+    # 25th/50th/75th percentiles of the supplier's offers
+    price_p25: float | None
+    price_p50: float | None
+    price_p75: float | None
+    lead_time_p25: float | None
+    lead_time_p50: float | None
+    lead_time_p75: float | None
+    # Median percentile rank of its price among each garment's offers, 0 cheapest
+    price_percentile_p50: float | None
+
+
+class OfferComparison(BaseModel):
+    price_weight: float
+    garments: list[GarmentOfferRanking]
+
+
+class PortfolioOffer(BaseModel):
+    id: int
+    garment_id: int
+    garment_name: str
+    lifecycle_stage: str
+    status: str
+    offer_price: float | None
+    lead_time_days: int | None
+    updated_at: datetime
+
+
+class SupplierPortfolio(BaseModel):
+    supplier: SupplierResponse
+    # Over all of the supplier's offers, not just this page
+    offers_by_status: dict[str, int]
+    average_offer_price: float | None
+    average_lead_time_days: float | None
+    samples_approved: int
+    samples_rejected: int
+    # Approved share of decided sample sets; None before any decision
+    sample_approval_rate: float | None
+    offers: list[PortfolioOffer]
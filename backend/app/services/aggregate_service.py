@@ -0,0 +1,143 @@
+from collections import Counter
+from typing import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, select, delete, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import (
+    DashboardCount,
+    Garment,
+    GarmentSupplier,
+    SampleSet,
+    LifecycleStage,
+    SupplierStatus,
+    SampleStatus,
+)
+from app.schemas.dashboard import DashboardAggregates
+
+GARMENT_STAGE = "garment_stage"
+SUPPLIER_STATUS = "supplier_status"
+SAMPLE_STATUS = "sample_status"
+
+_PENDING = "dashboard_counts_pending"
+
+
+async def adjust(db: AsyncSession, metric: str, deltas: dict[str, int]) -> None:
+    # Applied when the caller commits, in the same transaction as the
+    # mutation, which keeps the counts exact. A few hot rows (one per stage)
+    # take every write: the upsert runs last, just before COMMIT, so their
+    # locks are held as briefly as possible, and in (metric, key) order, so
+    # two transactions moving counts in opposite directions cannot deadlock.
+    pending = db.sync_session.info.setdefault(_PENDING, Counter())
+    for key, delta in deltas.items():
+        pending[metric, key] += delta
+
+
+@event.listens_for(Session, "before_commit")
+def _apply(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    rows = [
+        {"metric": metric, "key": key, "count": delta}
+        for (metric, key), delta in sorted(pending.items())
+        if delta
+    ]
+    if rows:
+        session.execute(_upsert(rows))
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard(session: Session, transaction) -> None:
+    # Rolled back (or closed) with deltas still pending
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+def _upsert(rows: list[dict]):
+    stmt = pg_insert(DashboardCount).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DashboardCount.metric, DashboardCount.key],
+        set_={"count": DashboardCount.count + stmt.excluded.count},
+    )
+    return stmt
+
+
+async def moved(db: AsyncSession, metric: str, old: str, new: str) -> None:
+    await adjust(db, metric, {old: -1, new: 1})
+
+
+async def moved_many(db: AsyncSession, metric: str, old_keys: Iterable[str], new: str) -> None:
+    deltas = Counter()
+    for old in old_keys:
+        deltas[old] -= 1
+        deltas[new] += 1
+    await adjust(db, metric, deltas)
+
+
+async def garment_removed(db: AsyncSession, garment: Garment) -> None:
+    # Supplier rows and sample sets go with the garment (cascade)
+    result = await db.execute(
+        select(GarmentSupplier.status, func.count())
+        .where(GarmentSupplier.garment_id == garment.id)
+        .group_by(GarmentSupplier.status)
+    )
+    await adjust(db, SUPPLIER_STATUS, {status: -n for status, n in result.tuples()})
+    result = await db.execute(
+        select(SampleSet.status, func.count())
+        .join(GarmentSupplier, GarmentSupplier.id == SampleSet.garment_supplier_id)
+        .where(GarmentSupplier.garment_id == garment.id)
+        .group_by(SampleSet.status)
+    )
+    await adjust(db, SAMPLE_STATUS, {status: -n for status, n in result.tuples()})
+    await adjust(db, GARMENT_STAGE, {garment.lifecycle_stage: -1})
+
+
+async def rebuild(db: AsyncSession) -> None:
+    # Writers adjust the counts in their own transactions: they wait on the
+    # table lock until the recount commits, and the recount waits for the
+    # ones that adjusted before it, so none is counted twice or missed
+    await db.execute(text(f"LOCK TABLE {DashboardCount.__tablename__} IN EXCLUSIVE MODE"))
+    await db.execute(delete(DashboardCount))
+    for metric, column in (
+        (GARMENT_STAGE, Garment.lifecycle_stage),
+        (SUPPLIER_STATUS, GarmentSupplier.status),
+        (SAMPLE_STATUS, SampleSet.status),
+    ):
+        result = await db.execute(select(column, func.count()).group_by(column))
+        rows = [{"metric": metric, "key": key, "count": n} for key, n in result.tuples()]
+        if rows:
+            await db.execute(_upsert(rows))
+    await db.commit()
+
+
+async def ensure_initialized(db: AsyncSession) -> None:
+    # Counts for data that predates the summary table (or the seed). Every
+    # app and worker process runs this at startup; the lock makes the others
+    # wait for the first one's rebuild and then find the table filled.
+    await db.execute(
+        select(func.pg_advisory_xact_lock(func.hashtext(DashboardCount.__tablename__)))
+    )
+    result = await db.execute(select(DashboardCount.metric).limit(1))
+    if result.first() is None:
+        await rebuild(db)
+    else:
+        await db.commit()
+
+
+async def get_aggregates(db: AsyncSession) -> DashboardAggregates:
+    result = await db.execute(select(DashboardCount.metric, DashboardCount.key, DashboardCount.count))
+    counts: dict[str, dict[str, int]] = {
+        GARMENT_STAGE: {s.value: 0 for s in LifecycleStage},
+        SUPPLIER_STATUS: {s.value: 0 for s in SupplierStatus},
+        SAMPLE_STATUS: {s.value: 0 for s in SampleStatus},
+    }
+    for metric, key, count in result.tuples():
+        counts.setdefault(metric, {})[key] = count
+    return DashboardAggregates(
+        garments_by_stage=counts[GARMENT_STAGE],
+        suppliers_by_status=counts[SUPPLIER_STATUS],
+        samples_by_status=counts[SAMPLE_STATUS],
+    )
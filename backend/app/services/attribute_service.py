@@ -1,25 +1,33 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_
-from sqlalchemy.orm import joinedload
+from sqlalchemy import Row, select, insert, func, literal, union_all, Integer
+from sqlalchemy.orm import joinedload, aliased
 
 from app.models import Attribute, GarmentAttribute, AttributeIncompatibility
 from app.schemas.attribute import AttributeCreate, IncompatibilityCreate
-from app.exceptions import NotFoundError, IncompatibleAttributeError
+from app.exceptions import NotFoundError
+from app.services import change_feed, compatibility_graph, reference_cache, writes
+from app import records
+from app.records import AttributeRecord
 
 
-async def get_attributes(db: AsyncSession, category: str | None = None) -> list[Attribute]:
-    stmt = select(Attribute)
+async def get_attributes(
+    db: AsyncSession, category: str | None = None
+) -> list[AttributeRecord]:
+    stmt = select(*records.columns(Attribute, AttributeRecord))
     if category:
         stmt = stmt.where(Attribute.category == category)
     result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return records.from_rows(AttributeRecord, result)
 
 
-async def create_attribute(db: AsyncSession, data: AttributeCreate) -> Attribute:
-    attribute = Attribute(name=data.name, category=data.category)
-    db.add(attribute)
+async def create_attribute(db: AsyncSession, data: AttributeCreate) -> Row:
+    attribute = await writes.write(
+        db, insert(Attribute).values(name=data.name, category=data.category)
+    )
+    change_feed.invalidate(db, compatibility_graph.CACHE, reference_cache.ATTRIBUTES)
     await db.commit()
-    await db.refresh(attribute)
+    compatibility_graph.attribute_created(attribute.id, attribute.name)
+    reference_cache.bump(reference_cache.ATTRIBUTES)
     return attribute
 
 
@@ -35,73 +43,80 @@ async def get_incompatibilities(db: AsyncSession) -> list[AttributeIncompatibili
 
 async def create_incompatibility(
     db: AsyncSession, data: IncompatibilityCreate
-) -> AttributeIncompatibility:
-    # Validate both attributes exist
-    for attr_id in (data.attribute_id_1, data.attribute_id_2):
-        result = await db.execute(select(Attribute).where(Attribute.id == attr_id))
-        if not result.scalar_one_or_none():
-            raise NotFoundError("Attribute", attr_id)
-
+) -> Row:
     # Enforce ordered pair
     low, high = min(data.attribute_id_1, data.attribute_id_2), max(
         data.attribute_id_1, data.attribute_id_2
     )
-    rule = AttributeIncompatibility(attribute_id_1=low, attribute_id_2=high)
-    db.add(rule)
+    # Inserted only if both attributes exist; the names come back with it
+    rule = await writes.write(
+        db,
+        insert(AttributeIncompatibility).from_select(
+            ["attribute_id_1", "attribute_id_2"],
+            select(literal(low), literal(high)).where(
+                select(func.count()).where(Attribute.id.in_([low, high])).scalar_subquery()
+                == len({low, high})
+            ),
+        ),
+        writes.lookup(Attribute.name, low, "attribute_1_name"),
+        writes.lookup(Attribute.name, high, "attribute_2_name"),
+    )
+    if rule is None:
+        result = await db.execute(select(Attribute.id).where(Attribute.id.in_([low, high])))
+        found = set(result.scalars().all())
+        raise NotFoundError(
+            "Attribute",
+            next(i for i in (data.attribute_id_1, data.attribute_id_2) if i not in found),
+        )
+    change_feed.invalidate(db, compatibility_graph.CACHE, reference_cache.INCOMPATIBILITIES)
     await db.commit()
-    await db.refresh(rule)
+    compatibility_graph.incompatibility_created(low, high)
+    reference_cache.bump(reference_cache.INCOMPATIBILITIES)
     return rule
 
 
-async def check_attribute_compatibility(
-    db: AsyncSession, garment_id: int, attribute_id: int
-) -> None:
-    # Get existing attribute IDs on the garment
-    result = await db.execute(
-        select(GarmentAttribute.attribute_id).where(
-            GarmentAttribute.garment_id == garment_id
+async def find_attribute_conflicts(
+    db: AsyncSession, garment_ids: list[int], attribute_ids: list[int]
+) -> list[str]:
+    # One query for conflicts inside the candidate set and against every
+    # target garment's existing attributes
+    candidate = aliased(Attribute)
+    other = aliased(Attribute)
+
+    within_set = (
+        select(
+            literal(None, Integer).label("garment_id"),
+            candidate.name.label("attribute_name"),
+            other.name.label("conflicting_name"),
         )
+        .select_from(candidate)
+        .join(
+            AttributeIncompatibility,
+            AttributeIncompatibility.attribute_id_1 == candidate.id,
+        )
+        .join(other, other.id == AttributeIncompatibility.attribute_id_2)
+        .where(candidate.id.in_(attribute_ids), other.id.in_(attribute_ids))
     )
-    existing_ids = list(result.scalars().all())
-
-    if not existing_ids:
-        return
-
-    # Build conditions for incompatibility check
-    conditions = []
-    for existing_id in existing_ids:
-        low, high = min(attribute_id, existing_id), max(attribute_id, existing_id)
-        if low == high:
-            continue
-        conditions.append(
-            and_(
-                AttributeIncompatibility.attribute_id_1 == low,
-                AttributeIncompatibility.attribute_id_2 == high,
-            )
+    against_existing = (
+        select(
+            GarmentAttribute.garment_id,
+            candidate.name,
+            other.name,
         )
-
-    if not conditions:
-        return
-
-    result = await db.execute(
-        select(AttributeIncompatibility)
-        .options(
-            joinedload(AttributeIncompatibility.attribute_1),
-            joinedload(AttributeIncompatibility.attribute_2),
+        .select_from(candidate)
+        .join(GarmentAttribute, GarmentAttribute.garment_id.in_(garment_ids))
+        .join(other, other.id == GarmentAttribute.attribute_id)
+        .join(
+            AttributeIncompatibility,
+            (AttributeIncompatibility.attribute_id_1 == func.least(candidate.id, other.id))
+            & (AttributeIncompatibility.attribute_id_2 == func.greatest(candidate.id, other.id)),
         )
-        .where(or_(*conditions))
+        .where(candidate.id.in_(attribute_ids))
     )
-    conflicts = list(result.scalars().unique().all())
 
-    if conflicts:
-        new_attr_result = await db.execute(
-            select(Attribute).where(Attribute.id == attribute_id)
-        )
-        new_attr = new_attr_result.scalar_one()
-        conflicting_names = []
-        for c in conflicts:
-            if c.attribute_id_1 == attribute_id:
-                conflicting_names.append(c.attribute_2.name)
-            else:
-                conflicting_names.append(c.attribute_1.name)
-        raise IncompatibleAttributeError(new_attr.name, conflicting_names)
+    result = await db.execute(union_all(within_set, against_existing))
+    conflicts = []
+    for garment_id, attribute_name, conflicting_name in result.all():
+        where = f" on garment {garment_id}" if garment_id is not None else ""
+        conflicts.append(f"'{attribute_name}' conflicts with '{conflicting_name}'{where}")
+    return conflicts
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import Callable
+
+import asyncpg
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import Text, bindparam, event, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import get_settings
+from app.metrics import CHANGE_FEED_DROPPED, CHANGE_FEED_SUBSCRIBERS
+
+# Change feed.
+#
+# Services publish() fine-grained change events (garment updated, stage
+# transitioned, material added, ...) on their session. The events are sent
+# with pg_notify in one statement just before the transaction commits, so
+# Postgres delivers them to every listening app worker only if it commits, in
+# commit order. Each worker holds one LISTEN connection, outside the pool,
+# and fans notifications out to its subscribers (the SSE streams in
+# routers/events.py) through small per-subscriber queues, so an idle
+# subscriber costs a queue and no database connection.
+#
+# Events carry the X-Client-Id of the request that made them as "origin", so
+# a client can skip its own changes, which it has already applied.
+#
+# Nothing is replayed: a subscriber that falls behind, or whose worker loses
+# the LISTEN connection, is closed, and refetches when it reconnects.
+#
+# The same connection carries cache invalidations between processes. A write
+# to data that processes cache names the caches with invalidate(); on commit,
+# every process (this one included) runs the handlers registered for them
+# with on_invalidate(). Losing the connection runs every handler, since
+# invalidations may have been missed, and a cache must not keep what it loads
+# while listening() is False.
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "plm_changes"
+INVALIDATIONS_CHANNEL = "plm_invalidations"
+# NOTIFY payloads must be shorter than 8000 bytes
+_MAX_PAYLOAD = 7900
+_PENDING = "change_feed_pending"
+_INVALIDATED = "change_feed_invalidated"
+_QUEUE_SIZE = 256
+_MAX_ORIGIN = 64
+
+_origin: ContextVar[str | None] = ContextVar("change_feed_origin", default=None)
+
+_NOTIFY = text(
+    "SELECT pg_notify(channel, payload) FROM unnest(:channels, :payloads) AS n(channel, payload)"
+).bindparams(
+    bindparam("channels", type_=ARRAY(Text)), bindparam("payloads", type_=ARRAY(Text))
+)
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def _encode(change: dict) -> str:
+    payload = orjson.dumps(change, default=_default)
+    if len(payload) > _MAX_PAYLOAD:
+        # Too big to carry the new state (a long description): send the ids,
+        # and the subscriber refetches
+        payload = orjson.dumps(
+            {k: v for k, v in change.items() if isinstance(v, (str, int))} | {"truncated": True}
+        )
+    return payload.decode()
+
+
+def publish(db: AsyncSession, change_type: str, **fields) -> None:
+    # Sent when the session commits; dropped if it rolls back
+    origin = _origin.get()
+    if origin:
+        fields["origin"] = origin
+    db.sync_session.info.setdefault(_PENDING, []).append({"type": change_type, **fields})
+
+
+def invalidate(db: AsyncSession, *caches: str) -> None:
+    # Sent when the session commits, like publish()
+    db.sync_session.info.setdefault(_INVALIDATED, set()).update(caches)
+
+
+@event.listens_for(Session, "before_commit")
+def _notify(session: Session) -> None:
+    notifications = [(CHANNEL, _encode(c)) for c in session.info.pop(_PENDING, ())]
+    caches = session.info.pop(_INVALIDATED, None)
+    if caches:
+        notifications.append((INVALIDATIONS_CHANNEL, orjson.dumps(sorted(caches)).decode()))
+    if notifications:
+        channels, payloads = zip(*notifications)
+        session.execute(_NOTIFY, {"channels": list(channels), "payloads": list(payloads)})
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard(session: Session, transaction) -> None:
+    # Rolled back (or closed) with changes still pending
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+        session.info.pop(_INVALIDATED, None)
+
+
+class OriginMiddleware:
+    # Makes the request's X-Client-Id the origin of the changes it publishes
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        origin = Headers(scope=scope).get("x-client-id")
+        token = _origin.set(origin[:_MAX_ORIGIN] if origin else None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _origin.reset(token)
+
+
+class Subscriber:
+    def __init__(self, garment_id: int | None):
+        self.garment_id = garment_id
+        # None marks the end of the stream
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(_QUEUE_SIZE)
+
+    def close(self) -> None:
+        # Makes room for the end marker if the queue is full
+        while self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class ChangeFeed:
+    def __init__(self):
+        self._subscribers: set[Subscriber] = set()
+        self._handlers: dict[str, list[Callable[[], None]]] = defaultdict(list)
+        self._connection: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, garment_id: int | None = None) -> Subscriber:
+        await self._listen()
+        subscriber = Subscriber(garment_id)
+        self._subscribers.add(subscriber)
+        CHANGE_FEED_SUBSCRIBERS.inc()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+            CHANGE_FEED_SUBSCRIBERS.dec()
+
+    def on_invalidate(self, cache: str, handler: Callable[[], None]) -> None:
+        self._handlers[cache].append(handler)
+
+    async def listening(self) -> bool:
+        # Connects if needed. False when it cannot: a cache then serves what
+        # it loads without keeping it.
+        try:
+            await self._listen()
+        except (OSError, asyncpg.PostgresError):
+            log.warning("change feed cannot listen", exc_info=True)
+            return False
+        return True
+
+    async def _listen(self) -> None:
+        async with self._lock:
+            if self._connection is not None and not self._connection.is_closed():
+                return
+            settings = get_settings()
+            # Behind pgbouncer in transaction mode LISTEN needs a direct URL
+            url = make_url(settings.change_feed_database_url or settings.database_url)
+            self._connection = await asyncpg.connect(
+                url.set(drivername="postgresql").render_as_string(hide_password=False)
+            )
+            self._connection.add_termination_listener(self._lost)
+            await self._connection.add_listener(CHANNEL, self._dispatch)
+            await self._connection.add_listener(INVALIDATIONS_CHANNEL, self._invalidate)
+
+    def _dispatch(self, connection, pid, channel, payload: str) -> None:
+        garment_id = orjson.loads(payload).get("garment_id")
+        for subscriber in list(self._subscribers):
+            # Changes to many garments at once carry no garment_id and reach
+            # every subscriber
+            if garment_id is not None and subscriber.garment_id not in (None, garment_id):
+                continue
+            try:
+                subscriber.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Too slow to keep up; it reconnects and refetches
+                CHANGE_FEED_DROPPED.inc()
+                self.unsubscribe(subscriber)
+                subscriber.close()
+
+    def _invalidate(self, connection, pid, channel, payload: str) -> None:
+        for cache in orjson.loads(payload):
+            for handler in self._handlers.get(cache, ()):
+                handler()
+
+    def _lost(self, connection) -> None:
+        # Changes and invalidations may have been missed: end every stream
+        # and drop every cache
+        self._connection = None
+        for subscriber in list(self._subscribers):
+            self.unsubscribe(subscriber)
+            subscriber.close()
+        for handlers in self._handlers.values():
+            for handler in handlers:
+                handler()
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+        for subscriber in list(self._subscribers):
+            self.unsubscribe(subscriber)
+            subscriber.close()
+
+
+feed = ChangeFeed()
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from typing import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
+
+from app.models import Attribute, AttributeIncompatibility
+from app.services import change_feed
+
+# Process-wide compiled view of the attribute incompatibility rules.
+#
+# Each attribute id maps to an int used as a bitset with bit N set when the
+# attribute conflicts with attribute N, so checking a candidate against a
+# garment's attributes is one AND. The graph is loaded lazily on first use and
+# patched in place by the attribute service after its writes commit. Those
+# writes also invalidate CACHE through the change feed, which makes every
+# other process reload its graph. A graph loaded while the feed is not
+# listening hears of no writes, so it is kept for _UNHEARD_TTL seconds only.
+
+CACHE = "compatibility_graph"
+
+
+def _bitset(ids: Iterable[int]) -> int:
+    ids = list(ids)
+    if not ids:
+        return 0
+    buf = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _members(mask: int) -> list[int]:
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+class IncompatibilityGraph:
+    __slots__ = ("_conflicts", "_names")
+
+    def __init__(self, names: dict[int, str], pairs: Iterable[tuple[int, int]]):
+        adjacency: dict[int, list[int]] = {}
+        for a, b in pairs:
+            adjacency.setdefault(a, []).append(b)
+            adjacency.setdefault(b, []).append(a)
+        self._conflicts = {attr: _bitset(ids) for attr, ids in adjacency.items()}
+        self._names = names
+
+    def __contains__(self, attribute_id: int) -> bool:
+        return attribute_id in self._names
+
+    def name(self, attribute_id: int) -> str:
+        return self._names[attribute_id]
+
+    def conflicting_ids(self, attribute_id: int, existing_ids: Iterable[int]) -> list[int]:
+        return _members(self._conflicts.get(attribute_id, 0) & _bitset(existing_ids))
+
+    def conflicts(self, attribute_id: int) -> list[int]:
+        return _members(self._conflicts.get(attribute_id, 0))
+
+    def add_attribute(self, attribute_id: int, name: str) -> None:
+        self._names[attribute_id] = name
+
+    def add_incompatibility(self, attribute_id_1: int, attribute_id_2: int) -> None:
+        self._conflicts[attribute_id_1] = self._conflicts.get(attribute_id_1, 0) | (1 << attribute_id_2)
+        self._conflicts[attribute_id_2] = self._conflicts.get(attribute_id_2, 0) | (1 << attribute_id_1)
+
+
+_graph: IncompatibilityGraph | None = None
+_generation = 0
+# time.monotonic() when the cached graph was loaded, and until when it is served
+_loaded_at = float("-inf")
+_expires_at = float("inf")
+_load_lock = asyncio.Lock()
+
+# An attribute missing from the graph reloads it at most once per
+# _MISS_WINDOW seconds; in between, only that attribute's rules are read in
+_MISS_WINDOW = 1.0
+_UNHEARD_TTL = 5.0
+
+
+async def get_graph(db: AsyncSession, attribute_id: int | None = None) -> IncompatibilityGraph:
+    if _graph is not None and time.monotonic() >= _expires_at:
+        invalidate()
+    graph = _graph
+    if graph is None:
+        return await _load(db)
+    if attribute_id is None or attribute_id in graph:
+        return graph
+
+    # Unknown here: either no such attribute (the caller reports it) or one
+    # created by another process, whose invalidation has not arrived yet
+    result = await db.execute(select(Attribute.name).where(Attribute.id == attribute_id))
+    name = result.scalar_one_or_none()
+    if name is None:
+        return graph
+    if time.monotonic() - _loaded_at >= _MISS_WINDOW:
+        invalidate()
+        return await _load(db)
+    pairs_result = await db.execute(
+        select(
+            AttributeIncompatibility.attribute_id_1,
+            AttributeIncompatibility.attribute_id_2,
+        ).where(
+            or_(
+                AttributeIncompatibility.attribute_id_1 == attribute_id,
+                AttributeIncompatibility.attribute_id_2 == attribute_id,
+            )
+        )
+    )
+    graph.add_attribute(attribute_id, name)
+    for attribute_id_1, attribute_id_2 in pairs_result:
+        graph.add_incompatibility(attribute_id_1, attribute_id_2)
+    return graph
+
+
+async def _load(db: AsyncSession) -> IncompatibilityGraph:
+    global _graph, _loaded_at, _expires_at
+    async with _load_lock:
+        if _graph is not None:
+            return _graph
+        generation = _generation
+        # Listening first: a rule committed after the load starts is then
+        # always heard of
+        listening = await change_feed.feed.listening()
+        loaded_at = time.monotonic()
+        names_result = await db.execute(select(Attribute.id, Attribute.name))
+        pairs_result = await db.execute(
+            select(
+                AttributeIncompatibility.attribute_id_1,
+                AttributeIncompatibility.attribute_id_2,
+            )
+        )
+        graph = IncompatibilityGraph(
+            dict(names_result.tuples().all()), pairs_result.tuples().all()
+        )
+        # A write committed while we were loading; serve this snapshot but
+        # let the next caller reload
+        if generation == _generation:
+            _graph = graph
+            _loaded_at = loaded_at
+            _expires_at = float("inf") if listening else loaded_at + _UNHEARD_TTL
+        return graph
+
+
+def invalidate() -> None:
+    global _graph, _generation
+    _graph = None
+    _generation += 1
+
+
+change_feed.feed.on_invalidate(CACHE, invalidate)
+
+
+def attribute_created(attribute_id: int, name: str) -> None:
+    if _load_lock.locked():
+        invalidate()
+    elif _graph is not None:
+        _graph.add_attribute(attribute_id, name)
+
+
+def incompatibility_created(attribute_id_1: int, attribute_id_2: int) -> None:
+    if _load_lock.locked():
+        invalidate()
+    elif _graph is not None:
+        _graph.add_incompatibility(attribute_id_1, attribute_id_2)
@@ -0,0 +1,131 @@
+import zlib
+from collections import defaultdict
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.database import async_session
+from app.models import (
+    Garment,
+    Material,
+    GarmentMaterial,
+    Attribute,
+    GarmentAttribute,
+    Supplier,
+    GarmentSupplier,
+)
+from app.schemas.garment import (
+    GarmentDetailResponse,
+    GarmentMaterialResponse,
+    GarmentAttributeResponse,
+    GarmentSupplierSummary,
+    GarmentVariationSummary,
+)
+
+# Catalog export streams garments from a server-side cursor in fixed-size
+# batches and loads each batch's children with one query per collection, so
+# memory stays bounded by the batch size rather than the catalog size.
+
+_BATCH_SIZE = 1000
+
+
+async def _load_children(db: AsyncSession, garment_ids: list[int]) -> tuple[dict, ...]:
+    materials = defaultdict(list)
+    result = await db.execute(
+        select(GarmentMaterial.garment_id, Material.id, Material.name, GarmentMaterial.percentage)
+        .join(Material, Material.id == GarmentMaterial.material_id)
+        .where(GarmentMaterial.garment_id.in_(garment_ids))
+    )
+    for garment_id, material_id, name, percentage in result.tuples():
+        materials[garment_id].append(
+            GarmentMaterialResponse(id=material_id, name=name, percentage=float(percentage))
+        )
+
+    attributes = defaultdict(list)
+    result = await db.execute(
+        select(GarmentAttribute.garment_id, Attribute.id, Attribute.name, Attribute.category)
+        .join(Attribute, Attribute.id == GarmentAttribute.attribute_id)
+        .where(GarmentAttribute.garment_id.in_(garment_ids))
+    )
+    for garment_id, attribute_id, name, category in result.tuples():
+        attributes[garment_id].append(
+            GarmentAttributeResponse(id=attribute_id, name=name, category=category)
+        )
+
+    suppliers = defaultdict(list)
+    result = await db.execute(
+        select(
+            GarmentSupplier.garment_id,
+            Supplier.id,
+            Supplier.name,
+            GarmentSupplier.status,
+            GarmentSupplier.offer_price,
+        )
+        .join(Supplier, Supplier.id == GarmentSupplier.supplier_id)
+        .where(GarmentSupplier.garment_id.in_(garment_ids))
+    )
+    for garment_id, supplier_id, name, status, offer_price in result.tuples():
+        suppliers[garment_id].append(
+            GarmentSupplierSummary(
+                supplier_id=supplier_id,
+                supplier_name=name,
+                status=status,
+                offer_price=float(offer_price) if offer_price is not None else None,
+            )
+        )
+
+    variations = defaultdict(list)
+    result = await db.execute(
+        select(Garment.parent_garment_id, Garment.id, Garment.name, Garment.lifecycle_stage)
+        .where(Garment.parent_garment_id.in_(garment_ids))
+    )
+    for parent_id, variation_id, name, stage in result.tuples():
+        variations[parent_id].append(
+            GarmentVariationSummary(id=variation_id, name=name, lifecycle_stage=stage)
+        )
+
+    return materials, attributes, suppliers, variations
+
+
+async def export_garments(stage: str | None = None) -> AsyncIterator[bytes]:
+    # Runs after the request handler returns, so it owns its session
+    async with async_session() as db:
+        stmt = select(
+            Garment.id,
+            Garment.name,
+            Garment.description,
+            Garment.lifecycle_stage,
+            Garment.parent_garment_id,
+            Garment.created_at,
+            Garment.updated_at,
+        ).order_by(Garment.id)
+        if stage:
+            stmt = stmt.where(Garment.lifecycle_stage == stage)
+
+        result = await db.stream(stmt.execution_options(yield_per=_BATCH_SIZE))
+        async for batch in result.partitions():
+            materials, attributes, suppliers, variations = await _load_children(
+                db, [row.id for row in batch]
+            )
+            lines = []
+            for row in batch:
+                document = GarmentDetailResponse(
+                    **row._mapping,
+                    materials=materials.get(row.id, []),
+                    attributes=attributes.get(row.id, []),
+                    suppliers=suppliers.get(row.id, []),
+                    variations=variations.get(row.id, []),
+                )
+                lines.append(document.model_dump_json().encode())
+                lines.append(b"\n")
+            yield b"".join(lines)
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
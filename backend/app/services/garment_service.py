@@ -1,5 +1,10 @@
+from datetime import datetime
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import (
+    Row, select, insert, update, delete, exists, func, literal, true, any_, bindparam, Integer
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert as pg_insert
 from sqlalchemy.orm import selectinload, joinedload
 
 from app.models import (
@@ -9,13 +14,54 @@ from app.models import (
     Attribute,
     GarmentAttribute,
     GarmentSupplier,
+    GarmentSearchDocument,
+)
+from app.schemas.garment import (
+    GarmentCreate,
+    GarmentUpdate,
+    GarmentResponse,
+    GarmentVariationCreate,
+    GarmentBulkTransitionResult,
+    GarmentTransitionRejection,
+    GarmentLineageNode,
+    GarmentMaterialResponse,
+    GarmentAttributeResponse,
 )
-from app.schemas.garment import GarmentCreate, GarmentUpdate, GarmentVariationCreate
 from app.schemas.material import GarmentMaterialCreate
 from app.schemas.attribute import GarmentAttributeCreate
-from app.exceptions import NotFoundError, DeletionProtectedError, ProductionProtectedError, ValidationError
-from app.services.lifecycle import validate_garment_transition
-from app.services.attribute_service import check_attribute_compatibility
+from app.exceptions import (
+    NotFoundError,
+    DeletionProtectedError,
+    ProductionProtectedError,
+    ValidationError,
+    AttributeConflictsError,
+    IncompatibleAttributeError,
+    InvalidTransitionError,
+)
+from app.services.lifecycle import (
+    GARMENT_TRANSITIONS,
+    garment_transition_sources,
+)
+from app.services.attribute_service import find_attribute_conflicts
+from app.services.pagination import keyset_paginate, split_page
+from app.services import (
+    search_service,
+    aggregate_service,
+    change_feed,
+    compatibility_graph,
+    history_service,
+    writes,
+)
+from app import records
+from app.records import GarmentRecord
+
+# Sortable columns for the garment list; each has a matching (column, id) index
+GARMENT_SORT_COLUMNS = {
+    "updated_at": Garment.updated_at,
+    "created_at": Garment.created_at,
+    "name": Garment.name,
+    "lifecycle_stage": Garment.lifecycle_stage,
+}
 
 
 def _ensure_not_production(garment: Garment, operation: str) -> None:
@@ -23,16 +69,74 @@ def _ensure_not_production(garment: Garment, operation: str) -> None:
         raise ProductionProtectedError(garment.name, operation)
 
 
+async def touch_garments(db: AsyncSession, garment_filter) -> None:
+    # Record a change to child rows shown in the garment detail; bumps
+    # updated_at (via onupdate) and children_version, which feed the ETag
+    await db.execute(
+        update(Garment)
+        .where(garment_filter)
+        .values(children_version=Garment.children_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _touch_parent(db: AsyncSession, garment: Garment) -> None:
+    # A variation's name and stage appear in its parent's detail
+    if garment.parent_garment_id is not None:
+        await touch_garments(db, Garment.id == garment.parent_garment_id)
+
+
 async def get_garments(
-    db: AsyncSession, stage: str | None = None, search: str | None = None
-) -> list[Garment]:
-    stmt = select(Garment)
+    db: AsyncSession,
+    stage: str | None = None,
+    search: str | None = None,
+    sort: str = "updated_at",
+    order: str = "desc",
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list[GarmentRecord], str | None]:
+    if search:
+        return await _search_garments(db, search, stage, limit, cursor)
+
+    sort_column = GARMENT_SORT_COLUMNS[sort]
+    descending = order == "desc"
+
+    stmt = select(*records.columns(Garment, GarmentRecord))
     if stage:
         stmt = stmt.where(Garment.lifecycle_stage == stage)
-    if search:
-        stmt = stmt.where(Garment.name.ilike(f"%{search}%"))
+    stmt = keyset_paginate(
+        stmt, sort_column, Garment.id, descending=descending, cursor=cursor, limit=limit
+    )
+    result = await db.execute(stmt)
+    rows, next_cursor = split_page(result.all(), limit, sort_column, descending)
+    return records.from_rows(GarmentRecord, rows), next_cursor
+
+
+async def _search_garments(
+    db: AsyncSession,
+    search: str,
+    stage: str | None,
+    limit: int,
+    cursor: str | None,
+) -> tuple[list[GarmentRecord], str | None]:
+    # Search hits are always ordered by relevance, best first
+    matches, rank = search_service.search_rank(search)
+    stmt = (
+        select(*records.columns(Garment, GarmentRecord), rank)
+        .join(GarmentSearchDocument, GarmentSearchDocument.garment_id == Garment.id)
+        .where(matches)
+    )
+    if stage:
+        stmt = stmt.where(Garment.lifecycle_stage == stage)
+    stmt = keyset_paginate(
+        stmt, rank, Garment.id, descending=True, cursor=cursor, limit=limit
+    )
     result = await db.execute(stmt)
-    return list(result.scalars().all())
+    rows, next_cursor = split_page(
+        result.all(), limit, rank, True, key=lambda row: (row.rank, row.id)
+    )
+    # Drop the trailing rank column
+    return records.from_rows(GarmentRecord, (row[:-1] for row in rows)), next_cursor
 
 
 async def get_garment(db: AsyncSession, garment_id: int) -> Garment:
@@ -52,31 +156,149 @@ async def get_garment(db: AsyncSession, garment_id: int) -> Garment:
     return garment
 
 
-async def create_garment(db: AsyncSession, data: GarmentCreate) -> Garment:
-    garment = Garment(name=data.name, description=data.description)
-    db.add(garment)
+async def _get_lineage(db: AsyncSession, garment_id: int) -> tuple[list[int], int]:
+    result = await db.execute(
+        select(Garment.lineage, Garment.lineage_depth).where(Garment.id == garment_id)
+    )
+    lineage = result.one_or_none()
+    if not lineage:
+        raise NotFoundError("Garment", garment_id)
+    return lineage.lineage, lineage.lineage_depth
+
+
+async def _lineage_page(
+    db: AsyncSession, stmt, depth: int, descending: bool, limit: int, cursor: str | None
+) -> tuple[list[GarmentLineageNode], str | None]:
+    stmt = keyset_paginate(
+        stmt, Garment.lineage_depth, Garment.id,
+        descending=descending, cursor=cursor, limit=limit,
+    )
+    result = await db.execute(stmt)
+    rows, next_cursor = split_page(result.all(), limit, Garment.lineage_depth, descending)
+    return [
+        GarmentLineageNode(
+            id=row.id,
+            name=row.name,
+            lifecycle_stage=row.lifecycle_stage,
+            parent_garment_id=row.parent_garment_id,
+            depth=abs(row.lineage_depth - depth),
+        )
+        for row in rows
+    ], next_cursor
+
+
+_LINEAGE_COLUMNS = (
+    Garment.id,
+    Garment.name,
+    Garment.lifecycle_stage,
+    Garment.parent_garment_id,
+    Garment.lineage_depth,
+)
+
+
+async def get_ancestors(
+    db: AsyncSession,
+    garment_id: int,
+    max_depth: int | None = None,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list[GarmentLineageNode], str | None]:
+    # Nearest first. The path already lists every ancestor, so this is a
+    # primary key lookup per row rather than a walk up the tree.
+    lineage, depth = await _get_lineage(db, garment_id)
+    if max_depth is not None:
+        lineage = lineage[-max_depth:]
+    stmt = select(*_LINEAGE_COLUMNS).where(
+        Garment.id == any_(bindparam("ancestor_ids", lineage, type_=ARRAY(Integer)))
+    )
+    return await _lineage_page(db, stmt, depth, True, limit, cursor)
+
+
+async def get_descendants(
+    db: AsyncSession,
+    garment_id: int,
+    max_depth: int | None = None,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list[GarmentLineageNode], str | None]:
+    # Generation by generation; rows come from the GIN index on lineage
+    _, depth = await _get_lineage(db, garment_id)
+    stmt = select(*_LINEAGE_COLUMNS).where(Garment.lineage.contains([garment_id]))
+    if max_depth is not None:
+        stmt = stmt.where(Garment.lineage_depth <= depth + max_depth)
+    return await _lineage_page(db, stmt, depth, False, limit, cursor)
+
+
+async def get_garment_version(db: AsyncSession, garment_id: int) -> tuple:
+    # Just the columns the detail ETag is derived from
+    result = await db.execute(
+        select(Garment.updated_at, Garment.children_version).where(Garment.id == garment_id)
+    )
+    version = result.one_or_none()
+    if not version:
+        raise NotFoundError("Garment", garment_id)
+    return tuple(version)
+
+
+async def create_garment(db: AsyncSession, data: GarmentCreate) -> Row:
+    garment = await writes.write(
+        db, insert(Garment).values(name=data.name, description=data.description)
+    )
+    await search_service.refresh_garment(db, garment.id)
+    await aggregate_service.adjust(
+        db, aggregate_service.GARMENT_STAGE, {garment.lifecycle_stage: 1}
+    )
+    change_feed.publish(
+        db,
+        "garment.created",
+        garment_id=garment.id,
+        garment=GarmentResponse.model_validate(garment),
+    )
     await db.commit()
-    await db.refresh(garment)
     return garment
 
 
-async def update_garment(
-    db: AsyncSession, garment_id: int, data: GarmentUpdate
-) -> Garment:
-    result = await db.execute(select(Garment).where(Garment.id == garment_id))
-    garment = result.scalar_one_or_none()
+async def _raise_unwritable(db: AsyncSession, garment_id: int, operation: str) -> None:
+    # A guarded write matched nothing: say why
+    result = await db.execute(
+        select(Garment.name, Garment.lifecycle_stage).where(Garment.id == garment_id)
+    )
+    garment = result.one_or_none()
     if not garment:
         raise NotFoundError("Garment", garment_id)
+    _ensure_not_production(garment, operation)
 
-    _ensure_not_production(garment, "update")
 
+async def update_garment(
+    db: AsyncSession, garment_id: int, data: GarmentUpdate
+) -> Row:
+    values = {}
     if data.name is not None:
-        garment.name = data.name
+        values["name"] = data.name
     if data.description is not None:
-        garment.description = data.description
-
+        values["description"] = data.description
+
+    # With nothing to change this still returns the row, without bumping
+    # updated_at
+    garment = await writes.write(
+        db,
+        update(Garment)
+        .where(Garment.id == garment_id, Garment.lifecycle_stage != "PRODUCTION")
+        .values(**values or {"updated_at": Garment.updated_at}),
+    )
+    if garment is None:
+        await _raise_unwritable(db, garment_id, "update")
+
+    if values:
+        await search_service.refresh_garment(db, garment_id)
+        await _touch_parent(db, garment)
+        change_feed.publish(
+            db,
+            "garment.updated",
+            garment_id=garment_id,
+            garment=GarmentResponse.model_validate(garment),
+        )
     await db.commit()
-    await db.refresh(garment)
     return garment
 
 
@@ -89,153 +311,484 @@ async def delete_garment(db: AsyncSession, garment_id: int) -> None:
     if garment.lifecycle_stage == "PRODUCTION":
         raise DeletionProtectedError(garment.name)
 
+    await aggregate_service.garment_removed(db, garment)
+    await _touch_parent(db, garment)
+    # Its variations become roots: drop this garment and everything above it
+    # from their subtrees' paths
+    await db.execute(
+        update(Garment)
+        .where(Garment.lineage.contains([garment_id]))
+        .values(
+            lineage=Garment.lineage[garment.lineage_depth + 2 : Garment.lineage_depth],
+            lineage_depth=Garment.lineage_depth - garment.lineage_depth - 1,
+            updated_at=Garment.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
     await db.delete(garment)
+    change_feed.publish(
+        db, "garment.deleted", garment_id=garment_id, parent_garment_id=garment.parent_garment_id
+    )
     await db.commit()
 
 
+def _stage_pre_image(garment_filter, target_stage: str):
+    # Locked current stage, and when it was entered, of the garments that may
+    # move to target_stage
+    return (
+        select(
+            Garment.id,
+            Garment.lifecycle_stage,
+            func.coalesce(Garment.stage_entered_at, Garment.created_at).label("entered_at"),
+        )
+        .where(garment_filter, Garment.lifecycle_stage.in_(garment_transition_sources(target_stage)))
+        .with_for_update()
+        .subquery()
+    )
+
+
 async def transition_garment(
     db: AsyncSession, garment_id: int, target_stage: str
-) -> Garment:
-    result = await db.execute(select(Garment).where(Garment.id == garment_id))
-    garment = result.scalar_one_or_none()
-    if not garment:
-        raise NotFoundError("Garment", garment_id)
+) -> Row:
+    # Validated in the WHERE clause, as in transition_garments; the locked
+    # pre-image supplies the previous stage for the dashboard counts and when
+    # it was entered for the history
+    previous = _stage_pre_image(Garment.id == garment_id, target_stage)
+    now = datetime.utcnow()
+    garment = await writes.write(
+        db,
+        update(Garment)
+        .where(Garment.id == previous.c.id)
+        .values(lifecycle_stage=target_stage, stage_entered_at=now, updated_at=now),
+        previous.c.lifecycle_stage.label("previous_stage"),
+        previous.c.entered_at.label("previous_entered_at"),
+    )
+    if garment is None:
+        result = await db.execute(
+            select(Garment.lifecycle_stage).where(Garment.id == garment_id)
+        )
+        current = result.scalar_one_or_none()
+        if current is None:
+            raise NotFoundError("Garment", garment_id)
+        raise InvalidTransitionError(
+            current, target_stage, sorted(GARMENT_TRANSITIONS.get(current, set()))
+        )
 
-    validate_garment_transition(garment.lifecycle_stage, target_stage)
-    garment.lifecycle_stage = target_stage
+    await aggregate_service.moved(
+        db, aggregate_service.GARMENT_STAGE, garment.previous_stage, target_stage
+    )
+    await history_service.record(
+        db,
+        history_service.GARMENT,
+        [
+            {
+                "garment_id": garment_id,
+                "from_state": garment.previous_stage,
+                "to_state": target_stage,
+                "entered_at": garment.previous_entered_at,
+                "transitioned_at": now,
+            }
+        ],
+    )
+    await _touch_parent(db, garment)
+    change_feed.publish(
+        db,
+        "garment.transitioned",
+        garment_id=garment_id,
+        lifecycle_stage=target_stage,
+        previous_stage=garment.previous_stage,
+        updated_at=garment.updated_at,
+    )
     await db.commit()
-    await db.refresh(garment)
     return garment
 
 
+async def transition_garments(
+    db: AsyncSession, garment_ids: list[int], target_stage: str
+) -> GarmentBulkTransitionResult:
+    garment_ids = sorted(set(garment_ids))
+    ids = bindparam("garment_ids", garment_ids, type_=ARRAY(Integer))
+
+    # Validation happens in the WHERE clause: only garments whose current
+    # stage may move to the target are updated. The locked pre-image supplies
+    # the previous stage for the dashboard counts and the history.
+    previous = _stage_pre_image(Garment.id == any_(ids), target_stage)
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(Garment)
+        .where(Garment.id == previous.c.id)
+        .values(lifecycle_stage=target_stage, stage_entered_at=now, updated_at=now)
+        .returning(Garment.id, previous.c.lifecycle_stage, previous.c.entered_at)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.tuples().all()
+    transitioned = sorted(garment_id for garment_id, _, _ in rows)
+    await aggregate_service.moved_many(
+        db, aggregate_service.GARMENT_STAGE, (stage for _, stage, _ in rows), target_stage
+    )
+    await history_service.record(
+        db,
+        history_service.GARMENT,
+        [
+            {
+                "garment_id": garment_id,
+                "from_state": stage,
+                "to_state": target_stage,
+                "entered_at": entered_at,
+                "transitioned_at": now,
+            }
+            for garment_id, stage, entered_at in rows
+        ],
+    )
+    if transitioned:
+        await touch_garments(
+            db,
+            Garment.id.in_(
+                select(Garment.parent_garment_id).where(
+                    Garment.id == any_(bindparam("transitioned", transitioned, type_=ARRAY(Integer)))
+                )
+            ),
+        )
+
+    rejected = []
+    if len(transitioned) < len(garment_ids):
+        remaining = sorted(set(garment_ids) - set(transitioned))
+        result = await db.execute(
+            select(Garment.id, Garment.lifecycle_stage).where(
+                Garment.id == any_(bindparam("remaining", remaining, type_=ARRAY(Integer)))
+            )
+        )
+        stages = dict(result.tuples().all())
+        for garment_id in remaining:
+            if garment_id not in stages:
+                error = NotFoundError("Garment", garment_id)
+            else:
+                current = stages[garment_id]
+                error = InvalidTransitionError(
+                    current, target_stage, sorted(GARMENT_TRANSITIONS.get(current, set()))
+                )
+            rejected.append(
+                GarmentTransitionRejection(
+                    garment_id=garment_id, error=error.error_code, detail=error.detail
+                )
+            )
+
+    if transitioned:
+        # One event for the batch; per-garment events would flood subscribers
+        change_feed.publish(
+            db, "garments.changed", count=len(transitioned), lifecycle_stage=target_stage
+        )
+    await db.commit()
+    return GarmentBulkTransitionResult(
+        target_stage=target_stage, transitioned=transitioned, rejected=rejected
+    )
+
+
 async def create_variation(
     db: AsyncSession, parent_id: int, data: GarmentVariationCreate
-) -> Garment:
-    result = await db.execute(select(Garment).where(Garment.id == parent_id))
-    parent = result.scalar_one_or_none()
+) -> Row:
+    result = await db.execute(
+        select(Garment.lineage, Garment.lineage_depth).where(Garment.id == parent_id)
+    )
+    parent = result.one_or_none()
     if not parent:
         raise NotFoundError("Garment", parent_id)
 
-    variation = Garment(
-        name=data.name,
-        description=data.description,
-        parent_garment_id=parent_id,
+    variation = await writes.write(
+        db,
+        insert(Garment).values(
+            name=data.name,
+            description=data.description,
+            parent_garment_id=parent_id,
+            lineage=[*parent.lineage, parent_id],
+            lineage_depth=parent.lineage_depth + 1,
+        ),
+    )
+    await search_service.refresh_garment(db, variation.id)
+    await aggregate_service.adjust(
+        db, aggregate_service.GARMENT_STAGE, {variation.lifecycle_stage: 1}
+    )
+    await touch_garments(db, Garment.id == parent_id)
+    change_feed.publish(
+        db,
+        "garment.created",
+        garment_id=variation.id,
+        garment=GarmentResponse.model_validate(variation),
     )
-    db.add(variation)
     await db.commit()
-    await db.refresh(variation)
     return variation
 
 
-async def add_material(
-    db: AsyncSession, garment_id: int, data: GarmentMaterialCreate
-) -> GarmentMaterial:
-    # Verify garment exists
-    result = await db.execute(select(Garment).where(Garment.id == garment_id))
-    garment = result.scalar_one_or_none()
-    if not garment:
+# Single-statement child mutations. The garment row is read in a CTE that
+# gates the write; the mutation's RETURNING feeds a second CTE that touches
+# the garment, and the outer SELECT reports what each check found so a
+# failure maps to the same error as before without another round trip.
+
+
+def _garment_cte(garment_id: int):
+    return (
+        select(Garment.id, Garment.name, Garment.lifecycle_stage)
+        .where(Garment.id == garment_id)
+        .cte("garment")
+    )
+
+
+def _writable(garment):
+    return select(garment.c.id).where(garment.c.lifecycle_stage != "PRODUCTION")
+
+
+def _garment_columns(garment) -> tuple:
+    return (
+        select(garment.c.name).scalar_subquery().label("name"),
+        select(garment.c.lifecycle_stage).scalar_subquery().label("lifecycle_stage"),
+    )
+
+
+def _touch_changed(changed):
+    # touch_garments for the garments the mutation returned. Column
+    # onupdate defaults are not applied inside a CTE, so updated_at is set here.
+    return (
+        update(Garment)
+        .where(Garment.id.in_(select(changed.c.garment_id)))
+        .values(children_version=Garment.children_version + 1, updated_at=datetime.utcnow())
+        .returning(Garment.id)
+        .cte("touched")
+    )
+
+
+def _check_garment(row, garment_id: int, operation: str) -> None:
+    if row.name is None:
         raise NotFoundError("Garment", garment_id)
-    _ensure_not_production(garment, "add material")
+    _ensure_not_production(row, operation)
 
-    # Verify material exists
-    result = await db.execute(select(Material).where(Material.id == data.material_id))
-    if not result.scalar_one_or_none():
-        raise NotFoundError("Material", data.material_id)
 
-    # Check total percentage
-    result = await db.execute(
-        select(func.coalesce(func.sum(GarmentMaterial.percentage), 0)).where(
-            GarmentMaterial.garment_id == garment_id
+async def add_material(
+    db: AsyncSession, garment_id: int, data: GarmentMaterialCreate
+) -> GarmentMaterialResponse:
+    # One statement: the existence, production and composition checks gate
+    # the insert, and the result says which of them failed, if any
+    garment = _garment_cte(garment_id)
+    material = (
+        select(Material.id, Material.name).where(Material.id == data.material_id).cte("material")
+    )
+    total = (
+        select(func.coalesce(func.sum(GarmentMaterial.percentage), 0).label("total"))
+        .where(GarmentMaterial.garment_id == garment_id)
+        .cte("total")
+    )
+    percentage = literal(data.percentage, GarmentMaterial.percentage.type)
+    inserted = (
+        insert(GarmentMaterial)
+        .from_select(
+            ["garment_id", "material_id", "percentage"],
+            select(garment.c.id, material.c.id, percentage)
+            .select_from(garment.join(material, true()).join(total, true()))
+            .where(
+                garment.c.lifecycle_stage != "PRODUCTION",
+                total.c.total + percentage <= 100,
+            ),
         )
+        .returning(GarmentMaterial.garment_id, GarmentMaterial.percentage)
+        .cte("inserted")
+    )
+    result = await db.execute(
+        select(
+            *_garment_columns(garment),
+            select(material.c.name).scalar_subquery().label("material_name"),
+            select(total.c.total).scalar_subquery().label("total"),
+            select(inserted.c.percentage).scalar_subquery().label("percentage"),
+        ).add_cte(_touch_changed(inserted))
     )
-    current_total = float(result.scalar_one())
-    if current_total + data.percentage > 100:
+    row = result.one()
+    _check_garment(row, garment_id, "add material")
+    if row.material_name is None:
+        raise NotFoundError("Material", data.material_id)
+    if row.percentage is None:
+        current_total = float(row.total)
         raise ValidationError(
             f"Total material percentage would exceed 100% "
             f"(current: {current_total}%, adding: {data.percentage}%)"
         )
 
-    gm = GarmentMaterial(
-        garment_id=garment_id,
-        material_id=data.material_id,
-        percentage=data.percentage,
+    material = GarmentMaterialResponse(
+        id=data.material_id, name=row.material_name, percentage=float(row.percentage)
     )
-    db.add(gm)
+    await search_service.refresh_garment(db, garment_id)
+    change_feed.publish(db, "garment.material_added", garment_id=garment_id, material=material)
     await db.commit()
-    await db.refresh(gm)
-    return gm
+    return material
 
 
 async def remove_material(
     db: AsyncSession, garment_id: int, material_id: int
 ) -> None:
-    # Verify garment exists and not in production
-    result = await db.execute(select(Garment).where(Garment.id == garment_id))
-    garment = result.scalar_one_or_none()
-    if not garment:
-        raise NotFoundError("Garment", garment_id)
-    _ensure_not_production(garment, "remove material")
-
-    result = await db.execute(
-        select(GarmentMaterial).where(
-            GarmentMaterial.garment_id == garment_id,
+    garment = _garment_cte(garment_id)
+    deleted = (
+        delete(GarmentMaterial)
+        .where(
+            GarmentMaterial.garment_id.in_(_writable(garment)),
             GarmentMaterial.material_id == material_id,
         )
+        .returning(GarmentMaterial.garment_id)
+        .cte("deleted")
+    )
+    result = await db.execute(
+        select(
+            *_garment_columns(garment), exists(select(deleted)).label("deleted")
+        ).add_cte(_touch_changed(deleted))
     )
-    gm = result.scalar_one_or_none()
-    if not gm:
+    row = result.one()
+    _check_garment(row, garment_id, "remove material")
+    if not row.deleted:
         raise NotFoundError("GarmentMaterial", 0)
 
-    await db.delete(gm)
+    await search_service.refresh_garment(db, garment_id)
+    change_feed.publish(
+        db, "garment.material_removed", garment_id=garment_id, material_id=material_id
+    )
     await db.commit()
 
 
 async def add_attribute(
     db: AsyncSession, garment_id: int, data: GarmentAttributeCreate
-) -> GarmentAttribute:
-    # Verify garment exists
-    result = await db.execute(select(Garment).where(Garment.id == garment_id))
-    garment = result.scalar_one_or_none()
-    if not garment:
-        raise NotFoundError("Garment", garment_id)
-    _ensure_not_production(garment, "add attribute")
-
-    # Verify attribute exists
+) -> GarmentAttributeResponse:
+    # One statement, as in add_material. The attributes that conflict with
+    # this one come from the cached incompatibility graph, so the statement
+    # only looks for them among the garment's attributes. Those attributes
+    # are only read by the statement itself, so the bitset AND cannot run
+    # first; the conflict set is bound as an id array instead.
+    graph = await compatibility_graph.get_graph(db, data.attribute_id)
+    garment = _garment_cte(garment_id)
+    attribute = (
+        select(Attribute.id, Attribute.name, Attribute.category)
+        .where(Attribute.id == data.attribute_id)
+        .cte("attribute")
+    )
+    conflicts = (
+        select(Attribute.id, Attribute.name)
+        .join(GarmentAttribute, GarmentAttribute.attribute_id == Attribute.id)
+        .where(
+            GarmentAttribute.garment_id == garment_id,
+            Attribute.id
+            == any_(
+                bindparam("conflicting_ids", graph.conflicts(data.attribute_id), type_=ARRAY(Integer))
+            ),
+        )
+        .cte("conflicts")
+    )
+    inserted = (
+        insert(GarmentAttribute)
+        .from_select(
+            ["garment_id", "attribute_id"],
+            select(garment.c.id, attribute.c.id)
+            .select_from(garment.join(attribute, true()))
+            .where(garment.c.lifecycle_stage != "PRODUCTION", ~exists(select(conflicts))),
+        )
+        .returning(GarmentAttribute.garment_id)
+        .cte("inserted")
+    )
     result = await db.execute(
-        select(Attribute).where(Attribute.id == data.attribute_id)
+        select(
+            *_garment_columns(garment),
+            select(attribute.c.name).scalar_subquery().label("attribute_name"),
+            select(attribute.c.category).scalar_subquery().label("category"),
+            select(func.array_agg(aggregate_order_by(conflicts.c.name, conflicts.c.id)))
+            .scalar_subquery()
+            .label("conflicting_names"),
+        ).add_cte(_touch_changed(inserted))
     )
-    if not result.scalar_one_or_none():
+    row = result.one()
+    _check_garment(row, garment_id, "add attribute")
+    if row.attribute_name is None:
         raise NotFoundError("Attribute", data.attribute_id)
+    if row.conflicting_names:
+        raise IncompatibleAttributeError(row.attribute_name, row.conflicting_names)
+
+    attribute = GarmentAttributeResponse(
+        id=data.attribute_id, name=row.attribute_name, category=row.category
+    )
+    await search_service.refresh_garment(db, garment_id)
+    change_feed.publish(db, "garment.attribute_added", garment_id=garment_id, attribute=attribute)
+    await db.commit()
+    return attribute
 
-    # Check compatibility
-    await check_attribute_compatibility(db, garment_id, data.attribute_id)
 
-    ga = GarmentAttribute(garment_id=garment_id, attribute_id=data.attribute_id)
-    db.add(ga)
+async def add_attributes(
+    db: AsyncSession, garment_ids: list[int], attribute_ids: list[int]
+) -> int:
+    garment_ids = sorted(set(garment_ids))
+    attribute_ids = sorted(set(attribute_ids))
+
+    # Verify garments exist and none are in production
+    result = await db.execute(
+        select(Garment.id, Garment.name, Garment.lifecycle_stage).where(
+            Garment.id.in_(garment_ids)
+        )
+    )
+    garments = {row.id: row for row in result.all()}
+    for garment_id in garment_ids:
+        if garment_id not in garments:
+            raise NotFoundError("Garment", garment_id)
+        _ensure_not_production(garments[garment_id], "add attribute")
+
+    # Verify attributes exist
+    result = await db.execute(select(Attribute.id).where(Attribute.id.in_(attribute_ids)))
+    found = set(result.scalars().all())
+    for attribute_id in attribute_ids:
+        if attribute_id not in found:
+            raise NotFoundError("Attribute", attribute_id)
+
+    conflicts = await find_attribute_conflicts(db, garment_ids, attribute_ids)
+    if conflicts:
+        raise AttributeConflictsError(conflicts)
+
+    # Every (garment, attribute) pair; pairs already present are left alone
+    result = await db.execute(
+        pg_insert(GarmentAttribute)
+        .from_select(
+            ["garment_id", "attribute_id"],
+            select(Garment.id, Attribute.id).where(
+                Garment.id.in_(garment_ids), Attribute.id.in_(attribute_ids)
+            ),
+        )
+        .on_conflict_do_nothing(constraint="uq_garment_attribute")
+    )
+    await search_service.refresh_search_documents(db, Garment.id.in_(garment_ids))
+    if result.rowcount:
+        await touch_garments(db, Garment.id.in_(garment_ids))
+        if len(garment_ids) == 1:
+            change_feed.publish(db, "garment.changed", garment_id=garment_ids[0])
+        else:
+            change_feed.publish(db, "garments.changed", count=len(garment_ids))
     await db.commit()
-    await db.refresh(ga)
-    return ga
+    return result.rowcount
 
 
 async def remove_attribute(
     db: AsyncSession, garment_id: int, attribute_id: int
 ) -> None:
-    # Verify garment exists and not in production
-    result = await db.execute(select(Garment).where(Garment.id == garment_id))
-    garment = result.scalar_one_or_none()
-    if not garment:
-        raise NotFoundError("Garment", garment_id)
-    _ensure_not_production(garment, "remove attribute")
-
-    result = await db.execute(
-        select(GarmentAttribute).where(
-            GarmentAttribute.garment_id == garment_id,
+    garment = _garment_cte(garment_id)
+    deleted = (
+        delete(GarmentAttribute)
+        .where(
+            GarmentAttribute.garment_id.in_(_writable(garment)),
             GarmentAttribute.attribute_id == attribute_id,
         )
+        .returning(GarmentAttribute.garment_id)
+        .cte("deleted")
     )
-    ga = result.scalar_one_or_none()
-    if not ga:
+    result = await db.execute(
+        select(
+            *_garment_columns(garment), exists(select(deleted)).label("deleted")
+        ).add_cte(_touch_changed(deleted))
+    )
+    row = result.one()
+    _check_garment(row, garment_id, "remove attribute")
+    if not row.deleted:
         raise NotFoundError("GarmentAttribute", 0)
 
-    await db.delete(ga)
+    await search_service.refresh_garment(db, garment_id)
+    change_feed.publish(
+        db, "garment.attribute_removed", garment_id=garment_id, attribute_id=attribute_id
+    )
     await db.commit()
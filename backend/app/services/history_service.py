@@ -0,0 +1,325 @@
+import bisect
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import DDL, event, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import TransitionHistory, TransitionRollup
+from app.schemas.dashboard import (
+    DurationBucket,
+    StageThroughput,
+    ThroughputWeek,
+    TimeInStage,
+    TimeInStageDistribution,
+    TransitionThroughput,
+)
+
+# Transition history and its rollups.
+#
+# Services call record() with each transition in the transaction that makes
+# it; just before that transaction commits, one statement appends the history
+# rows and adds them to the weekly rollups. Every transition of the week
+# between the same two states updates the same rollup row, so the upsert
+# comes last, holding those row locks only through COMMIT, and in key order,
+# so concurrent transactions cannot deadlock on them. The analytics below read
+# only the rollups, whose size grows with weeks, not transitions. Time in a
+# stage is counted when the stage is left.
+
+log = logging.getLogger(__name__)
+
+GARMENT = "garment"
+SUPPLIER = "supplier"
+
+# Upper bounds, in seconds, of the time-in-stage buckets; the last bucket is
+# open-ended
+DURATION_BUCKETS = [
+    3600,  # 1 hour
+    6 * 3600,
+    86400,  # 1 day
+    3 * 86400,
+    7 * 86400,
+    14 * 86400,
+    30 * 86400,
+    60 * 86400,
+    90 * 86400,
+    180 * 86400,
+    365 * 86400,
+]
+
+# Monthly history partitions created ahead of time; rows past them land in
+# the DEFAULT partition
+_MONTHS_AHEAD = 12
+
+# Months this process has seen a partition for
+_partitioned: set[date] = set()
+
+# Months whose partition could not be created, with when (time.monotonic()):
+# record() tries them again only after _RETRY_FAILED seconds, not on every
+# transition
+_failed: dict[date, float] = {}
+_RETRY_FAILED = 3600.0
+
+_PENDING = "transition_history_pending"
+
+
+def _month(moment: datetime) -> date:
+    return moment.date().replace(day=1)
+
+
+def _week(moment: datetime) -> date:
+    day = moment.date()
+    return day - timedelta(days=day.weekday())
+
+
+async def record(db: AsyncSession, entity: str, transitions: list[dict]) -> None:
+    # Written when the caller commits; dropped if it rolls back. Each
+    # transition has garment_id, supplier_id (suppliers only), from_state,
+    # to_state, entered_at and transitioned_at.
+    if not transitions:
+        return
+    now = time.monotonic()
+    months = {
+        month
+        for month in {_month(t["transitioned_at"]) for t in transitions} - _partitioned
+        if now - _failed.get(month, float("-inf")) >= _RETRY_FAILED
+    }
+    if months:
+        # A new month since this process last looked: moves the horizon on
+        await _extend_partitions(db, months)
+    pending = db.sync_session.info.setdefault(_PENDING, defaultdict(list))
+    pending[entity].extend(transitions)
+
+
+@event.listens_for(Session, "before_commit")
+def _write(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    for entity, transitions in sorted((pending or {}).items()):
+        session.execute(_statement(entity, transitions))
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard(session: Session, transaction) -> None:
+    # Rolled back (or closed) with transitions still pending
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+def _statement(entity: str, transitions: list[dict]):
+    history = []
+    rollups: dict[tuple, list] = defaultdict(lambda: [0, 0.0])
+    for t in transitions:
+        history.append({"entity": entity, "supplier_id": None, **t})
+        seconds = max((t["transitioned_at"] - t["entered_at"]).total_seconds(), 0.0)
+        key = (
+            _week(t["transitioned_at"]),
+            t["from_state"],
+            t["to_state"],
+            bisect.bisect_right(DURATION_BUCKETS, seconds),
+        )
+        rollups[key][0] += 1
+        rollups[key][1] += seconds
+
+    # Upserted rows are grouped above: ON CONFLICT may touch a row only once
+    # per statement
+    stmt = pg_insert(TransitionRollup).values(
+        [
+            {
+                "entity": entity,
+                "week": week,
+                "from_state": from_state,
+                "to_state": to_state,
+                "bucket": bucket,
+                "count": count,
+                "total_seconds": seconds,
+            }
+            for (week, from_state, to_state, bucket), (count, seconds) in sorted(rollups.items())
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            TransitionRollup.entity,
+            TransitionRollup.week,
+            TransitionRollup.from_state,
+            TransitionRollup.to_state,
+            TransitionRollup.bucket,
+        ],
+        set_={
+            "count": TransitionRollup.count + stmt.excluded.count,
+            "total_seconds": TransitionRollup.total_seconds + stmt.excluded.total_seconds,
+        },
+    )
+    # The history INSERT rides along as a data-modifying CTE: one round trip
+    return stmt.add_cte(insert(TransitionHistory).values(history).cte("history"))
+
+
+async def ensure_partitions(conn: AsyncConnection, today: date | None = None) -> None:
+    # Monthly partitions from today's month through _MONTHS_AHEAD ahead.
+    # Run at startup by the app and the worker, and by record() on the first
+    # transition of each month, so the horizon keeps moving in long-running
+    # processes.
+    today = today or datetime.utcnow().date()
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'transition_history'::regclass"
+        )
+    )
+    existing = set(result.scalars())
+    month = today.replace(day=1)
+    for _ in range(_MONTHS_AHEAD + 1):
+        following = (month + timedelta(days=32)).replace(day=1)
+        name = f"transition_history_{month:%Y_%m}"
+        if name not in existing:
+            ddl = DDL(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF transition_history "
+                f"FOR VALUES FROM ('{month}') TO ('{following}')"
+            )
+            try:
+                async with conn.begin_nested():
+                    await conn.execute(ddl)
+            except DBAPIError as exc:
+                # The DEFAULT partition already holds rows for this month; the
+                # traceback only the first time
+                log.warning(
+                    "could not create history partition for %s: %s",
+                    month,
+                    exc.orig,
+                    exc_info=month not in _failed,
+                )
+                _failed[month] = time.monotonic()
+                month = following
+                continue
+        _partitioned.add(month)
+        _failed.pop(month, None)
+        month = following
+
+    stray = (
+        await conn.execute(text("SELECT count(*) FROM transition_history_default"))
+    ).scalar_one()
+    if stray:
+        log.warning(
+            "%s transition history rows are in the DEFAULT partition; their months "
+            "need partitions, with the rows moved into them",
+            stray,
+        )
+
+
+async def _extend_partitions(db: AsyncSession, months: set[date]) -> None:
+    # On a connection of its own: the DDL locks the parent table only for its
+    # own short transaction, and a failure leaves the caller's alone. Rows
+    # for a month still without a partition land in DEFAULT.
+    try:
+        async with db.bind.begin() as conn:
+            await conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+            for month in sorted(months):
+                await ensure_partitions(conn, month)
+    except DBAPIError:
+        log.warning("could not extend history partitions", exc_info=True)
+        failed_at = time.monotonic()
+        for month in months:
+            _failed[month] = failed_at
+
+
+def _weeks_filter(stmt, since: date | None, until: date | None):
+    # Whole weeks: those containing since through until
+    if since:
+        stmt = stmt.where(TransitionRollup.week >= since - timedelta(days=since.weekday()))
+    if until:
+        stmt = stmt.where(TransitionRollup.week <= until)
+    return stmt
+
+
+def _percentile(buckets: list[tuple[int, int, float]], total: int, q: float) -> int | None:
+    # Upper bound of the bucket holding the q-th duration; None when that is
+    # the open-ended last bucket
+    seen = 0
+    for bucket, count, _ in buckets:
+        seen += count
+        if seen >= q * total:
+            return DURATION_BUCKETS[bucket] if bucket < len(DURATION_BUCKETS) else None
+    return None
+
+
+async def get_time_in_stage(
+    db: AsyncSession, entity: str, since: date | None = None, until: date | None = None
+) -> TimeInStageDistribution:
+    stmt = (
+        select(
+            TransitionRollup.from_state,
+            TransitionRollup.bucket,
+            func.sum(TransitionRollup.count),
+            func.sum(TransitionRollup.total_seconds),
+        )
+        .where(TransitionRollup.entity == entity)
+        .group_by(TransitionRollup.from_state, TransitionRollup.bucket)
+        .order_by(TransitionRollup.from_state, TransitionRollup.bucket)
+    )
+    result = await db.execute(_weeks_filter(stmt, since, until))
+    by_state: dict[str, list[tuple[int, int, float]]] = defaultdict(list)
+    for state, bucket, count, seconds in result.tuples():
+        by_state[state].append((bucket, int(count), seconds))
+
+    stages = []
+    for state, buckets in by_state.items():
+        total = sum(count for _, count, _ in buckets)
+        counts = {bucket: count for bucket, count, _ in buckets}
+        stages.append(
+            TimeInStage(
+                state=state,
+                count=total,
+                mean_seconds=sum(seconds for _, _, seconds in buckets) / total,
+                p50_seconds=_percentile(buckets, total, 0.5),
+                p90_seconds=_percentile(buckets, total, 0.9),
+                buckets=[
+                    DurationBucket(
+                        min_seconds=DURATION_BUCKETS[i - 1] if i else 0,
+                        max_seconds=DURATION_BUCKETS[i] if i < len(DURATION_BUCKETS) else None,
+                        count=counts.get(i, 0),
+                    )
+                    for i in range(len(DURATION_BUCKETS) + 1)
+                ],
+            )
+        )
+    return TimeInStageDistribution(entity=entity, since=since, until=until, stages=stages)
+
+
+async def get_throughput(
+    db: AsyncSession, entity: str, since: date | None = None, until: date | None = None
+) -> TransitionThroughput:
+    # Entries into and exits from each state per week, from one grouped scan
+    stmt = (
+        select(
+            TransitionRollup.week,
+            TransitionRollup.from_state,
+            TransitionRollup.to_state,
+            func.sum(TransitionRollup.count),
+        )
+        .where(TransitionRollup.entity == entity)
+        .group_by(TransitionRollup.week, TransitionRollup.from_state, TransitionRollup.to_state)
+        .order_by(TransitionRollup.week)
+    )
+    result = await db.execute(_weeks_filter(stmt, since, until))
+    weeks: dict[date, dict[str, list[int]]] = {}
+    for week, from_state, to_state, count in result.tuples():
+        states = weeks.setdefault(week, defaultdict(lambda: [0, 0]))
+        states[to_state][0] += count
+        states[from_state][1] += count
+    return TransitionThroughput(
+        entity=entity,
+        weeks=[
+            ThroughputWeek(
+                week=week,
+                stages=[
+                    StageThroughput(state=state, entered=entered, exited=exited)
+                    for state, (entered, exited) in sorted(states.items())
+                ],
+            )
+            for week, states in weeks.items()
+        ],
+    )
@@ -0,0 +1,308 @@
+import codecs
+import csv
+import json
+from decimal import Decimal
+from typing import AsyncIterator
+
+import pydantic
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text, table, column
+
+from app.models import Garment
+from app.schemas.garment import GarmentImportRow, GarmentImportError, GarmentImportResult
+from app.services import search_service, aggregate_service, change_feed
+
+# Bulk garment import.
+#
+# Rows are parsed from the request stream in batches and COPY'd into
+# transaction-scoped staging tables. Business rules that need the database
+# (known ids, composition total, incompatible attributes) are then checked
+# set-wise in SQL, and only rows without errors are inserted into the real
+# tables, so one bad row never aborts the batch.
+
+_BATCH_SIZE = 5000
+
+_CREATE_STAGING = [
+    """
+    CREATE TEMPORARY TABLE import_garments (
+        row_no integer PRIMARY KEY,
+        name text NOT NULL,
+        description text,
+        lifecycle_stage text NOT NULL,
+        garment_id integer
+    ) ON COMMIT DROP
+    """,
+    """
+    CREATE TEMPORARY TABLE import_materials (
+        row_no integer NOT NULL,
+        material_id integer NOT NULL,
+        percentage numeric(5, 2) NOT NULL
+    ) ON COMMIT DROP
+    """,
+    """
+    CREATE TEMPORARY TABLE import_attributes (
+        row_no integer NOT NULL,
+        attribute_id integer NOT NULL
+    ) ON COMMIT DROP
+    """,
+    """
+    CREATE TEMPORARY TABLE import_errors (
+        row_no integer NOT NULL,
+        detail text NOT NULL
+    ) ON COMMIT DROP
+    """,
+]
+
+_VALIDATE = """
+INSERT INTO import_errors (row_no, detail)
+SELECT m.row_no, 'Material with ID ' || m.material_id || ' not found'
+FROM import_materials m
+LEFT JOIN materials mat ON mat.id = m.material_id
+WHERE mat.id IS NULL
+UNION ALL
+SELECT row_no, 'Material with ID ' || material_id || ' is listed more than once'
+FROM import_materials
+GROUP BY row_no, material_id
+HAVING count(*) > 1
+UNION ALL
+SELECT row_no, 'Total material percentage would exceed 100% (total: ' || sum(percentage) || '%)'
+FROM import_materials
+GROUP BY row_no
+HAVING sum(percentage) > 100
+UNION ALL
+SELECT a.row_no, 'Attribute with ID ' || a.attribute_id || ' not found'
+FROM import_attributes a
+LEFT JOIN attributes attr ON attr.id = a.attribute_id
+WHERE attr.id IS NULL
+UNION ALL
+SELECT row_no, 'Attribute with ID ' || attribute_id || ' is listed more than once'
+FROM import_attributes
+GROUP BY row_no, attribute_id
+HAVING count(*) > 1
+UNION ALL
+SELECT a.row_no, 'Attribute ''' || a1.name || ''' is incompatible with ''' || a2.name || ''''
+FROM import_attributes a
+JOIN import_attributes b
+  ON b.row_no = a.row_no AND a.attribute_id < b.attribute_id
+JOIN attribute_incompatibilities r
+  ON r.attribute_id_1 = a.attribute_id AND r.attribute_id_2 = b.attribute_id
+JOIN attributes a1 ON a1.id = a.attribute_id
+JOIN attributes a2 ON a2.id = b.attribute_id
+"""
+
+_ASSIGN_IDS = """
+UPDATE import_garments g
+SET garment_id = nextval(pg_get_serial_sequence('garments', 'id'))
+WHERE NOT EXISTS (SELECT 1 FROM import_errors e WHERE e.row_no = g.row_no)
+"""
+
+_INSERT_GARMENTS = """
+INSERT INTO garments (id, name, description, lifecycle_stage, created_at, updated_at)
+SELECT garment_id, name, description, lifecycle_stage,
+       now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc'
+FROM import_garments
+WHERE garment_id IS NOT NULL
+ORDER BY row_no
+"""
+
+_INSERT_MATERIALS = """
+INSERT INTO garment_materials (garment_id, material_id, percentage)
+SELECT g.garment_id, m.material_id, m.percentage
+FROM import_materials m
+JOIN import_garments g ON g.row_no = m.row_no
+WHERE g.garment_id IS NOT NULL
+"""
+
+_INSERT_ATTRIBUTES = """
+INSERT INTO garment_attributes (garment_id, attribute_id)
+SELECT g.garment_id, a.attribute_id
+FROM import_attributes a
+JOIN import_garments g ON g.row_no = a.row_no
+WHERE g.garment_id IS NOT NULL
+"""
+
+_staged_garments = table("import_garments", column("garment_id"))
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _csv_row(values: dict[str, str]) -> dict:
+    # materials: "material_id:percentage;..."  attributes: "attribute_id;..."
+    row: dict = {
+        "name": values.get("name", ""),
+        "description": values.get("description") or None,
+        "materials": [],
+        "attributes": [],
+    }
+    if values.get("lifecycle_stage"):
+        row["lifecycle_stage"] = values["lifecycle_stage"]
+    for item in filter(None, (values.get("materials") or "").split(";")):
+        material_id, sep, percentage = item.partition(":")
+        if not sep:
+            raise ValueError(f"materials: expected 'material_id:percentage', got '{item}'")
+        row["materials"].append({"material_id": material_id.strip(), "percentage": percentage.strip()})
+    row["attributes"] = [a.strip() for a in (values.get("attributes") or "").split(";") if a.strip()]
+    return row
+
+
+async def _csv_records(lines: AsyncIterator[str]) -> AsyncIterator[dict[str, str]]:
+    header: list[str] | None = None
+    pending: list[str] = []
+    async for line in lines:
+        pending.append(line)
+        record = "\n".join(pending)
+        # A quoted field may span lines; wait until the quotes balance
+        if record.count('"') % 2:
+            continue
+        pending = []
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        yield dict(zip(header, values))
+    if pending:
+        raise ValueError("unterminated quoted field")
+
+
+async def _ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    async for line in lines:
+        if line.strip():
+            yield line
+
+
+async def _parse(
+    chunks: AsyncIterator[bytes], fmt: str
+) -> AsyncIterator[tuple[int, GarmentImportRow | None, str | None]]:
+    if fmt == "csv":
+        records, decode = _csv_records(_lines(chunks)), _csv_row
+    else:
+        records, decode = _ndjson_records(_lines(chunks)), json.loads
+    row_no = 0
+    while True:
+        row_no += 1
+        try:
+            record = await anext(records)
+        except StopAsyncIteration:
+            return
+        except ValueError as exc:
+            # Unterminated CSV quote; nothing after it can be parsed
+            yield row_no, None, str(exc)
+            return
+        try:
+            row = GarmentImportRow.model_validate(decode(record))
+        except pydantic.ValidationError as exc:
+            yield row_no, None, "; ".join(
+                f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors()
+            )
+        except ValueError as exc:
+            yield row_no, None, str(exc)
+        else:
+            yield row_no, row, None
+
+
+async def _copy_batch(driver, garments: list, materials: list, attributes: list) -> None:
+    await driver.copy_records_to_table(
+        "import_garments",
+        records=garments,
+        columns=["row_no", "name", "description", "lifecycle_stage"],
+    )
+    if materials:
+        await driver.copy_records_to_table(
+            "import_materials",
+            records=materials,
+            columns=["row_no", "material_id", "percentage"],
+        )
+    if attributes:
+        await driver.copy_records_to_table(
+            "import_attributes",
+            records=attributes,
+            columns=["row_no", "attribute_id"],
+        )
+
+
+async def import_garments(
+    db: AsyncSession, chunks: AsyncIterator[bytes], fmt: str
+) -> GarmentImportResult:
+    for ddl in _CREATE_STAGING:
+        await db.execute(text(ddl))
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    driver = raw.driver_connection
+
+    received = 0
+    parse_errors: list[GarmentImportError] = []
+    garments: list[tuple] = []
+    materials: list[tuple] = []
+    attributes: list[tuple] = []
+
+    async for row_no, row, error in _parse(chunks, fmt):
+        received += 1
+        if error is not None:
+            parse_errors.append(GarmentImportError(row=row_no, detail=error))
+            continue
+        garments.append((row_no, row.name, row.description, row.lifecycle_stage))
+        materials.extend(
+            (row_no, m.material_id, Decimal(str(m.percentage))) for m in row.materials
+        )
+        attributes.extend((row_no, attribute_id) for attribute_id in row.attributes)
+        if len(garments) >= _BATCH_SIZE:
+            await _copy_batch(driver, garments, materials, attributes)
+            garments, materials, attributes = [], [], []
+    if garments:
+        await _copy_batch(driver, garments, materials, attributes)
+
+    for staging in ("import_garments", "import_materials", "import_attributes"):
+        await db.execute(text(f"ANALYZE {staging}"))
+    await db.execute(text(_VALIDATE))
+    await db.execute(text(_ASSIGN_IDS))
+    await db.execute(text(_INSERT_GARMENTS))
+    await db.execute(text(_INSERT_MATERIALS))
+    await db.execute(text(_INSERT_ATTRIBUTES))
+    await search_service.refresh_search_documents(
+        db,
+        Garment.id.in_(
+            select(_staged_garments.c.garment_id).where(
+                _staged_garments.c.garment_id.is_not(None)
+            )
+        ),
+    )
+
+    result = await db.execute(
+        text(
+            "SELECT lifecycle_stage, count(*) FROM import_garments "
+            "WHERE garment_id IS NOT NULL GROUP BY lifecycle_stage"
+        )
+    )
+    imported_by_stage = dict(result.tuples().all())
+    await aggregate_service.adjust(db, aggregate_service.GARMENT_STAGE, imported_by_stage)
+    imported = sum(imported_by_stage.values())
+    result = await db.execute(
+        text("SELECT row_no, detail FROM import_errors ORDER BY row_no")
+    )
+    errors = parse_errors + [
+        GarmentImportError(row=row_no, detail=detail) for row_no, detail in result.all()
+    ]
+    if imported:
+        change_feed.publish(db, "garments.changed", count=imported)
+    await db.commit()
+
+    errors.sort(key=lambda e: e.row)
+    return GarmentImportResult(
+        received=received,
+        imported=imported,
+        failed=received - imported,
+        errors=errors,
+    )
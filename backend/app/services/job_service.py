@@ -0,0 +1,205 @@
+import random
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, and_, case, func, insert, literal, or_, select, update
+
+from app.config import get_settings
+from app.models import Job, JobStatus
+from app.schemas.job import JobCreate
+from app.exceptions import NotFoundError, InvalidTransitionError
+from app.services import writes
+
+# Durable job queue.
+#
+# The API enqueues and cancels jobs; app.worker claims and runs them. Each
+# state change is one guarded UPDATE: a worker's writes only match while the
+# job is RUNNING under that worker's locked_by token, so a worker that lost
+# its lease (and the job, to another worker) can no longer touch it.
+
+_QUEUED = JobStatus.QUEUED.value
+_RUNNING = JobStatus.RUNNING.value
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobLost(Exception):
+    # The lease expired and another worker claimed the job
+    pass
+
+
+def _now():
+    # Database clock, so workers on different hosts agree on lease expiry
+    return func.timezone("utc", func.now())
+
+
+async def enqueue(db: AsyncSession, data: JobCreate) -> Row:
+    job = await writes.write(
+        db,
+        insert(Job).values(
+            kind=data.kind,
+            payload=data.model_dump(mode="json", exclude={"kind", "max_attempts"}),
+            max_attempts=data.max_attempts,
+        ),
+    )
+    await db.commit()
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: int) -> Job:
+    result = await db.execute(select(Job).where(Job.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise NotFoundError("Job", job_id)
+    return job
+
+
+async def cancel_job(db: AsyncSession, job_id: int) -> Row:
+    # A queued job is cancelled outright; a running one is flagged and its
+    # worker stops at the next progress report or heartbeat
+    queued = Job.status == _QUEUED
+    job = await writes.write(
+        db,
+        update(Job)
+        .where(Job.id == job_id, Job.status.in_([_QUEUED, _RUNNING]))
+        .values(
+            cancel_requested=True,
+            status=case((queued, JobStatus.CANCELLED.value), else_=Job.status),
+            finished_at=case((queued, _now()), else_=Job.finished_at),
+        ),
+    )
+    if job is None:
+        result = await db.execute(select(Job.status).where(Job.id == job_id))
+        current = result.scalar_one_or_none()
+        if current is None:
+            raise NotFoundError("Job", job_id)
+        raise InvalidTransitionError(current, JobStatus.CANCELLED.value, [])
+    await db.commit()
+    return job
+
+
+async def claim(db: AsyncSession, worker: str) -> Row | None:
+    # SKIP LOCKED: concurrent workers each get a different job, or none,
+    # without waiting on one another
+    lease = timedelta(seconds=get_settings().job_lease_seconds)
+    # Statuses as literals, so that even a generic prepared plan can match
+    # the partial indexes ix_jobs_queued and ix_jobs_running
+    queued, running = (literal(s, literal_execute=True) for s in (_QUEUED, _RUNNING))
+    candidate = (
+        select(Job.id)
+        .where(
+            or_(
+                and_(Job.status == queued, Job.run_after <= _now()),
+                and_(Job.status == running, Job.heartbeat_at < _now() - lease),
+            )
+        )
+        .order_by(Job.run_after, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    job = await writes.write(
+        db,
+        update(Job)
+        .where(Job.id == candidate)
+        .values(
+            status=_RUNNING,
+            attempts=Job.attempts + 1,
+            locked_by=worker,
+            started_at=_now(),
+            heartbeat_at=_now(),
+        ),
+    )
+    await db.commit()
+    return job
+
+
+def _held(job_id: int, worker: str):
+    return and_(Job.id == job_id, Job.status == _RUNNING, Job.locked_by == worker)
+
+
+async def heartbeat(
+    db: AsyncSession,
+    job_id: int,
+    worker: str,
+    progress: int | None = None,
+    total: int | None = None,
+) -> None:
+    # Extends the lease and records progress; raises when the job was
+    # cancelled or claimed by another worker
+    values = {"heartbeat_at": _now()}
+    if progress is not None:
+        values["progress"] = progress
+    if total is not None:
+        values["total"] = total
+    result = await db.execute(
+        update(Job)
+        .where(_held(job_id, worker))
+        .values(**values)
+        .returning(Job.cancel_requested)
+        .execution_options(synchronize_session=False)
+    )
+    cancel_requested = result.scalar_one_or_none()
+    await db.commit()
+    if cancel_requested is None:
+        raise JobLost()
+    if cancel_requested:
+        raise JobCancelled()
+
+
+async def _release(db: AsyncSession, job_id: int, worker: str, **values) -> None:
+    await db.execute(
+        update(Job)
+        .where(_held(job_id, worker))
+        .values(locked_by=None, heartbeat_at=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def succeed(db: AsyncSession, job_id: int, worker: str, result: dict) -> None:
+    await _release(
+        db,
+        job_id,
+        worker,
+        status=JobStatus.SUCCEEDED.value,
+        result=result,
+        error=None,
+        finished_at=_now(),
+    )
+
+
+async def cancelled(db: AsyncSession, job_id: int, worker: str) -> None:
+    await _release(db, job_id, worker, status=JobStatus.CANCELLED.value, finished_at=_now())
+
+
+def retry_delay(attempts: int) -> float:
+    # Exponential backoff with jitter, so jobs that failed together do not
+    # retry in lockstep
+    settings = get_settings()
+    delay = min(
+        settings.job_retry_max_seconds,
+        settings.job_retry_base_seconds * 2 ** (attempts - 1),
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def fail(
+    db: AsyncSession, job: Row, worker: str, error: str, retry: bool = True
+) -> None:
+    # Requeued with a delay while attempts remain, otherwise FAILED
+    if retry and job.attempts < job.max_attempts:
+        await _release(
+            db,
+            job.id,
+            worker,
+            status=_QUEUED,
+            error=error,
+            run_after=_now() + timedelta(seconds=retry_delay(job.attempts)),
+        )
+    else:
+        await _release(
+            db, job.id, worker, status=JobStatus.FAILED.value, error=error, finished_at=_now()
+        )
@@ -26,12 +26,20 @@ def validate_garment_transition(current_stage: str, target_stage: str) -> None:
         raise InvalidTransitionError(current_stage, target_stage, sorted(valid_targets))
 
 
+def garment_transition_sources(target_stage: str) -> set[str]:
+    return {stage for stage, targets in GARMENT_TRANSITIONS.items() if target_stage in targets}
+
+
 def validate_supplier_transition(current_status: str, target_status: str) -> None:
     valid_targets = SUPPLIER_TRANSITIONS.get(current_status, set())
     if target_status not in valid_targets:
         raise InvalidTransitionError(current_status, target_status, sorted(valid_targets))
 
 
+def supplier_transition_sources(target_status: str) -> set[str]:
+    return {status for status, targets in SUPPLIER_TRANSITIONS.items() if target_status in targets}
+
+
 # Sample set status transitions
 SAMPLE_TRANSITIONS: dict[str, set[str]] = {
     "PENDING": {"RECEIVED"},
@@ -45,3 +53,7 @@ def validate_sample_transition(current_status: str, target_status: str) -> None:
     valid_targets = SAMPLE_TRANSITIONS.get(current_status, set())
     if target_status not in valid_targets:
         raise InvalidTransitionError(current_status, target_status, sorted(valid_targets))
+
+
+def sample_transition_sources(target_status: str) -> set[str]:
+    return {status for status, targets in SAMPLE_TRANSITIONS.items() if target_status in targets}
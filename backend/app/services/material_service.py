@@ -1,18 +1,21 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, select, insert
 
 from app.models import Material
 from app.schemas.material import MaterialCreate
+from app.services import change_feed, reference_cache, writes
+from app import records
+from app.records import MaterialRecord
 
 
-async def get_materials(db: AsyncSession) -> list[Material]:
-    result = await db.execute(select(Material))
-    return list(result.scalars().all())
+async def get_materials(db: AsyncSession) -> list[MaterialRecord]:
+    result = await db.execute(select(*records.columns(Material, MaterialRecord)))
+    return records.from_rows(MaterialRecord, result)
 
 
-async def create_material(db: AsyncSession, data: MaterialCreate) -> Material:
-    material = Material(name=data.name)
-    db.add(material)
+async def create_material(db: AsyncSession, data: MaterialCreate) -> Row:
+    material = await writes.write(db, insert(Material).values(name=data.name))
+    change_feed.invalidate(db, reference_cache.MATERIALS)
     await db.commit()
-    await db.refresh(material)
+    reference_cache.bump(reference_cache.MATERIALS)
     return material
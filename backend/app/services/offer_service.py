@@ -0,0 +1,227 @@
+from sqlalchemy import Float, Integer, any_, bindparam, case, exists, func, literal, select, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Garment, GarmentSupplier, Supplier, SupplierStatus
+from app.schemas.supplier import (
+    GarmentOfferRanking,
+    OfferComparison,
+    RankedOffer,
+    SupplierOfferBands,
+)
+from app.services.pagination import keyset_paginate, split_page
+
+# Supplier offer comparison.
+#
+# Ranks the offers on a page of garments (keyset-paginated by garment id) with
+# window functions partitioned by garment, reading only the page's offers
+# through uq_garment_supplier (garment_id first). Supplier bands are paged
+# separately, by supplier id: a page reads its suppliers' offers within the
+# filter through ix_garment_suppliers_supplier_id_id, and the other offers on
+# those garments (for the price percentile) through uq_garment_supplier, so
+# its cost follows the page's suppliers rather than the filtered set.
+
+_BANDS = [0.25, 0.5, 0.75]
+
+
+def _offer_filter(include_rejected: bool):
+    if include_rejected:
+        return literal(True)
+    return GarmentSupplier.status != SupplierStatus.REJECTED.value
+
+
+async def compare_offers(
+    db: AsyncSession,
+    stage: str | None = None,
+    garment_ids: list[int] | None = None,
+    price_weight: float = 0.5,
+    include_rejected: bool = False,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[OfferComparison, str | None]:
+    offer_filter = _offer_filter(include_rejected)
+    page = select(Garment.id, Garment.name, Garment.lifecycle_stage).where(
+        exists().where(GarmentSupplier.garment_id == Garment.id, offer_filter)
+    )
+    if stage:
+        page = page.where(Garment.lifecycle_stage == stage)
+    if garment_ids:
+        page = page.where(
+            Garment.id == any_(bindparam("garment_ids", garment_ids, type_=ARRAY(Integer)))
+        )
+    page = keyset_paginate(
+        page, Garment.id, Garment.id, descending=False, cursor=cursor, limit=limit
+    ).cte("page")
+
+    by_garment = {"partition_by": GarmentSupplier.garment_id}
+    price_order = GarmentSupplier.offer_price.asc().nulls_last()
+    lead_time_order = GarmentSupplier.lead_time_days.asc().nulls_last()
+    scored = (
+        select(
+            page.c.id.label("garment_id"),
+            page.c.name.label("garment_name"),
+            page.c.lifecycle_stage,
+            GarmentSupplier.supplier_id,
+            Supplier.name.label("supplier_name"),
+            GarmentSupplier.status,
+            GarmentSupplier.offer_price,
+            GarmentSupplier.lead_time_days,
+            func.rank().over(order_by=price_order, **by_garment).label("price_rank"),
+            func.rank().over(order_by=lead_time_order, **by_garment).label("lead_time_rank"),
+            (
+                price_weight * func.percent_rank().over(order_by=price_order, **by_garment)
+                + (1 - price_weight)
+                * func.percent_rank().over(order_by=lead_time_order, **by_garment)
+            ).label("score"),
+        )
+        .join(GarmentSupplier, GarmentSupplier.garment_id == page.c.id)
+        .join(Supplier, Supplier.id == GarmentSupplier.supplier_id)
+        .where(offer_filter)
+        .subquery()
+    )
+    # A window over the score needs the score first: ranked in an outer query
+    result = await db.execute(
+        select(
+            scored,
+            func.rank()
+            .over(
+                partition_by=scored.c.garment_id,
+                order_by=(scored.c.score, scored.c.price_rank, scored.c.lead_time_rank),
+            )
+            .label("score_rank"),
+        ).order_by(scored.c.garment_id, "score_rank", scored.c.supplier_id)
+    )
+    offers: dict[int, list] = {}
+    for row in result:
+        offers.setdefault(row.garment_id, []).append(row)
+    garments, next_cursor = split_page(
+        [rows[0] for rows in offers.values()],
+        limit,
+        Garment.id,
+        False,
+        key=lambda row: (row.garment_id, row.garment_id),
+    )
+
+    rankings = [
+        GarmentOfferRanking(
+            garment_id=first.garment_id,
+            garment_name=first.garment_name,
+            lifecycle_stage=first.lifecycle_stage,
+            best_price_supplier_id=_best(offers[first.garment_id], "offer_price", "price_rank"),
+            best_lead_time_supplier_id=_best(
+                offers[first.garment_id], "lead_time_days", "lead_time_rank"
+            ),
+            # Rows come ordered by score rank
+            best_score_supplier_id=first.supplier_id,
+            offers=[RankedOffer.model_validate(row) for row in offers[first.garment_id]],
+        )
+        for first in garments
+    ]
+    return OfferComparison(price_weight=price_weight, garments=rankings), next_cursor
+
+
+def _best(rows: list, value: str, rank: str) -> int | None:
+    # None when no offer states the value
+    ranked = [row for row in rows if getattr(row, value) is not None]
+    if not ranked:
+        return None
+    return min(ranked, key=lambda row: (getattr(row, rank), row.supplier_id)).supplier_id
+
+
+async def supplier_bands(
+    db: AsyncSession,
+    stage: str | None = None,
+    garment_ids: list[int] | None = None,
+    supplier_ids: list[int] | None = None,
+    include_rejected: bool = False,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list[SupplierOfferBands], str | None]:
+    offer_filter = _offer_filter(include_rejected)
+    offers = [offer_filter]
+    if stage:
+        offers.append(
+            exists().where(Garment.id == GarmentSupplier.garment_id, Garment.lifecycle_stage == stage)
+        )
+    if garment_ids:
+        offers.append(
+            GarmentSupplier.garment_id
+            == any_(bindparam("garment_ids", garment_ids, type_=ARRAY(Integer)))
+        )
+    page = select(Supplier.id, Supplier.name).where(
+        exists().where(GarmentSupplier.supplier_id == Supplier.id, *offers)
+    )
+    if supplier_ids:
+        page = page.where(
+            Supplier.id == any_(bindparam("supplier_ids", supplier_ids, type_=ARRAY(Integer)))
+        )
+    page = keyset_paginate(
+        page, Supplier.id, Supplier.id, descending=False, cursor=cursor, limit=limit
+    ).cte("page")
+
+    # Garments the page's suppliers have offers on within the filter
+    garments = (
+        select(GarmentSupplier.garment_id)
+        .join(page, page.c.id == GarmentSupplier.supplier_id)
+        .where(*offers)
+    )
+    priced = GarmentSupplier.offer_price.is_not(None)
+    ranked = (
+        select(
+            GarmentSupplier.supplier_id,
+            GarmentSupplier.offer_price,
+            GarmentSupplier.lead_time_days,
+            # Among each garment's priced offers; NULL for an offer without a
+            # price, which percentile_cont skips
+            case(
+                (
+                    priced,
+                    func.percent_rank().over(
+                        partition_by=(GarmentSupplier.garment_id, priced),
+                        order_by=GarmentSupplier.offer_price,
+                    ),
+                ),
+            ).label("price_percentile"),
+        )
+        .where(offer_filter, GarmentSupplier.garment_id.in_(garments))
+        .subquery()
+    )
+    fractions = literal(_BANDS, ARRAY(Float))
+    result = await db.execute(
+        select(
+            page.c.id,
+            page.c.name,
+            func.count(),
+            type_coerce(
+                func.percentile_cont(fractions).within_group(ranked.c.offer_price), ARRAY(Float)
+            ),
+            type_coerce(
+                func.percentile_cont(fractions).within_group(ranked.c.lead_time_days), ARRAY(Float)
+            ),
+            func.percentile_cont(0.5).within_group(ranked.c.price_percentile),
+        )
+        .join(page, page.c.id == ranked.c.supplier_id)
+        .group_by(page.c.id, page.c.name)
+        .order_by(page.c.id)
+    )
+    rows, next_cursor = split_page(result.all(), limit, Supplier.id, False)
+    bands = []
+    for supplier_id, name, count, prices, lead_times, percentile in rows:
+        # NULL rather than an array when the supplier stated no value at all
+        prices = prices or [None] * len(_BANDS)
+        lead_times = lead_times or [None] * len(_BANDS)
+        bands.append(
+            SupplierOfferBands(
+                supplier_id=supplier_id,
+                supplier_name=name,
+                offers=count,
+                price_p25=prices[0],
+                price_p50=prices[1],
+                price_p75=prices[2],
+                lead_time_p25=lead_times[0],
+                lead_time_p50=lead_times[1],
+                lead_time_p75=lead_times[2],
+                price_percentile_p50=percentile,
+            )
+        )
+    return bands, next_cursor
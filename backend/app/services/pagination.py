@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+from sqlalchemy import DateTime, Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.exceptions import ValidationError
+
+# Keyset (cursor) pagination helpers.
+#
+# A cursor is an opaque, URL-safe token encoding the sort key, direction and
+# the (sort value, id) of the last row on the previous page. The next page is
+# fetched with a row comparison `(sort_col, id) < (value, last_id)`, which a
+# composite (sort_col, id) index answers without scanning skipped rows.
+
+
+def encode_cursor(sort_key: str, descending: bool, value: Any, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_key, descending, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, sort_column: InstrumentedAttribute, descending: bool
+) -> tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, cursor_descending, value, row_id = json.loads(
+            base64.urlsafe_b64decode(padded)
+        )
+        if isinstance(sort_column.type, DateTime):
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid pagination cursor")
+
+    if sort_key != sort_column.key or cursor_descending != descending:
+        raise ValidationError("Pagination cursor does not match the requested sort order")
+    return value, int(row_id)
+
+
+def keyset_paginate(
+    stmt: Select,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    *,
+    descending: bool,
+    cursor: str | None,
+    limit: int,
+) -> Select:
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_column, descending)
+        key = tuple_(sort_column, id_column)
+        bound = tuple_(value, last_id)
+        stmt = stmt.where(key < bound if descending else key > bound)
+
+    if descending:
+        stmt = stmt.order_by(sort_column.desc(), id_column.desc())
+    else:
+        stmt = stmt.order_by(sort_column.asc(), id_column.asc())
+    # Fetch one extra row to learn whether another page exists
+    return stmt.limit(limit + 1)
+
+
+def split_page(
+    rows: Sequence,
+    limit: int,
+    sort_column: InstrumentedAttribute,
+    descending: bool,
+    key: Callable[[Any], tuple[Any, int]] | None = None,
+) -> tuple[list, str | None]:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    if key is None:
+        value, row_id = getattr(rows[-1], sort_column.key), rows[-1].id
+    else:
+        value, row_id = key(rows[-1])
+    return rows, encode_cursor(sort_column.key, descending, value, row_id)
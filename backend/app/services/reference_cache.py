@@ -0,0 +1,69 @@
+import time
+from collections import defaultdict
+from functools import lru_cache, partial
+from typing import Awaitable, Callable, Iterable
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.config import get_settings
+from app.etag import compute_etag
+from app.services import change_feed
+
+# In-process cache of serialized reference-data responses.
+#
+# Each dataset has a version counter; a cached body is served until its
+# version is superseded. The owning service invalidates the dataset through
+# the change feed with each write, which bumps the version in every process
+# when the write commits, and bumps it here directly after the commit. A
+# body loaded while the change feed is not listening is not kept. The TTL is
+# a backstop only.
+
+MATERIALS = "materials"
+ATTRIBUTES = "attributes"
+INCOMPATIBILITIES = "incompatibilities"
+SUPPLIERS = "suppliers"
+
+_versions: dict[str, int] = defaultdict(int)
+# (dataset, key) -> (version, loaded_at, etag, body)
+_entries: dict[tuple[str, str], tuple[int, float, str, bytes]] = {}
+
+
+def bump(*datasets: str) -> None:
+    for dataset in datasets:
+        _versions[dataset] += 1
+
+
+for _dataset in (MATERIALS, ATTRIBUTES, INCOMPATIBILITIES, SUPPLIERS):
+    change_feed.feed.on_invalidate(_dataset, partial(bump, _dataset))
+
+
+@lru_cache
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def serialize(model: type[BaseModel], rows: Iterable) -> bytes:
+    adapter = _list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True))
+
+
+async def get(
+    dataset: str, key: str, load: Callable[[], Awaitable[bytes]]
+) -> tuple[str, bytes]:
+    version = _versions[dataset]
+    ttl = get_settings().reference_cache_ttl_seconds
+    now = time.monotonic()
+    entry = _entries.get((dataset, key))
+    if entry and entry[0] == version and now - entry[1] < ttl:
+        return entry[2], entry[3]
+
+    # Listening before loading: a write committed after the load starts is
+    # then always heard of
+    listening = await change_feed.feed.listening()
+    body = await load()
+    etag = compute_etag(body)
+    # Stored under the version read before loading, so a write that lands
+    # mid-load forces another load on the next request
+    if listening:
+        _entries[(dataset, key)] = (version, now, etag, body)
+    return etag, body
@@ -0,0 +1,132 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal, literal_column, or_, not_, exists, Float
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models import (
+    Garment,
+    Material,
+    GarmentMaterial,
+    Attribute,
+    GarmentAttribute,
+    Supplier,
+    GarmentSupplier,
+    GarmentSearchDocument,
+)
+
+_CONFIG = literal_column("'english'::regconfig")
+
+
+def _names(name_column, link_garment_id, join_condition):
+    # Space-separated names of one garment's related rows, correlated to Garment
+    return (
+        select(func.string_agg(name_column, " "))
+        .join_from(link_garment_id.class_, name_column.class_, join_condition)
+        .where(link_garment_id == Garment.id)
+        .scalar_subquery()
+    )
+
+
+def _weighted(text, weight: str):
+    return func.setweight(
+        func.to_tsvector(_CONFIG, func.coalesce(text, "")),
+        literal_column(f"'{weight}'"),
+    )
+
+
+async def refresh_search_documents(db: AsyncSession, garment_filter) -> None:
+    # Single INSERT ... SELECT ... ON CONFLICT in the caller's transaction;
+    # the caller commits.
+    materials = _names(
+        Material.name,
+        GarmentMaterial.garment_id,
+        GarmentMaterial.material_id == Material.id,
+    )
+    attributes = _names(
+        Attribute.name,
+        GarmentAttribute.garment_id,
+        GarmentAttribute.attribute_id == Attribute.id,
+    )
+    suppliers = _names(
+        Supplier.name,
+        GarmentSupplier.garment_id,
+        GarmentSupplier.supplier_id == Supplier.id,
+    )
+
+    names = (
+        select(
+            Garment.id,
+            Garment.name,
+            Garment.description,
+            materials.label("materials"),
+            attributes.label("attributes"),
+            suppliers.label("suppliers"),
+        )
+        .where(garment_filter)
+        .subquery()
+    )
+
+    document = func.concat_ws(
+        " ",
+        names.c.name,
+        names.c.description,
+        names.c.materials,
+        names.c.attributes,
+        names.c.suppliers,
+    )
+    vector = (
+        _weighted(names.c.name, "A")
+        .op("||")(_weighted(names.c.description, "B"))
+        .op("||")(_weighted(func.concat_ws(" ", names.c.materials, names.c.attributes), "C"))
+        .op("||")(_weighted(names.c.suppliers, "D"))
+    )
+
+    stmt = pg_insert(GarmentSearchDocument).from_select(
+        ["garment_id", "document", "search_vector", "updated_at"],
+        select(names.c.id, document, vector, func.now()),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GarmentSearchDocument.garment_id],
+        set_={
+            "document": stmt.excluded.document,
+            "search_vector": stmt.excluded.search_vector,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def refresh_garment(db: AsyncSession, garment_id: int) -> None:
+    await refresh_search_documents(db, Garment.id == garment_id)
+
+
+async def refresh_supplier_garments(db: AsyncSession, supplier_id: int) -> None:
+    await refresh_search_documents(
+        db,
+        Garment.id.in_(
+            select(GarmentSupplier.garment_id).where(
+                GarmentSupplier.supplier_id == supplier_id
+            )
+        ),
+    )
+
+
+async def backfill_missing(db: AsyncSession) -> None:
+    # Only garments that have never been indexed (e.g. rows predating search)
+    await refresh_search_documents(
+        db,
+        not_(exists().where(GarmentSearchDocument.garment_id == Garment.id)),
+    )
+    await db.commit()
+
+
+def search_rank(search: str):
+    query = func.websearch_to_tsquery(_CONFIG, search)
+    matches = or_(
+        GarmentSearchDocument.search_vector.op("@@")(query),
+        literal(search).op("<%")(GarmentSearchDocument.document),
+    )
+    rank = (
+        func.ts_rank_cd(GarmentSearchDocument.search_vector, query)
+        + func.word_similarity(search, GarmentSearchDocument.document)
+    ).cast(Float(53))
+    return matches, rank.label("rank")
@@ -1,17 +1,38 @@
+from datetime import datetime, timedelta
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, select, insert, update, literal, func, true, any_, bindparam
 from sqlalchemy.orm import joinedload
 
-from app.models import Supplier, GarmentSupplier, Garment, SampleSet
-from app.schemas.supplier import SupplierCreate, SupplierUpdate, GarmentSupplierCreate
-from app.schemas.sample_set import SampleSetCreate, SampleSetUpdate
-from app.exceptions import NotFoundError, ProductionProtectedError
-from app.services.lifecycle import validate_supplier_transition, validate_sample_transition
+from app.models import Supplier, GarmentSupplier, Garment, SampleSet, SupplierStatus, SampleStatus
+from app.schemas.supplier import (
+    SupplierCreate,
+    SupplierUpdate,
+    GarmentSupplierCreate,
+    GarmentSupplierResponse,
+    PortfolioOffer,
+    SupplierPortfolio,
+)
+from app.schemas.sample_set import SampleSetCreate, SampleSetUpdate, SampleSetResponse
+from app.exceptions import NotFoundError, ProductionProtectedError, InvalidTransitionError
+from app.services.lifecycle import (
+    SUPPLIER_TRANSITIONS,
+    SAMPLE_TRANSITIONS,
+    supplier_transition_sources,
+    sample_transition_sources,
+)
+from app.services import (
+    search_service, aggregate_service, reference_cache, change_feed, history_service, writes
+)
+from app import records
+from app.records import SupplierRecord
+from app.services.garment_service import touch_garments
+from app.services.pagination import keyset_paginate, split_page
 
 
-async def get_suppliers(db: AsyncSession) -> list[Supplier]:
-    result = await db.execute(select(Supplier))
-    return list(result.scalars().all())
+async def get_suppliers(db: AsyncSession) -> list[SupplierRecord]:
+    result = await db.execute(select(*records.columns(Supplier, SupplierRecord)))
+    return records.from_rows(SupplierRecord, result)
 
 
 async def get_supplier(db: AsyncSession, supplier_id: int) -> Supplier:
@@ -22,33 +43,145 @@ async def get_supplier(db: AsyncSession, supplier_id: int) -> Supplier:
     return supplier
 
 
-async def create_supplier(db: AsyncSession, data: SupplierCreate) -> Supplier:
-    supplier = Supplier(name=data.name, contact_info=data.contact_info)
-    db.add(supplier)
+async def get_portfolio(
+    db: AsyncSession, supplier_id: int, limit: int = 50, cursor: str | None = None
+) -> tuple[SupplierPortfolio, str | None]:
+    # One statement: the supplier, a page of its offers (newest first) and
+    # aggregates over all of them, each read through the supplier_id index
+    offered = GarmentSupplier.supplier_id == supplier_id
+    stats = (
+        select(
+            *(
+                func.count().filter(GarmentSupplier.status == status.value).label(status.value)
+                for status in SupplierStatus
+            ),
+            func.avg(GarmentSupplier.offer_price).label("average_offer_price"),
+            func.avg(GarmentSupplier.lead_time_days).label("average_lead_time_days"),
+        )
+        .where(offered)
+        .subquery()
+    )
+    samples = (
+        select(
+            func.count()
+            .filter(SampleSet.status == SampleStatus.APPROVED.value)
+            .label("samples_approved"),
+            func.count()
+            .filter(SampleSet.status == SampleStatus.REJECTED.value)
+            .label("samples_rejected"),
+        )
+        .join(GarmentSupplier, GarmentSupplier.id == SampleSet.garment_supplier_id)
+        .where(offered)
+        .subquery()
+    )
+    page = keyset_paginate(
+        select(
+            GarmentSupplier.id,
+            GarmentSupplier.garment_id,
+            Garment.name.label("garment_name"),
+            Garment.lifecycle_stage,
+            GarmentSupplier.status,
+            GarmentSupplier.offer_price,
+            GarmentSupplier.lead_time_days,
+            GarmentSupplier.updated_at,
+        )
+        .join(Garment, Garment.id == GarmentSupplier.garment_id)
+        .where(offered),
+        GarmentSupplier.id,
+        GarmentSupplier.id,
+        descending=True,
+        cursor=cursor,
+        limit=limit,
+    ).subquery()
+    # Joined on true: the aggregates are single rows, and a supplier with no
+    # offers (or a page past the end) still yields one row with no offer
+    result = await db.execute(
+        select(Supplier, stats, samples, page)
+        .select_from(Supplier)
+        .join(stats, true())
+        .join(samples, true())
+        .outerjoin(page, true())
+        .where(Supplier.id == supplier_id)
+        .order_by(page.c.id.desc())
+    )
+    rows = result.all()
+    if not rows:
+        raise NotFoundError("Supplier", supplier_id)
+
+    first = rows[0]
+    offers, next_cursor = split_page(
+        [row for row in rows if row.id is not None],
+        limit,
+        GarmentSupplier.id,
+        True,
+        key=lambda row: (row.id, row.id),
+    )
+    decided = first.samples_approved + first.samples_rejected
+    return (
+        SupplierPortfolio(
+            supplier=first.Supplier,
+            offers_by_status={status.value: getattr(first, status.value) for status in SupplierStatus},
+            average_offer_price=first.average_offer_price,
+            average_lead_time_days=first.average_lead_time_days,
+            samples_approved=first.samples_approved,
+            samples_rejected=first.samples_rejected,
+            sample_approval_rate=first.samples_approved / decided if decided else None,
+            offers=[PortfolioOffer.model_validate(row, from_attributes=True) for row in offers],
+        ),
+        next_cursor,
+    )
+
+
+async def create_supplier(db: AsyncSession, data: SupplierCreate) -> Row:
+    supplier = await writes.write(
+        db, insert(Supplier).values(name=data.name, contact_info=data.contact_info)
+    )
+    change_feed.invalidate(db, reference_cache.SUPPLIERS)
     await db.commit()
-    await db.refresh(supplier)
+    reference_cache.bump(reference_cache.SUPPLIERS)
     return supplier
 
 
 async def update_supplier(
     db: AsyncSession, supplier_id: int, data: SupplierUpdate
-) -> Supplier:
-    supplier = await get_supplier(db, supplier_id)
-
+) -> Row:
+    values = {}
     if data.name is not None:
-        supplier.name = data.name
+        values["name"] = data.name
     if data.contact_info is not None:
-        supplier.contact_info = data.contact_info
+        values["contact_info"] = data.contact_info
 
+    supplier = await writes.write(
+        db,
+        update(Supplier)
+        .where(Supplier.id == supplier_id)
+        .values(**values or {"name": Supplier.name}),
+    )
+    if supplier is None:
+        raise NotFoundError("Supplier", supplier_id)
+
+    if data.name is not None:
+        await search_service.refresh_supplier_garments(db, supplier_id)
+        await touch_garments(
+            db,
+            Garment.id.in_(
+                select(GarmentSupplier.garment_id).where(
+                    GarmentSupplier.supplier_id == supplier_id
+                )
+            ),
+        )
+    change_feed.invalidate(db, reference_cache.SUPPLIERS)
     await db.commit()
-    await db.refresh(supplier)
+    reference_cache.bump(reference_cache.SUPPLIERS)
     return supplier
 
 
 async def delete_supplier(db: AsyncSession, supplier_id: int) -> None:
     supplier = await get_supplier(db, supplier_id)
     await db.delete(supplier)
+    change_feed.invalidate(db, reference_cache.SUPPLIERS)
     await db.commit()
+    reference_cache.bump(reference_cache.SUPPLIERS)
 
 
 async def _get_garment_supplier(
@@ -68,10 +201,12 @@ async def _get_garment_supplier(
 
 async def associate_supplier(
     db: AsyncSession, garment_id: int, data: GarmentSupplierCreate
-) -> GarmentSupplier:
+) -> Row:
     # Verify garment exists and not in production
-    result = await db.execute(select(Garment).where(Garment.id == garment_id))
-    garment = result.scalar_one_or_none()
+    result = await db.execute(
+        select(Garment.name, Garment.lifecycle_stage).where(Garment.id == garment_id)
+    )
+    garment = result.one_or_none()
     if not garment:
         raise NotFoundError("Garment", garment_id)
     if garment.lifecycle_stage == "PRODUCTION":
@@ -79,32 +214,104 @@ async def associate_supplier(
 
     # Verify supplier exists
     result = await db.execute(
-        select(Supplier).where(Supplier.id == data.supplier_id)
+        select(Supplier.id).where(Supplier.id == data.supplier_id)
     )
     if not result.scalar_one_or_none():
         raise NotFoundError("Supplier", data.supplier_id)
 
-    gs = GarmentSupplier(
+    gs = await writes.write(
+        db,
+        insert(GarmentSupplier).values(
+            garment_id=garment_id,
+            supplier_id=data.supplier_id,
+            offer_price=data.offer_price,
+            lead_time_days=data.lead_time_days,
+            notes=data.notes,
+        ),
+        writes.lookup(Supplier.name, data.supplier_id, "supplier_name"),
+    )
+    await search_service.refresh_garment(db, garment_id)
+    await aggregate_service.adjust(
+        db, aggregate_service.SUPPLIER_STATUS, {gs.status: 1}
+    )
+    await touch_garments(db, Garment.id == garment_id)
+    change_feed.publish(
+        db,
+        "garment.supplier_added",
         garment_id=garment_id,
-        supplier_id=data.supplier_id,
-        offer_price=data.offer_price,
-        lead_time_days=data.lead_time_days,
-        notes=data.notes,
+        supplier=GarmentSupplierResponse.model_validate(gs),
     )
-    db.add(gs)
     await db.commit()
-    await db.refresh(gs)
     return gs
 
 
 async def transition_supplier(
     db: AsyncSession, garment_id: int, supplier_id: int, target_status: str
-) -> GarmentSupplier:
-    gs = await _get_garment_supplier(db, garment_id, supplier_id)
-    validate_supplier_transition(gs.status, target_status)
-    gs.status = target_status
+) -> Row:
+    # Validated in the WHERE clause against the locked pre-image, which also
+    # supplies the previous status for the dashboard counts and when it was
+    # entered for the history
+    previous = (
+        select(
+            GarmentSupplier.id,
+            GarmentSupplier.status,
+            func.coalesce(GarmentSupplier.status_entered_at, GarmentSupplier.created_at).label(
+                "entered_at"
+            ),
+        )
+        .where(
+            GarmentSupplier.garment_id == garment_id,
+            GarmentSupplier.supplier_id == supplier_id,
+            GarmentSupplier.status.in_(supplier_transition_sources(target_status)),
+        )
+        .with_for_update()
+        .subquery()
+    )
+    now = datetime.utcnow()
+    gs = await writes.write(
+        db,
+        update(GarmentSupplier)
+        .where(GarmentSupplier.id == previous.c.id)
+        .values(status=target_status, status_entered_at=now, updated_at=now),
+        writes.lookup(Supplier.name, GarmentSupplier.supplier_id, "supplier_name"),
+        previous.c.status.label("previous_status"),
+        previous.c.entered_at.label("previous_entered_at"),
+    )
+    if gs is None:
+        current = await _get_garment_supplier(db, garment_id, supplier_id)
+        raise InvalidTransitionError(
+            current.status,
+            target_status,
+            sorted(SUPPLIER_TRANSITIONS.get(current.status, set())),
+        )
+
+    await aggregate_service.moved(
+        db, aggregate_service.SUPPLIER_STATUS, gs.previous_status, target_status
+    )
+    await history_service.record(
+        db,
+        history_service.SUPPLIER,
+        [
+            {
+                "garment_id": garment_id,
+                "supplier_id": supplier_id,
+                "from_state": gs.previous_status,
+                "to_state": target_status,
+                "entered_at": gs.previous_entered_at,
+                "transitioned_at": now,
+            }
+        ],
+    )
+    await touch_garments(db, Garment.id == garment_id)
+    change_feed.publish(
+        db,
+        "garment.supplier_transitioned",
+        garment_id=garment_id,
+        supplier_id=supplier_id,
+        status=target_status,
+        previous_status=gs.previous_status,
+    )
     await db.commit()
-    await db.refresh(gs)
     return gs
 
 
@@ -118,14 +325,91 @@ async def get_sample_sets(
     return list(result.scalars().all())
 
 
+# Sample sets still awaiting QA; the inbox's partial index covers exactly these
+_OPEN_SAMPLES = (SampleStatus.PENDING.value, SampleStatus.RECEIVED.value)
+
+
+async def get_sample_inbox(
+    db: AsyncSession,
+    status: str | None = None,
+    supplier_id: int | None = None,
+    stage: str | None = None,
+    min_age_days: int | None = None,
+    order: str = "asc",
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list[Row], str | None]:
+    # Open sample sets across the catalog, oldest first by default. The open
+    # status predicate is always applied, so the partial index on
+    # (created_at, id) serves the keyset scan and terminal history is never
+    # read; the joins are primary key lookups per row.
+    stmt = (
+        select(
+            *SampleSet.__table__.columns,
+            GarmentSupplier.garment_id,
+            Garment.name.label("garment_name"),
+            Garment.lifecycle_stage,
+            GarmentSupplier.supplier_id,
+            Supplier.name.label("supplier_name"),
+        )
+        .join(GarmentSupplier, GarmentSupplier.id == SampleSet.garment_supplier_id)
+        .join(Garment, Garment.id == GarmentSupplier.garment_id)
+        .join(Supplier, Supplier.id == GarmentSupplier.supplier_id)
+        # Rendered as literals: with bind parameters a generic prepared plan
+        # cannot prove the index predicate and scans instead
+        .where(
+            SampleSet.status.in_(bindparam("open_samples", _OPEN_SAMPLES, literal_execute=True))
+        )
+    )
+    if status:
+        stmt = stmt.where(SampleSet.status == status)
+    if supplier_id is not None:
+        # Starts from the supplier's offers (supplier_id index) and their
+        # sample sets (garment_supplier_id index) rather than walking every
+        # open sample set for the few of one supplier
+        offers = select(GarmentSupplier.id).where(GarmentSupplier.supplier_id == supplier_id)
+        stmt = stmt.where(
+            SampleSet.garment_supplier_id == any_(func.array(offers.scalar_subquery()))
+        )
+    if stage:
+        stmt = stmt.where(Garment.lifecycle_stage == stage)
+    if min_age_days:
+        stmt = stmt.where(SampleSet.created_at <= datetime.utcnow() - timedelta(days=min_age_days))
+    descending = order == "desc"
+    stmt = keyset_paginate(
+        stmt, SampleSet.created_at, SampleSet.id, descending=descending, cursor=cursor, limit=limit
+    )
+    result = await db.execute(stmt)
+    return split_page(result.all(), limit, SampleSet.created_at, descending)
+
+
 async def create_sample_set(
     db: AsyncSession, garment_id: int, supplier_id: int, data: SampleSetCreate
-) -> SampleSet:
-    gs = await _get_garment_supplier(db, garment_id, supplier_id)
-    sample = SampleSet(garment_supplier_id=gs.id, notes=data.notes)
-    db.add(sample)
+) -> Row:
+    # Resolves the (garment, supplier) pair in the INSERT itself
+    sample = await writes.write(
+        db,
+        insert(SampleSet).from_select(
+            ["garment_supplier_id", "notes"],
+            select(GarmentSupplier.id, literal(data.notes, SampleSet.notes.type)).where(
+                GarmentSupplier.garment_id == garment_id,
+                GarmentSupplier.supplier_id == supplier_id,
+            ),
+        ),
+    )
+    if sample is None:
+        raise NotFoundError("GarmentSupplier", 0)
+    await aggregate_service.adjust(
+        db, aggregate_service.SAMPLE_STATUS, {sample.status: 1}
+    )
+    change_feed.publish(
+        db,
+        "sample_set.created",
+        garment_id=garment_id,
+        supplier_id=supplier_id,
+        sample_set=SampleSetResponse.model_validate(sample),
+    )
     await db.commit()
-    await db.refresh(sample)
     return sample
 
 
@@ -135,23 +419,62 @@ async def update_sample_set(
     supplier_id: int,
     sample_id: int,
     data: SampleSetUpdate,
-) -> SampleSet:
-    gs = await _get_garment_supplier(db, garment_id, supplier_id)
-    result = await db.execute(
-        select(SampleSet).where(
+) -> Row:
+    # The pair, the sample and the transition are all checked by the WHERE
+    # clause; on a miss, one lookup finds which check failed
+    previous = (
+        select(SampleSet.id, SampleSet.status)
+        .join(GarmentSupplier, GarmentSupplier.id == SampleSet.garment_supplier_id)
+        .where(
             SampleSet.id == sample_id,
-            SampleSet.garment_supplier_id == gs.id,
+            GarmentSupplier.garment_id == garment_id,
+            GarmentSupplier.supplier_id == supplier_id,
+            SampleSet.status.in_(sample_transition_sources(data.status)),
         )
+        .with_for_update(of=SampleSet)
+        .subquery()
     )
-    sample = result.scalar_one_or_none()
-    if not sample:
-        raise NotFoundError("SampleSet", sample_id)
-
-    validate_sample_transition(sample.status, data.status)
-    sample.status = data.status
+    values = {"status": data.status}
     if data.notes is not None:
-        sample.notes = data.notes
+        values["notes"] = data.notes
+    sample = await writes.write(
+        db,
+        update(SampleSet).where(SampleSet.id == previous.c.id).values(**values),
+        previous.c.status.label("previous_status"),
+    )
+    if sample is None:
+        result = await db.execute(
+            select(GarmentSupplier.id, SampleSet.status)
+            .outerjoin(
+                SampleSet,
+                (SampleSet.garment_supplier_id == GarmentSupplier.id)
+                & (SampleSet.id == sample_id),
+            )
+            .where(
+                GarmentSupplier.garment_id == garment_id,
+                GarmentSupplier.supplier_id == supplier_id,
+            )
+        )
+        found = result.one_or_none()
+        if found is None:
+            raise NotFoundError("GarmentSupplier", 0)
+        current = found.status
+        if current is None:
+            raise NotFoundError("SampleSet", sample_id)
+        raise InvalidTransitionError(
+            current, data.status, sorted(SAMPLE_TRANSITIONS.get(current, set()))
+        )
 
+    await aggregate_service.moved(
+        db, aggregate_service.SAMPLE_STATUS, sample.previous_status, data.status
+    )
+    change_feed.publish(
+        db,
+        "sample_set.updated",
+        garment_id=garment_id,
+        supplier_id=supplier_id,
+        sample_set=SampleSetResponse.model_validate(sample),
+        previous_status=sample.previous_status,
+    )
     await db.commit()
-    await db.refresh(sample)
-    return sample
+    return sample
\ No newline at end of file
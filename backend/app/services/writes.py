@@ -0,0 +1,32 @@
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.dml import UpdateBase
+
+# Write path: INSERT/UPDATE ... RETURNING the response shape.
+#
+# A write returns every column of the written row, plus any joined names the
+# response needs, from the statement itself; there is no refresh() after the
+# commit. Rows are plain Row objects, which response models read through
+# from_attributes like ORM instances.
+
+
+def lookup(column, key, label: str):
+    # A joined value for the RETURNING list, e.g. the supplier's name. `key` is
+    # a column of the written table (correlated; UPDATE only) or a known value.
+    # Names are looked up by primary key, so this is one index probe.
+    return (
+        select(column)
+        .where(column.table.primary_key.columns[0] == key)
+        .scalar_subquery()
+        .label(label)
+    )
+
+
+async def write(db: AsyncSession, stmt: UpdateBase, *extra) -> Row | None:
+    # None when the statement's WHERE matched nothing
+    result = await db.execute(
+        stmt.returning(*stmt.table.columns, *extra).execution_options(
+            synchronize_session=False
+        )
+    )
+    return result.one_or_none()
@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+from pathlib import Path
+from typing import AsyncIterator
+
+from sqlalchemy import Row, func, select
+
+from app.config import get_settings
+from app.database import Base, engine, async_session
+from app.exceptions import AppException, ValidationError
+from app.models import Garment
+from app.schemas.job import ExportGarmentsJob, ImportGarmentsJob, TransitionGarmentsJob, job_spec
+from app.services import (
+    export_service, garment_service, history_service, import_service, job_service
+)
+from app.services.job_service import JobCancelled, JobLost
+from app.services.lifecycle import garment_transition_sources, validate_garment_transition
+
+# Background job worker.
+#
+#     python -m app.worker --concurrency 4
+#
+# Each of the --concurrency loops claims and runs one job at a time. Any
+# number of worker processes can drain the queue side by side; claims use
+# SKIP LOCKED, so they never block on one another. Handlers call the service
+# modules with their own sessions and report progress through JobContext,
+# which is where cancellation surfaces. An AppException (invalid transition,
+# missing file) fails the job at once; any other error is retried with
+# backoff until max_attempts. SIGTERM/SIGINT stop claiming and let running
+# jobs finish.
+
+log = logging.getLogger("app.worker")
+
+_TRANSITION_BATCH = 1000
+_READ_CHUNK = 1 << 20
+# Progress is written at most this often; keep_alive covers the gaps
+_PROGRESS_INTERVAL = 1.0
+# Import results keep the counts but only the first row errors
+_MAX_REPORTED_ERRORS = 1000
+
+
+class JobContext:
+    def __init__(self, job_id: int, worker: str):
+        self.job_id = job_id
+        self.worker = worker
+        # Why keep_alive stopped the handler, if it did
+        self.stopped: Exception | None = None
+        self._total: int | None = None
+        self._reported = 0.0
+
+    async def progress(self, done: int, total: int | None = None) -> None:
+        # Raises JobCancelled or JobLost, so handlers stop at a progress point
+        now = time.monotonic()
+        if total is not None:
+            self._total = total
+        elif done != self._total and now - self._reported < _PROGRESS_INTERVAL:
+            return
+        self._reported = now
+        async with async_session() as db:
+            await job_service.heartbeat(db, self.job_id, self.worker, done, total)
+
+    async def keep_alive(self, handler: asyncio.Task) -> None:
+        # Holds the lease through long steps without progress points (one
+        # big import transaction) and cancels the handler mid-step when the
+        # job is cancelled or lost
+        interval = get_settings().job_lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with async_session() as db:
+                    await job_service.heartbeat(db, self.job_id, self.worker)
+            except (JobCancelled, JobLost) as exc:
+                self.stopped = exc
+                handler.cancel()
+                return
+            except Exception:
+                log.warning("job %s: heartbeat failed", self.job_id, exc_info=True)
+
+
+def _job_file(name: str) -> Path:
+    directory = Path(get_settings().job_files_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / name
+
+
+async def _transition_garments(ctx: JobContext, job: TransitionGarmentsJob) -> dict:
+    async with async_session() as db:
+        if job.garment_ids:
+            garment_ids = sorted(set(job.garment_ids))
+        else:
+            if job.stage:
+                validate_garment_transition(job.stage, job.target_stage)
+                stages = {job.stage}
+            else:
+                stages = garment_transition_sources(job.target_stage)
+            result = await db.execute(
+                select(Garment.id).where(Garment.lifecycle_stage.in_(stages)).order_by(Garment.id)
+            )
+            garment_ids = list(result.scalars())
+        await ctx.progress(0, len(garment_ids))
+
+        transitioned = rejected = 0
+        for start in range(0, len(garment_ids), _TRANSITION_BATCH):
+            # Commits per batch, so a retry or cancel keeps the batches done
+            outcome = await garment_service.transition_garments(
+                db, garment_ids[start : start + _TRANSITION_BATCH], job.target_stage
+            )
+            transitioned += len(outcome.transitioned)
+            rejected += len(outcome.rejected)
+            await ctx.progress(transitioned + rejected)
+    return {"target_stage": job.target_stage, "transitioned": transitioned, "rejected": rejected}
+
+
+async def _export_garments(ctx: JobContext, job: ExportGarmentsJob) -> dict:
+    async with async_session() as db:
+        stmt = select(func.count()).select_from(Garment)
+        if job.stage:
+            stmt = stmt.where(Garment.lifecycle_stage == job.stage)
+        total = (await db.execute(stmt)).scalar_one()
+    await ctx.progress(0, total)
+
+    exported = 0
+
+    async def counted(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        nonlocal exported
+        async for chunk in chunks:
+            # One document per line
+            exported += chunk.count(b"\n")
+            await ctx.progress(exported)
+            yield chunk
+
+    body = counted(export_service.export_garments(stage=job.stage))
+    name = f"garments-{ctx.job_id}.ndjson"
+    if job.gzip:
+        body = export_service.gzip_stream(body)
+        name += ".gz"
+    path = _job_file(name)
+    # Written aside and renamed, so the file never appears half-written
+    partial = path.with_name(path.name + ".part")
+    size = 0
+    with open(partial, "wb") as out:
+        async for chunk in body:
+            await asyncio.to_thread(out.write, chunk)
+            size += len(chunk)
+    os.replace(partial, path)
+    return {"file": name, "garments": exported, "bytes": size}
+
+
+async def _import_garments(ctx: JobContext, job: ImportGarmentsJob) -> dict:
+    path = _job_file(job.file)
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        raise ValidationError(f"Import file '{job.file}' not found")
+    await ctx.progress(0, size)
+
+    async def chunks() -> AsyncIterator[bytes]:
+        read = 0
+        with open(path, "rb") as source:
+            while chunk := await asyncio.to_thread(source.read, _READ_CHUNK):
+                read += len(chunk)
+                await ctx.progress(read)
+                yield chunk
+
+    # One transaction, so a failed attempt leaves nothing behind to retry over
+    async with async_session() as db:
+        outcome = await import_service.import_garments(db, chunks(), job.format)
+    result = outcome.model_dump()
+    result["errors"] = result["errors"][:_MAX_REPORTED_ERRORS]
+    return result
+
+
+_HANDLERS = {
+    "transition_garments": _transition_garments,
+    "export_garments": _export_garments,
+    "import_garments": _import_garments,
+}
+
+
+async def run_job(job: Row, worker: str) -> None:
+    if job.attempts > job.max_attempts:
+        # Reclaimed after the worker running its last attempt died
+        async with async_session() as db:
+            await job_service.fail(db, job, worker, "Worker lost during the last attempt")
+        return
+    ctx = JobContext(job.id, worker)
+    try:
+        if job.cancel_requested:
+            raise JobCancelled()
+        spec = job_spec.validate_python({"kind": job.kind, **job.payload})
+        handler = asyncio.create_task(_HANDLERS[job.kind](ctx, spec))
+        keep_alive = asyncio.create_task(ctx.keep_alive(handler))
+        try:
+            result = await handler
+        except asyncio.CancelledError:
+            if ctx.stopped is None:
+                raise
+            raise ctx.stopped
+        finally:
+            keep_alive.cancel()
+    except JobCancelled:
+        log.info("job %s cancelled", job.id)
+        async with async_session() as db:
+            await job_service.cancelled(db, job.id, worker)
+    except JobLost:
+        log.warning("job %s: lease lost to another worker", job.id)
+    except AppException as exc:
+        log.info("job %s failed: %s", job.id, exc.detail)
+        async with async_session() as db:
+            await job_service.fail(db, job, worker, exc.detail, retry=False)
+    except Exception as exc:
+        log.exception("job %s: attempt %s/%s failed", job.id, job.attempts, job.max_attempts)
+        async with async_session() as db:
+            await job_service.fail(db, job, worker, f"{type(exc).__name__}: {exc}")
+    else:
+        log.info("job %s succeeded", job.id)
+        async with async_session() as db:
+            await job_service.succeed(db, job.id, worker, result)
+
+
+async def run_once(worker: str) -> bool:
+    # Claims and runs one job; False when none was ready
+    async with async_session() as db:
+        job = await job_service.claim(db, worker)
+    if job is None:
+        return False
+    log.info("job %s (%s) claimed, attempt %s", job.id, job.kind, job.attempts)
+    await run_job(job, worker)
+    return True
+
+
+async def work(concurrency: int, stop: asyncio.Event) -> None:
+    poll = get_settings().job_poll_seconds
+    name = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def loop(n: int) -> None:
+        while not stop.is_set():
+            try:
+                ran = await run_once(f"{name}:{n}")
+            except Exception:
+                log.exception("claiming a job failed")
+                ran = False
+            if not ran:
+                try:
+                    await asyncio.wait_for(stop.wait(), poll)
+                except TimeoutError:
+                    pass
+
+    await asyncio.gather(*(loop(n) for n in range(concurrency)))
+
+
+async def _main(concurrency: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await history_service.ensure_partitions(conn)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    log.info("worker started, concurrency %s", concurrency)
+    await work(concurrency, stop)
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--concurrency", type=int, default=1, help="jobs run at once")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(_main(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
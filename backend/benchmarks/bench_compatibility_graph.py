@@ -0,0 +1,61 @@
+"""Latency of the in-memory attribute incompatibility check.
+
+Builds an IncompatibilityGraph with 10k attributes and 1M random rules and
+times `conflicting_ids` for garments carrying a handful of attributes, the
+shape `add_attribute` sees in practice. No database is needed.
+
+    python -m benchmarks.bench_compatibility_graph [--attributes N] [--rules N]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.compatibility_graph import IncompatibilityGraph
+from benchmarks import percentile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attributes", type=int, default=10_000)
+    parser.add_argument("--rules", type=int, default=1_000_000)
+    parser.add_argument("--checks", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ids = range(1, args.attributes + 1)
+    names = {i: f"attribute-{i}" for i in ids}
+    pairs: set[tuple[int, int]] = set()
+    while len(pairs) < args.rules:
+        a, b = rng.sample(ids, 2)
+        pairs.add((min(a, b), max(a, b)))
+
+    start = time.perf_counter()
+    graph = IncompatibilityGraph(names, pairs)
+    build_s = time.perf_counter() - start
+
+    samples = []
+    conflicts = 0
+    for _ in range(args.checks):
+        candidate = rng.choice(ids)
+        existing = rng.sample(ids, rng.randint(1, 10))
+        start = time.perf_counter()
+        hits = graph.conflicting_ids(candidate, existing)
+        samples.append((time.perf_counter() - start) * 1e6)
+        conflicts += bool(hits)
+
+    print(f"attributes={args.attributes} rules={len(pairs)} checks={args.checks}")
+    print(f"build: {build_s:.2f}s")
+    print(
+        "check latency (us): "
+        f"mean={statistics.fmean(samples):.2f} "
+        f"p50={percentile(samples, 50):.2f} "
+        f"p95={percentile(samples, 95):.2f} "
+        f"p99={percentile(samples, 99):.2f}"
+    )
+    print(f"checks with conflicts: {conflicts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Throughput and peak memory of the list-endpoint read paths.
+
+Encodes N garments to JSON bytes two ways against the benchmark database:
+
+    orm      select(Garment) into the session, then validate and dump through
+             the list[GarmentResponse] response model (from_attributes)
+    records  select(columns) into slotted records (app.records), then orjson
+
+Each path runs in its own subprocess so the peak RSS it reports (VmHWM) is
+not shared with the other. The database is the one bench_services fills:
+
+    python -m benchmarks.bench_list_path --scale 100k --rows 50000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks import percentile
+from benchmarks.bench_services import SCALES, _create_database, _database_url, _prepare
+
+PATHS = ("orm", "records")
+
+
+async def _orm(rows: int) -> bytes:
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+
+    from app.database import async_session
+    from app.models.garment import Garment
+    from app.schemas.garment import GarmentResponse
+
+    adapter = TypeAdapter(list[GarmentResponse])
+    async with async_session() as db:
+        result = await db.execute(select(Garment).order_by(Garment.id).limit(rows))
+        garments = result.scalars().all()
+        return adapter.dump_json(adapter.validate_python(garments, from_attributes=True))
+
+
+async def _records(rows: int) -> bytes:
+    from sqlalchemy import select
+
+    from app import records
+    from app.database import async_session
+    from app.models.garment import Garment
+    from app.records import GarmentRecord
+
+    async with async_session() as db:
+        result = await db.execute(
+            select(*records.columns(Garment, GarmentRecord)).order_by(Garment.id).limit(rows)
+        )
+        return records.encode(records.from_rows(GarmentRecord, result))
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM rather than ru_maxrss, which Linux carries over from the parent
+    # across exec
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("no VmHWM in /proc/self/status")
+
+
+async def _measure(path: str, rows: int, iterations: int) -> dict:
+    from app.database import engine
+
+    run = {"orm": _orm, "records": _records}[path]
+    # Open the pool and import everything outside the measured section
+    await run(1)
+    baseline_mb = _peak_rss_mb()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        body = await run(rows)
+        durations.append(time.perf_counter() - start)
+    await engine.dispose()
+    p50 = percentile(durations, 50)
+    return {
+        "rows_per_s": rows / p50,
+        "p50_ms": p50 * 1e3,
+        "bytes": len(body),
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_rss_growth_mb": _peak_rss_mb() - baseline_mb,
+    }
+
+
+def _spawn(args, path: str) -> dict:
+    out = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.bench_list_path",
+            "--scale", args.scale, "--database-url", os.environ["DATABASE_URL"],
+            "--rows", str(args.rows), "--iterations", str(args.iterations), "--path", path,
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="100k")
+    parser.add_argument("--database-url")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--path", choices=PATHS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Must be set before app.database builds its engine
+    os.environ["DATABASE_URL"] = _database_url(args)
+    if args.path:
+        print(json.dumps(asyncio.run(_measure(args.path, args.rows, args.iterations))))
+        return
+
+    async def prepare():
+        from app.database import engine
+
+        await _create_database(os.environ["DATABASE_URL"])
+        await _prepare(SCALES[args.scale], args.seed)
+        await engine.dispose()
+
+    asyncio.run(prepare())
+    print(f"scale={args.scale} rows={args.rows} iterations={args.iterations}")
+    results = {path: _spawn(args, path) for path in PATHS}
+    for path, r in results.items():
+        print(
+            f"{path:<8} {r['rows_per_s']:10,.0f} rows/s p50={r['p50_ms']:8.1f}ms "
+            f"peak_rss={r['peak_rss_mb']:7.1f}MB (+{r['peak_rss_growth_mb']:.1f}MB) "
+            f"body={r['bytes'] / 1e6:.1f}MB"
+        )
+    orm, rec = results["orm"], results["records"]
+    print(
+        f"records vs orm: {rec['rows_per_s'] / orm['rows_per_s']:.1f}x rows/s, "
+        f"{rec['peak_rss_growth_mb'] - orm['peak_rss_growth_mb']:+.1f}MB peak RSS growth"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1207 @@
+import asyncio
+import importlib
+import pkgutil
+
+import pytest
+from fastapi.routing import APIRoute
+
+import app.routers
+from app.services import reference_cache
+
+# Maximum SQL statements per request. Lower a budget when an endpoint gets
+# cheaper; raising one needs a reason in review. Garment and supplier pipeline
+# mutations include one pg_notify for the change feed, sent at commit, and
+# transitions one statement appending to the history and its rollups.
+BUDGETS = {
+    "GET /api/garments": 1,
+    "GET /api/garments (search)": 1,
+    "POST /api/garments": 4,
+    "POST /api/garments/import": 17,
+    "POST /api/garments/bulk/attributes": 7,
+    "POST /api/garments/bulk/transition": 5,
+    "GET /api/garments/export": 5,
+    "GET /api/garments/{garment_id}": 5,
+    "GET /api/garments/{garment_id} (If-None-Match)": 1,
+    "GET /api/garments/{garment_id}/ancestors": 2,
+    "GET /api/garments/{garment_id}/descendants": 2,
+    # Includes touching the parent when the garment is a variation
+    "PUT /api/garments/{garment_id}": 4,
+    # ORM cascade: loads each child collection, then sample sets per supplier
+    "DELETE /api/garments/{garment_id}": 18,
+    # Includes touching the parent when the garment is a variation
+    "POST /api/garments/{garment_id}/transition": 5,
+    "POST /api/garments/{garment_id}/variations": 6,
+    # One statement for checks, write and touch, then the search document and
+    # the change feed. Adding an attribute reads the compatibility graph, which
+    # is loaded once per process.
+    "POST /api/garments/{garment_id}/materials": 3,
+    "DELETE /api/garments/{garment_id}/materials/{material_id}": 3,
+    "POST /api/garments/{garment_id}/attributes": 3,
+    "POST /api/garments/{garment_id}/attributes/bulk": 7,
+    "DELETE /api/garments/{garment_id}/attributes/{attribute_id}": 3,
+    "POST /api/garments/{garment_id}/suppliers": 7,
+    "POST /api/garments/{garment_id}/suppliers/{supplier_id}/transition": 5,
+    "GET /api/garments/{garment_id}/suppliers/{supplier_id}/samples": 2,
+    "POST /api/garments/{garment_id}/suppliers/{supplier_id}/samples": 3,
+    "PUT /api/garments/{garment_id}/suppliers/{supplier_id}/samples/{sample_id}": 3,
+    "GET /api/samples/inbox": 1,
+    "GET /api/materials": 1,
+    # Reference data writes include the pg_notify that invalidates other
+    # processes' cached responses and compatibility graph
+    "POST /api/materials": 2,
+    "GET /api/attributes": 1,
+    "POST /api/attributes": 2,
+    "GET /api/attributes/incompatibilities": 1,
+    "POST /api/attributes/incompatibilities": 2,
+    "GET /api/suppliers": 1,
+    "POST /api/suppliers": 2,
+    "GET /api/suppliers/offers": 1,
+    "GET /api/suppliers/offers/bands": 1,
+    "GET /api/suppliers/{supplier_id}": 1,
+    "GET /api/suppliers/{supplier_id}/portfolio": 1,
+    "PUT /api/suppliers/{supplier_id}": 4,
+    "DELETE /api/suppliers/{supplier_id}": 4,
+    "GET /api/dashboard/aggregates": 1,
+    "GET /api/dashboard/time-in-stage": 1,
+    "GET /api/dashboard/throughput": 1,
+    "POST /api/jobs": 1,
+    "GET /api/jobs/{job_id}": 1,
+    "POST /api/jobs/{job_id}/cancel": 2,
+    # LISTEN runs on the change feed's own connection, outside the pool
+    "GET /api/events": 0,
+}
+
+
+def _router_endpoints() -> set[str]:
+    endpoints = set()
+    for module_info in pkgutil.iter_modules(app.routers.__path__):
+        module = importlib.import_module(f"app.routers.{module_info.name}")
+        for route in module.router.routes:
+            if isinstance(route, APIRoute):
+                endpoints.update(f"{method} /api{route.path}" for method in route.methods)
+    return endpoints
+
+
+def test_every_endpoint_has_a_budget():
+    budgeted = {key.split(" (")[0] for key in BUDGETS}
+    assert sorted(_router_endpoints() - budgeted) == []
+
+
+# --- Fixtures ---
+
+
+@pytest.fixture(scope="module")
+def reference(client):
+    materials = {m["name"]: m["id"] for m in client.get("/api/materials").json()}
+    attributes = {a["name"]: a["id"] for a in client.get("/api/attributes").json()}
+    suppliers = {s["name"]: s["id"] for s in client.get("/api/suppliers").json()}
+    return materials, attributes, suppliers
+
+
+@pytest.fixture
+def make_garment(client, reference):
+    materials, attributes, suppliers = reference
+
+    # A garment with a full set of children, so lazy loads would repeat
+    def make(name: str = "Budget Tee", with_supplier: bool = True) -> dict:
+        garment = client.post("/api/garments", json={"name": name}).json()
+        base = f"/api/garments/{garment['id']}"
+        client.post(f"{base}/materials", json={"material_id": materials["cotton"], "percentage": 60})
+        client.post(f"{base}/materials", json={"material_id": materials["linen"], "percentage": 40})
+        for name in ("crew neck", "casual", "slim"):
+            client.post(f"{base}/attributes", json={"attribute_id": attributes[name]})
+        if with_supplier:
+            client.post(f"{base}/suppliers", json={"supplier_id": suppliers["Fabric Co Ltd"], "offer_price": 12.5})
+            client.post(f"{base}/suppliers", json={"supplier_id": suppliers["Premium Mills"], "offer_price": 19})
+        client.post(f"{base}/variations", json={"name": f"{garment['name']} (variant)"})
+        return garment
+
+    return make
+
+
+@pytest.fixture(scope="module")
+def catalog(client, reference):
+    # Enough rows that a per-row query in a list or export path repeats
+    materials, attributes, _ = reference
+    for i in range(6):
+        garment = client.post("/api/garments", json={"name": f"Catalog Piece {i}"}).json()
+        client.post(
+            f"/api/garments/{garment['id']}/materials",
+            json={"material_id": materials["wool"], "percentage": 100},
+        )
+        client.post(
+            f"/api/garments/{garment['id']}/attributes",
+            json={"attribute_id": attributes["regular"]},
+        )
+
+
+# --- Garments ---
+
+
+def test_list_garments(client, budget, catalog):
+    with budget("GET /api/garments"):
+        response = client.get("/api/garments", params={"limit": 5})
+    assert response.status_code == 200
+    with budget("GET /api/garments"):
+        response = client.get(
+            "/api/garments", params={"limit": 5, "cursor": response.headers["X-Next-Cursor"]}
+        )
+    assert response.status_code == 200
+
+
+def test_search_garments(client, budget, catalog):
+    with budget("GET /api/garments (search)"):
+        response = client.get("/api/garments", params={"search": "catalog wool"})
+    assert response.status_code == 200
+    assert response.json()
+
+
+def test_create_garment(client, budget):
+    with budget("POST /api/garments"):
+        response = client.post("/api/garments", json={"name": "New Hoodie"})
+    assert response.status_code == 201
+
+
+def test_import_garments(client, budget, reference):
+    materials, attributes, _ = reference
+    rows = "\n".join(
+        f"Imported {i},,CONCEPT,{materials['cotton']}:100,{attributes['casual']}"
+        for i in range(20)
+    )
+    # Later stages only through the lifecycle transitions
+    rows += "\nImported Straight To Production,,PRODUCTION,,"
+    with budget("POST /api/garments/import"):
+        response = client.post(
+            "/api/garments/import",
+            content=f"name,description,lifecycle_stage,materials,attributes\n{rows}\n",
+            headers={"Content-Type": "text/csv"},
+        )
+    assert response.status_code == 200
+    assert (response.json()["imported"], response.json()["failed"]) == (20, 1)
+    (error,) = response.json()["errors"]
+    assert (error["row"], error["detail"].split(":")[0]) == (21, "lifecycle_stage")
+
+
+def test_bulk_add_attributes(client, budget, make_garment, reference):
+    _, attributes, _ = reference
+    garment_ids = [make_garment(with_supplier=False)["id"] for _ in range(3)]
+    with budget("POST /api/garments/bulk/attributes"):
+        response = client.post(
+            "/api/garments/bulk/attributes",
+            json={
+                "garment_ids": garment_ids,
+                "attribute_ids": [attributes["with logo"], attributes["with pocket"]],
+            },
+        )
+    assert response.status_code == 201
+    assert response.json()["created"] == 6
+
+
+def test_bulk_transition(client, budget, catalog):
+    garment_ids = [g["id"] for g in client.get("/api/garments", params={"stage": "CONCEPT"}).json()]
+    with budget("POST /api/garments/bulk/transition"):
+        response = client.post(
+            "/api/garments/bulk/transition",
+            json={"garment_ids": garment_ids, "target_stage": "DESIGN"},
+        )
+    assert response.status_code == 200
+    assert response.json()["transitioned"]
+
+
+def test_export_garments(client, budget, catalog):
+    with budget("GET /api/garments/export"):
+        response = client.get("/api/garments/export")
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) >= 6
+
+
+def test_garment_detail(client, budget, make_garment):
+    garment = make_garment()
+    with budget("GET /api/garments/{garment_id}"):
+        response = client.get(f"/api/garments/{garment['id']}")
+    assert response.status_code == 200
+
+    with budget("GET /api/garments/{garment_id} (If-None-Match)"):
+        revalidated = client.get(
+            f"/api/garments/{garment['id']}",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+    assert revalidated.status_code == 304
+
+
+def test_update_garment(client, budget, make_garment):
+    garment = make_garment()
+    with budget("PUT /api/garments/{garment_id}"):
+        response = client.put(f"/api/garments/{garment['id']}", json={"name": "Renamed Tee"})
+    assert response.status_code == 200
+
+
+def test_delete_garment(client, budget, make_garment):
+    garment = make_garment()
+    with budget("DELETE /api/garments/{garment_id}"):
+        response = client.delete(f"/api/garments/{garment['id']}")
+    assert response.status_code == 204
+
+
+def test_transition_garment(client, budget, make_garment):
+    garment = make_garment()
+    with budget("POST /api/garments/{garment_id}/transition"):
+        response = client.post(
+            f"/api/garments/{garment['id']}/transition", json={"target_stage": "DESIGN"}
+        )
+    assert response.status_code == 200
+
+
+def test_create_variation(client, budget, make_garment):
+    garment = make_garment()
+    with budget("POST /api/garments/{garment_id}/variations"):
+        response = client.post(
+            f"/api/garments/{garment['id']}/variations", json={"name": "Cropped Tee"}
+        )
+    assert response.status_code == 201
+
+
+def test_lineage(client, budget):
+    # root <- a <- b <- c
+    chain = [client.post("/api/garments", json={"name": "Lineage Root"}).json()]
+    for name in ("a", "b", "c"):
+        chain.append(
+            client.post(f"/api/garments/{chain[-1]['id']}/variations", json={"name": name}).json()
+        )
+    root, a, b, c = (g["id"] for g in chain)
+
+    with budget("GET /api/garments/{garment_id}/ancestors"):
+        response = client.get(f"/api/garments/{c}/ancestors", params={"limit": 2})
+    assert [(n["id"], n["depth"]) for n in response.json()] == [(b, 1), (a, 2)]
+    with budget("GET /api/garments/{garment_id}/ancestors"):
+        response = client.get(
+            f"/api/garments/{c}/ancestors", params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]}
+        )
+    assert [n["id"] for n in response.json()] == [root]
+
+    with budget("GET /api/garments/{garment_id}/descendants"):
+        response = client.get(f"/api/garments/{root}/descendants", params={"max_depth": 2})
+    assert [(n["id"], n["depth"]) for n in response.json()] == [(a, 1), (b, 2)]
+
+    # Deleting a makes b the root of its own tree
+    client.delete(f"/api/garments/{a}")
+    assert client.get(f"/api/garments/{root}/descendants").json() == []
+    assert [n["id"] for n in client.get(f"/api/garments/{c}/ancestors").json()] == [b]
+    assert [n["id"] for n in client.get(f"/api/garments/{b}/descendants").json()] == [c]
+
+
+def test_add_and_remove_material(client, budget, make_garment, reference):
+    materials, _, _ = reference
+    garment = make_garment()
+    client.delete(f"/api/garments/{garment['id']}/materials/{materials['linen']}")
+    with budget("POST /api/garments/{garment_id}/materials"):
+        response = client.post(
+            f"/api/garments/{garment['id']}/materials",
+            json={"material_id": materials["silk"], "percentage": 40},
+        )
+    assert response.status_code == 201
+
+    with budget("DELETE /api/garments/{garment_id}/materials/{material_id}"):
+        response = client.delete(f"/api/garments/{garment['id']}/materials/{materials['silk']}")
+    assert response.status_code == 204
+
+
+def test_add_and_remove_attribute(client, budget, make_garment, reference):
+    _, attributes, _ = reference
+    garment = make_garment()
+    with budget("POST /api/garments/{garment_id}/attributes"):
+        response = client.post(
+            f"/api/garments/{garment['id']}/attributes",
+            json={"attribute_id": attributes["with zipper"]},
+        )
+    assert response.status_code == 201
+
+    with budget("POST /api/garments/{garment_id}/attributes/bulk"):
+        response = client.post(
+            f"/api/garments/{garment['id']}/attributes/bulk",
+            json={"attribute_ids": [attributes["with logo"], attributes["with pocket"]]},
+        )
+    assert response.status_code == 201
+
+    with budget("DELETE /api/garments/{garment_id}/attributes/{attribute_id}"):
+        response = client.delete(
+            f"/api/garments/{garment['id']}/attributes/{attributes['with zipper']}"
+        )
+    assert response.status_code == 204
+
+
+def test_child_mutation_errors(client, budget, make_garment, reference):
+    materials, attributes, _ = reference
+    garment = make_garment(with_supplier=False)
+    base = f"/api/garments/{garment['id']}"
+
+    with budget("POST /api/garments/{garment_id}/materials"):
+        response = client.post(f"{base}/materials", json={"material_id": materials["silk"], "percentage": 5})
+    assert response.json()["error"] == "VALIDATION_ERROR"
+    with budget("POST /api/garments/{garment_id}/materials"):
+        response = client.post(f"{base}/materials", json={"material_id": 999_999, "percentage": 5})
+    assert response.status_code == 404
+    with budget("POST /api/garments/{garment_id}/attributes"):
+        response = client.post(f"{base}/attributes", json={"attribute_id": attributes["short sleeve"]})
+    assert response.status_code == 201
+    with budget("POST /api/garments/{garment_id}/attributes"):
+        response = client.post(f"{base}/attributes", json={"attribute_id": attributes["long sleeve"]})
+    assert response.json()["error"] == "INCOMPATIBLE_ATTRIBUTE"
+    assert "short sleeve" in response.json()["detail"]
+    with budget("DELETE /api/garments/{garment_id}/attributes/{attribute_id}"):
+        response = client.delete(f"{base}/attributes/{attributes['long sleeve']}")
+    assert response.status_code == 404
+
+    for stage in ("DESIGN", "DEVELOPMENT", "SAMPLING", "PRODUCTION"):
+        client.post(f"{base}/transition", json={"target_stage": stage})
+    with budget("DELETE /api/garments/{garment_id}/materials/{material_id}"):
+        response = client.delete(f"{base}/materials/{materials['cotton']}")
+    assert response.json()["error"] == "PRODUCTION_PROTECTED"
+    with budget("POST /api/garments/{garment_id}/attributes"):
+        response = client.post("/api/garments/999999/attributes", json={"attribute_id": attributes["formal"]})
+    assert response.status_code == 404
+
+
+def test_supplier_pipeline(client, budget, make_garment, reference):
+    _, _, suppliers = reference
+    garment = make_garment(with_supplier=False)
+    supplier_id = suppliers["Budget Textiles"]
+    base = f"/api/garments/{garment['id']}/suppliers"
+
+    with budget("POST /api/garments/{garment_id}/suppliers"):
+        response = client.post(base, json={"supplier_id": supplier_id, "offer_price": 9.5})
+    assert response.status_code == 201
+    assert response.json()["supplier_name"] == "Budget Textiles"
+
+    with budget("POST /api/garments/{garment_id}/suppliers/{supplier_id}/transition"):
+        response = client.post(
+            f"{base}/{supplier_id}/transition", json={"target_status": "SAMPLING"}
+        )
+    assert response.status_code == 200
+    assert (response.json()["status"], response.json()["supplier_name"]) == ("SAMPLING", "Budget Textiles")
+    with budget("POST /api/garments/{garment_id}/suppliers/{supplier_id}/transition"):
+        response = client.post(
+            f"{base}/{supplier_id}/transition", json={"target_status": "IN_STORE"}
+        )
+    assert response.json()["error"] == "INVALID_TRANSITION"
+
+    samples = f"{base}/{supplier_id}/samples"
+    with budget("POST /api/garments/{garment_id}/suppliers/{supplier_id}/samples"):
+        response = client.post(samples, json={"notes": "first round"})
+    assert response.status_code == 201
+    client.post(samples, json={"notes": "second round"})
+    client.post(samples, json={"notes": "third round"})
+
+    sample_id = response.json()["id"]
+    with budget("PUT /api/garments/{garment_id}/suppliers/{supplier_id}/samples/{sample_id}"):
+        response = client.put(f"{samples}/{sample_id}", json={"status": "APPROVED"})
+    assert response.json()["error"] == "INVALID_TRANSITION"
+    with budget("PUT /api/garments/{garment_id}/suppliers/{supplier_id}/samples/{sample_id}"):
+        response = client.put(f"{samples}/{sample_id}", json={"status": "RECEIVED", "notes": "arrived"})
+    assert response.status_code == 200
+    assert (response.json()["status"], response.json()["notes"]) == ("RECEIVED", "arrived")
+
+    with budget("GET /api/garments/{garment_id}/suppliers/{supplier_id}/samples"):
+        response = client.get(samples)
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+
+def test_compare_offers(client, budget, make_garment, reference):
+    _, _, suppliers = reference
+    fabric, cheap, premium = (
+        suppliers[name] for name in ("Fabric Co Ltd", "Budget Textiles", "Premium Mills")
+    )
+    first, second = (make_garment(with_supplier=False) for _ in range(2))
+    for garment, offers in (
+        (first, [(fabric, 12.5, 30), (cheap, 9.5, 45), (premium, 19, 10)]),
+        (second, [(fabric, 20, 20), (cheap, None, 15)]),
+    ):
+        for supplier_id, price, lead_time in offers:
+            client.post(
+                f"/api/garments/{garment['id']}/suppliers",
+                json={"supplier_id": supplier_id, "offer_price": price, "lead_time_days": lead_time},
+            )
+    params = {"garment_id": [first["id"], second["id"]], "price_weight": 0.8}
+
+    with budget("GET /api/suppliers/offers"):
+        response = client.get("/api/suppliers/offers", params={**params, "limit": 1})
+    assert response.status_code == 200
+    (ranking,) = response.json()["garments"]
+    assert ranking["garment_id"] == first["id"]
+    assert (
+        ranking["best_price_supplier_id"],
+        ranking["best_lead_time_supplier_id"],
+        ranking["best_score_supplier_id"],
+    ) == (cheap, premium, cheap)
+    assert [(o["supplier_id"], o["score_rank"]) for o in ranking["offers"]] == [
+        (cheap, 1), (fabric, 2), (premium, 3)
+    ]
+
+    with budget("GET /api/suppliers/offers"):
+        response = client.get(
+            "/api/suppliers/offers", params={**params, "cursor": response.headers["X-Next-Cursor"]}
+        )
+    (ranking,) = response.json()["garments"]
+    assert "X-Next-Cursor" not in response.headers
+    # An offer without a price ranks last on price
+    assert (ranking["best_price_supplier_id"], ranking["best_lead_time_supplier_id"]) == (fabric, cheap)
+
+    # Bands cover every filtered garment, a page of suppliers at a time
+    bands = {}
+    cursor = None
+    while True:
+        with budget("GET /api/suppliers/offers/bands"):
+            response = client.get(
+                "/api/suppliers/offers/bands",
+                params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})},
+            )
+        assert len(response.json()) <= 2
+        bands.update((b["supplier_id"], b) for b in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert set(bands) == {fabric, cheap, premium}
+    assert bands[fabric]["offers"] == 2
+    assert (bands[fabric]["price_p50"], bands[fabric]["price_percentile_p50"]) == (16.25, 0.25)
+    assert (bands[cheap]["price_p50"], bands[cheap]["lead_time_p50"]) == (9.5, 30)
+    # Just the suppliers asked for
+    response = client.get(
+        "/api/suppliers/offers/bands", params={**params, "supplier_id": [premium]}
+    )
+    assert [b["supplier_id"] for b in response.json()] == [premium]
+    assert response.json()[0]["price_percentile_p50"] == 1.0
+
+    # Rejected offers are left out unless asked for
+    client.post(
+        f"/api/garments/{second['id']}/suppliers/{cheap}/transition", json={"target_status": "REJECTED"}
+    )
+    rankings = client.get("/api/suppliers/offers", params=params).json()["garments"]
+    assert [o["supplier_id"] for o in rankings[1]["offers"]] == [fabric]
+    rankings = client.get(
+        "/api/suppliers/offers", params={**params, "include_rejected": True}
+    ).json()["garments"]
+    assert len(rankings[1]["offers"]) == 2
+    assert client.get("/api/suppliers/offers", params={"stage": "PRODUCTION", "limit": 1}).status_code == 200
+    response = client.get(
+        "/api/suppliers/offers/bands",
+        params={"stage": first["lifecycle_stage"], "supplier_id": [fabric, premium]},
+    )
+    bands = {b["supplier_id"]: b for b in response.json()}
+    # Over the whole stage: at least both garments' unrejected offers
+    assert bands[fabric]["offers"] >= 2 and bands[premium]["offers"] >= 1
+
+
+def test_sample_inbox(client, budget, make_garment):
+    supplier = client.post("/api/suppliers", json={"name": "Inbox Mills"}).json()
+    garments = [make_garment(with_supplier=False) for _ in range(2)]
+    samples = []
+    for garment in garments:
+        client.post(f"/api/garments/{garment['id']}/suppliers", json={"supplier_id": supplier["id"]})
+        base = f"/api/garments/{garment['id']}/suppliers/{supplier['id']}/samples"
+        for _ in range(2):
+            samples.append((base, client.post(base, json={}).json()["id"]))
+    (base, received), (_, approved) = samples[1], samples[2]
+    client.put(f"{base}/{received}", json={"status": "RECEIVED"})
+    for status in ("RECEIVED", "APPROVED"):
+        client.put(f"{samples[2][0]}/{approved}", json={"status": status})
+    client.post(f"/api/garments/{garments[1]['id']}/transition", json={"target_stage": "DESIGN"})
+
+    params = {"supplier_id": supplier["id"]}
+    with budget("GET /api/samples/inbox"):
+        response = client.get("/api/samples/inbox", params={**params, "limit": 2})
+    assert response.status_code == 200
+    assert [s["id"] for s in response.json()] == [samples[0][1], received]
+    assert response.json()[0]["supplier_name"] == "Inbox Mills"
+    assert response.json()[0]["garment_id"] == garments[0]["id"]
+    with budget("GET /api/samples/inbox"):
+        response = client.get(
+            "/api/samples/inbox", params={**params, "cursor": response.headers["X-Next-Cursor"]}
+        )
+    # The approved sample set has left the inbox
+    assert [s["id"] for s in response.json()] == [samples[3][1]]
+
+    def inbox(**filters):
+        response = client.get("/api/samples/inbox", params={**params, **filters})
+        return [s["id"] for s in response.json()]
+
+    assert inbox(status="RECEIVED") == [received]
+    assert inbox(stage="DESIGN") == [samples[3][1]]
+    assert inbox(order="desc") == [samples[3][1], received, samples[0][1]]
+    assert inbox(min_age_days=1) == []
+    assert client.get("/api/samples/inbox", params={"status": "APPROVED"}).status_code == 422
+
+
+# --- Reference data ---
+
+
+@pytest.mark.parametrize(
+    "path, dataset",
+    [
+        ("/api/materials", reference_cache.MATERIALS),
+        ("/api/attributes", reference_cache.ATTRIBUTES),
+        ("/api/attributes/incompatibilities", reference_cache.INCOMPATIBILITIES),
+        ("/api/suppliers", reference_cache.SUPPLIERS),
+    ],
+)
+def test_reference_lists(client, budget, path, dataset):
+    # Cold cache: one load; warm cache: no queries at all
+    reference_cache.bump(dataset)
+    with budget(f"GET {path}"):
+        response = client.get(path)
+    assert response.status_code == 200
+    with budget(f"GET {path}") as statements:
+        client.get(path)
+    assert statements == []
+
+
+def test_attribute_categories(client):
+    response = client.get("/api/attributes", params={"category": "FIT"})
+    assert {a["category"] for a in response.json()} == {"FIT"}
+    # Not a category: rejected rather than cached under a key of its own
+    keys = set(reference_cache._entries)
+    assert client.get("/api/attributes", params={"category": "fit"}).status_code == 422
+    assert set(reference_cache._entries) == keys
+
+
+def test_reference_write_from_another_process(client):
+    from app.database import async_session
+    from app.models import Material
+    from app.services import change_feed
+
+    response = client.get("/api/materials")
+    etag = response.headers["ETag"]
+    version = reference_cache._versions[reference_cache.MATERIALS]
+
+    async def create_material():
+        # As another process's material service would: without bumping this
+        # process's version
+        async with async_session() as db:
+            db.add(Material(name="ramie"))
+            change_feed.invalidate(db, reference_cache.MATERIALS)
+            await db.commit()
+        async with asyncio.timeout(5):
+            while reference_cache._versions[reference_cache.MATERIALS] == version:
+                await asyncio.sleep(0.01)
+
+    client.portal.call(create_material)
+    response = client.get("/api/materials", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "ramie" in {m["name"] for m in response.json()}
+
+
+def test_create_reference_data(client, budget, reference):
+    _, attributes, _ = reference
+    with budget("POST /api/materials"):
+        response = client.post("/api/materials", json={"name": "hemp"})
+    assert response.status_code == 201
+
+    with budget("POST /api/attributes"):
+        response = client.post("/api/attributes", json={"name": "hooded", "category": "FEATURE"})
+    assert response.status_code == 201
+
+    with budget("POST /api/attributes/incompatibilities"):
+        response = client.post(
+            "/api/attributes/incompatibilities",
+            json={"attribute_id_1": attributes["formal"], "attribute_id_2": response.json()["id"]},
+        )
+    assert response.status_code == 201
+    assert {response.json()["attribute_1_name"], response.json()["attribute_2_name"]} == {"formal", "hooded"}
+
+
+def test_incompatibility_from_another_process(client, make_garment):
+    from app.database import async_session
+    from app.models import AttributeIncompatibility
+    from app.services import change_feed, compatibility_graph
+
+    first, second = (
+        client.post("/api/attributes", json={"name": name, "category": "FIT"}).json()["id"]
+        for name in ("boxy", "fitted")
+    )
+    garment = make_garment(with_supplier=False)
+    base = f"/api/garments/{garment['id']}/attributes"
+    # Loads the graph, which now knows both attributes and no rule for them
+    assert client.post(base, json={"attribute_id": first}).status_code == 201
+
+    async def create_rule():
+        # As another process's attribute service would: without patching this
+        # process's graph
+        async with async_session() as db:
+            db.add(AttributeIncompatibility(attribute_id_1=first, attribute_id_2=second))
+            change_feed.invalidate(db, compatibility_graph.CACHE)
+            await db.commit()
+        async with asyncio.timeout(5):
+            while compatibility_graph._graph is not None:
+                await asyncio.sleep(0.01)
+
+    client.portal.call(create_rule)
+    response = client.post(base, json={"attribute_id": second})
+    assert response.json()["error"] == "INCOMPATIBLE_ATTRIBUTE"
+    assert "boxy" in response.json()["detail"]
+
+
+def test_graph_miss(client, make_garment, monkeypatch):
+    from app.database import async_session
+    from app.models import Attribute, AttributeIncompatibility
+    from app.services import change_feed, compatibility_graph
+
+    garment = make_garment(with_supplier=False)
+    base = f"/api/garments/{garment['id']}/attributes"
+    first = client.post("/api/attributes", json={"name": "cropped", "category": "FIT"}).json()["id"]
+    assert client.post(base, json={"attribute_id": first}).status_code == 201
+    graph = compatibility_graph._graph
+
+    # No such attribute: looked up, but the graph is not reloaded
+    monkeypatch.setattr(compatibility_graph, "_MISS_WINDOW", 0.0)
+    assert client.post(base, json={"attribute_id": 999_999}).status_code == 404
+    assert compatibility_graph._graph is graph
+
+    async def create(name):
+        # As another process would, with its invalidation not yet arrived
+        async with async_session() as db:
+            attribute = Attribute(name=name, category="FIT")
+            db.add(attribute)
+            await db.flush()
+            db.add(AttributeIncompatibility(attribute_id_1=first, attribute_id_2=attribute.id))
+            await db.commit()
+            return attribute.id
+
+    # Within the miss window: only the new attribute's rules are read in
+    monkeypatch.setattr(compatibility_graph, "_MISS_WINDOW", 3600.0)
+    second = client.portal.call(create, "drop shoulder")
+    response = client.post(base, json={"attribute_id": second})
+    assert response.json()["error"] == "INCOMPATIBLE_ATTRIBUTE"
+    assert compatibility_graph._graph is graph and second in graph
+
+    # Past it: reloaded
+    monkeypatch.setattr(compatibility_graph, "_MISS_WINDOW", 0.0)
+    third = client.portal.call(create, "batwing")
+    response = client.post(base, json={"attribute_id": third})
+    assert response.json()["error"] == "INCOMPATIBLE_ATTRIBUTE"
+    assert compatibility_graph._graph is not graph
+
+    # Loaded while the change feed cannot listen: kept, for a while
+    async def deaf():
+        return False
+
+    monkeypatch.setattr(change_feed.feed, "listening", deaf)
+    compatibility_graph.invalidate()
+    missing = "/api/garments/999999/attributes"
+    assert client.post(missing, json={"attribute_id": first}).status_code == 404
+    graph = compatibility_graph._graph
+    assert graph is not None and compatibility_graph._expires_at < float("inf")
+    assert client.post(missing, json={"attribute_id": first}).status_code == 404
+    assert compatibility_graph._graph is graph
+    compatibility_graph.invalidate()
+
+
+def test_supplier_crud(client, budget):
+    with budget("POST /api/suppliers"):
+        response = client.post("/api/suppliers", json={"name": "Northern Knits"})
+    assert response.status_code == 201
+    supplier_id = response.json()["id"]
+
+    with budget("GET /api/suppliers/{supplier_id}"):
+        assert client.get(f"/api/suppliers/{supplier_id}").status_code == 200
+
+    with budget("PUT /api/suppliers/{supplier_id}"):
+        response = client.put(f"/api/suppliers/{supplier_id}", json={"name": "Northern Knits Ltd"})
+    assert response.status_code == 200
+
+    with budget("DELETE /api/suppliers/{supplier_id}"):
+        assert client.delete(f"/api/suppliers/{supplier_id}").status_code == 204
+
+
+def test_supplier_portfolio(client, budget, make_garment):
+    supplier = client.post("/api/suppliers", json={"name": "Portfolio Mills"}).json()
+    portfolio = f"/api/suppliers/{supplier['id']}/portfolio"
+    with budget("GET /api/suppliers/{supplier_id}/portfolio"):
+        response = client.get(portfolio)
+    assert response.status_code == 200
+    assert response.json()["offers"] == []
+    assert response.json()["sample_approval_rate"] is None
+
+    garments = [make_garment(with_supplier=False) for _ in range(3)]
+    for garment, price, lead_time in zip(garments, (10, 20, None), (5, 15, 25)):
+        client.post(
+            f"/api/garments/{garment['id']}/suppliers",
+            json={"supplier_id": supplier["id"], "offer_price": price, "lead_time_days": lead_time},
+        )
+    base = f"/api/garments/{garments[0]['id']}/suppliers/{supplier['id']}"
+    client.post(f"{base}/transition", json={"target_status": "SAMPLING"})
+    for status in ("APPROVED", "REJECTED", None):
+        sample = client.post(f"{base}/samples", json={}).json()
+        if status:
+            client.put(f"{base}/samples/{sample['id']}", json={"status": "RECEIVED"})
+            client.put(f"{base}/samples/{sample['id']}", json={"status": status})
+
+    with budget("GET /api/suppliers/{supplier_id}/portfolio"):
+        response = client.get(portfolio, params={"limit": 2})
+    body = response.json()
+    assert [o["garment_id"] for o in body["offers"]] == [garments[2]["id"], garments[1]["id"]]
+    assert body["offers"][0]["garment_name"] == "Budget Tee"
+    assert body["offers_by_status"]["OFFERED"] == 2
+    assert body["offers_by_status"]["SAMPLING"] == 1
+    assert (body["average_offer_price"], body["average_lead_time_days"]) == (15, 15)
+    assert (body["samples_approved"], body["samples_rejected"]) == (1, 1)
+    assert body["sample_approval_rate"] == 0.5
+
+    with budget("GET /api/suppliers/{supplier_id}/portfolio"):
+        response = client.get(portfolio, params={"cursor": response.headers["X-Next-Cursor"]})
+    assert [o["garment_id"] for o in response.json()["offers"]] == [garments[0]["id"]]
+    assert response.json()["offers_by_status"]["OFFERED"] == 2
+    assert "X-Next-Cursor" not in response.headers
+    with budget("GET /api/suppliers/{supplier_id}/portfolio"):
+        assert client.get("/api/suppliers/999999/portfolio").status_code == 404
+
+
+def test_dashboard_aggregates(client, budget, make_garment, reference):
+    from sqlalchemy import func, select
+
+    from app.database import async_session
+    from app.models import Garment, GarmentSupplier, SampleSet
+
+    _, _, suppliers = reference
+
+    async def recount():
+        async with async_session() as db:
+            counts = {}
+            for field, column in (
+                ("garments_by_stage", Garment.lifecycle_stage),
+                ("suppliers_by_status", GarmentSupplier.status),
+                ("samples_by_status", SampleSet.status),
+            ):
+                result = await db.execute(select(column, func.count()).group_by(column))
+                counts[field] = dict(result.all())
+            return counts
+
+    def assert_counts_exact():
+        # The incrementally maintained counts match a fresh GROUP BY
+        with budget("GET /api/dashboard/aggregates"):
+            response = client.get("/api/dashboard/aggregates")
+        assert response.status_code == 200
+        for field, expected in client.portal.call(recount).items():
+            assert {k: n for k, n in response.json()[field].items() if n} == expected, field
+
+    assert_counts_exact()
+    garment = make_garment()
+    variation = client.get(f"/api/garments/{garment['id']}").json()["variations"][0]
+    assert_counts_exact()
+
+    base = f"/api/garments/{garment['id']}"
+    supplier = f"{base}/suppliers/{suppliers['Fabric Co Ltd']}"
+    client.post(f"{base}/transition", json={"target_stage": "DESIGN"})
+    client.post(f"{supplier}/transition", json={"target_status": "SAMPLING"})
+    sample = client.post(f"{supplier}/samples", json={}).json()
+    client.put(f"{supplier}/samples/{sample['id']}", json={"status": "RECEIVED"})
+    client.post(f"{base}/variations", json={"name": "Another Variant"})
+    client.post(
+        "/api/garments/bulk/transition",
+        json={"garment_ids": [garment["id"], variation["id"]], "target_stage": "DESIGN"},
+    )
+    assert_counts_exact()
+
+    # Takes its supplier offers and their sample sets with it
+    assert client.delete(base).status_code == 204
+    assert_counts_exact()
+
+
+def test_opposite_stage_moves_concurrently(client, make_garment):
+    from app.database import async_session
+    from app.services import garment_service
+
+    # Pairs moving between DESIGN and DEVELOPMENT in opposite directions, and
+    # parents with their variations, all at once: none may deadlock
+    garments = [make_garment(with_supplier=False) for _ in range(10)]
+    ids = [g["id"] for g in garments]
+    ids += [client.get(f"/api/garments/{i}").json()["variations"][0]["id"] for i in ids]
+    for i in ids:
+        client.post(f"/api/garments/{i}/transition", json={"target_stage": "DESIGN"})
+    for i in ids[::2]:
+        client.post(f"/api/garments/{i}/transition", json={"target_stage": "DEVELOPMENT"})
+    before = client.get("/api/dashboard/aggregates").json()["garments_by_stage"]
+
+    async def move(garment_id: int, target_stage: str):
+        async with async_session() as db:
+            await garment_service.transition_garment(db, garment_id, target_stage)
+
+    async def move_all():
+        for _ in range(3):
+            await asyncio.gather(
+                *(move(i, "DESIGN") for i in ids[::2]),
+                *(move(i, "DEVELOPMENT") for i in ids[1::2]),
+            )
+            ids.reverse()
+
+    client.portal.call(move_all)
+    after = client.get("/api/dashboard/aggregates").json()["garments_by_stage"]
+    # Three rounds of swaps: each garment ends in the stage it did not start in
+    assert (after["DESIGN"], after["DEVELOPMENT"]) == (before["DESIGN"], before["DEVELOPMENT"])
+
+
+def test_transition_history(client, budget, make_garment):
+    def stage_stats():
+        with budget("GET /api/dashboard/time-in-stage"):
+            response = client.get("/api/dashboard/time-in-stage", params={"entity": "garment"})
+        assert response.status_code == 200
+        return {s["state"]: s for s in response.json()["stages"]}
+
+    def this_week():
+        with budget("GET /api/dashboard/throughput"):
+            response = client.get("/api/dashboard/throughput", params={"entity": "garment"})
+        assert response.status_code == 200
+        weeks = response.json()["weeks"]
+        return {s["state"]: s for s in weeks[-1]["stages"]} if weeks else {}
+
+    before, throughput_before = stage_stats(), this_week()
+    garment = make_garment(with_supplier=False)
+    for stage in ("DESIGN", "DEVELOPMENT"):
+        client.post(f"/api/garments/{garment['id']}/transition", json={"target_stage": stage})
+    # Rejected transitions leave no history
+    client.post(f"/api/garments/{garment['id']}/transition", json={"target_stage": "PRODUCTION"})
+
+    after, throughput = stage_stats(), this_week()
+    concept = after["CONCEPT"]
+    assert concept["count"] == before.get("CONCEPT", {"count": 0})["count"] + 1
+    # Just created: well under an hour in CONCEPT
+    assert concept["buckets"][0]["max_seconds"] == 3600
+    assert concept["buckets"][0]["count"] >= 1
+    assert concept["p50_seconds"] is not None
+    design = throughput["DESIGN"]
+    design_before = throughput_before.get("DESIGN", {"entered": 0, "exited": 0})
+    assert (design["entered"], design["exited"]) == (
+        design_before["entered"] + 1,
+        design_before["exited"] + 1,
+    )
+    response = client.get("/api/dashboard/throughput", params={"since": "2000-01-01", "until": "2000-12-31"})
+    assert response.json()["weeks"] == []
+
+
+def test_history_partition_on_demand(client):
+    from datetime import datetime
+
+    from sqlalchemy import delete, text
+
+    from app.database import async_session
+    from app.models import TransitionHistory, TransitionRollup
+    from app.services import history_service
+
+    # Past the months created at startup, as a long-running process gets to
+    moment = datetime(2099, 3, 14)
+
+    async def record():
+        async with async_session() as db:
+            await history_service.record(
+                db,
+                history_service.GARMENT,
+                [
+                    {
+                        "garment_id": 0,
+                        "from_state": "CONCEPT",
+                        "to_state": "DESIGN",
+                        "entered_at": moment,
+                        "transitioned_at": moment,
+                    }
+                ],
+            )
+            await db.commit()
+            result = await db.execute(
+                text("SELECT tableoid::regclass::text FROM transition_history WHERE garment_id = 0")
+            )
+            partition = result.scalar_one()
+            # Keeps the year-2099 week out of the other tests' throughput
+            await db.execute(delete(TransitionHistory).where(TransitionHistory.garment_id == 0))
+            await db.execute(delete(TransitionRollup).where(TransitionRollup.week >= moment.date()))
+            await db.commit()
+            return partition
+
+    assert client.portal.call(record) == "transition_history_2099_03"
+    assert datetime(2100, 3, 1).date() in history_service._partitioned
+
+
+def test_history_partition_failed_month(client, monkeypatch):
+    from datetime import datetime
+
+    from sqlalchemy import delete, insert
+
+    from app.database import async_session
+    from app.models import TransitionHistory
+    from app.services import history_service
+
+    # A month whose rows are already in the DEFAULT partition: its partition
+    # cannot be created, and later transitions keep landing in DEFAULT
+    moment = datetime(2097, 6, 10)
+    row = {
+        "entity": history_service.GARMENT,
+        "garment_id": 0,
+        "from_state": "CONCEPT",
+        "to_state": "DESIGN",
+        "entered_at": moment,
+        "transitioned_at": moment,
+    }
+    attempts = []
+    ensure_partitions = history_service.ensure_partitions
+
+    async def counted(conn, today=None):
+        attempts.append(today)
+        await ensure_partitions(conn, today)
+
+    monkeypatch.setattr(history_service, "ensure_partitions", counted)
+
+    async def run():
+        async with async_session() as db:
+            await db.execute(insert(TransitionHistory).values(row))
+            await db.commit()
+            try:
+                for _ in range(3):
+                    await history_service.record(db, history_service.GARMENT, [dict(row)])
+            finally:
+                await db.rollback()
+                await db.execute(delete(TransitionHistory).where(TransitionHistory.garment_id == 0))
+                await db.commit()
+
+    client.portal.call(run)
+    # Tried once, not on every transition
+    assert attempts == [moment.date().replace(day=1)]
+    assert moment.date().replace(day=1) in history_service._failed
+    assert moment.date().replace(day=1) not in history_service._partitioned
+
+
+# --- Jobs ---
+
+
+def test_job_queue(client, budget, make_garment, tmp_path, monkeypatch):
+    from app import worker
+    from app.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "job_files_dir", str(tmp_path))
+    garment_ids = [make_garment(with_supplier=False)["id"] for _ in range(2)]
+    with budget("POST /api/jobs"):
+        response = client.post(
+            "/api/jobs",
+            json={"kind": "transition_garments", "garment_ids": garment_ids, "target_stage": "DESIGN"},
+        )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "QUEUED"
+
+    # On the app's event loop, which the engine's connections are bound to
+    assert client.portal.call(worker.run_once, "test-worker")
+    assert not client.portal.call(worker.run_once, "test-worker")
+    with budget("GET /api/jobs/{job_id}"):
+        job = client.get(f"/api/jobs/{job['id']}").json()
+    assert job["status"] == "SUCCEEDED"
+    assert job["progress"] == job["total"] == 2
+    assert job["result"]["transitioned"] == 2
+
+    # A missing import file is not retried
+    job = client.post(
+        "/api/jobs", json={"kind": "import_garments", "file": "missing.csv", "format": "csv"}
+    ).json()
+    assert client.portal.call(worker.run_once, "test-worker")
+    job = client.get(f"/api/jobs/{job['id']}").json()
+    assert (job["status"], job["attempts"]) == ("FAILED", 1)
+    assert "missing.csv" in job["error"]
+
+    job = client.post("/api/jobs", json={"kind": "export_garments"}).json()
+    with budget("POST /api/jobs/{job_id}/cancel"):
+        response = client.post(f"/api/jobs/{job['id']}/cancel")
+    assert response.json()["status"] == "CANCELLED"
+    assert not client.portal.call(worker.run_once, "test-worker")
+    with budget("POST /api/jobs/{job_id}/cancel"):
+        response = client.post(f"/api/jobs/{job['id']}/cancel")
+    assert response.status_code == 409
+    assert client.get("/api/jobs/999999").status_code == 404
+    response = client.post(
+        "/api/jobs", json={"kind": "import_garments", "file": "../secrets.csv", "format": "csv"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.fixture
+def job_queue(client):
+    # Runs job service calls on the app's event loop, each in its own
+    # session, as a worker would. Jobs other tests left live are cancelled
+    # first, so the workers below claim only the jobs made here.
+    from sqlalchemy import update
+
+    from app.database import async_session
+    from app.models import Job
+
+    def call(service, *args, **kwargs):
+        async def run():
+            async with async_session() as db:
+                return await service(db, *args, **kwargs)
+
+        return client.portal.call(run)
+
+    async def cancel_live(db):
+        await db.execute(
+            update(Job).where(Job.status.in_(["QUEUED", "RUNNING"])).values(status="CANCELLED")
+        )
+        await db.commit()
+
+    call(cancel_live)
+    return call
+
+
+async def _set_job(db, job_id: int, **values) -> None:
+    from sqlalchemy import update
+
+    from app.models import Job
+
+    await db.execute(update(Job).where(Job.id == job_id).values(**values))
+    await db.commit()
+
+
+def _transition_job(client, make_garment, **options) -> dict:
+    garment = make_garment(with_supplier=False)
+    return client.post(
+        "/api/jobs",
+        json={
+            "kind": "transition_garments",
+            "garment_ids": [garment["id"]],
+            "target_stage": "DESIGN",
+            **options,
+        },
+    ).json()
+
+
+def _stale() -> dict:
+    # Well past the lease: the worker holding the job is taken for dead
+    from datetime import datetime, timedelta
+
+    return {"heartbeat_at": datetime.utcnow() - timedelta(minutes=10)}
+
+
+def test_job_lease_expiry(client, job_queue, make_garment):
+    from app import worker
+    from app.services import job_service
+
+    job = _transition_job(client, make_garment)
+    # worker-a claims the job, then stops heartbeating
+    claimed = job_queue(job_service.claim, "worker-a")
+    assert claimed.id == job["id"]
+    assert not client.portal.call(worker.run_once, "worker-b")
+
+    job_queue(_set_job, job["id"], **_stale())
+    assert client.portal.call(worker.run_once, "worker-b")
+    job = client.get(f"/api/jobs/{job['id']}").json()
+    assert (job["status"], job["attempts"]) == ("SUCCEEDED", 2)
+
+    # worker-a comes back: its lease is gone, so it stops at its first
+    # heartbeat and writes nothing
+    with pytest.raises(job_service.JobLost):
+        job_queue(job_service.heartbeat, job["id"], "worker-a")
+    client.portal.call(worker.run_job, claimed, "worker-a")
+    assert client.get(f"/api/jobs/{job['id']}").json() == job
+
+
+def test_job_lost_on_last_attempt(client, job_queue, make_garment):
+    from app import worker
+    from app.services import job_service
+
+    job = _transition_job(client, make_garment, max_attempts=1)
+    job_queue(job_service.claim, "worker-a")
+    job_queue(_set_job, job["id"], **_stale())
+
+    # Reclaimed past max_attempts: failed without running again
+    assert client.portal.call(worker.run_once, "worker-b")
+    job = client.get(f"/api/jobs/{job['id']}").json()
+    assert (job["status"], job["attempts"]) == ("FAILED", 2)
+    assert job["error"] == "Worker lost during the last attempt"
+    assert job["result"] is None
+
+
+def test_job_retry_backoff(client, job_queue, tmp_path, monkeypatch):
+    from datetime import datetime, timedelta
+
+    from app import worker
+    from app.config import get_settings
+
+    # A file where the export directory should be: an unexpected error,
+    # which is retried
+    blocker = tmp_path / "job_files"
+    blocker.write_text("")
+    monkeypatch.setattr(get_settings(), "job_files_dir", str(blocker))
+    job = client.post("/api/jobs", json={"kind": "export_garments", "max_attempts": 2}).json()
+
+    assert client.portal.call(worker.run_once, "worker-a")
+    job = client.get(f"/api/jobs/{job['id']}").json()
+    assert (job["status"], job["attempts"]) == ("QUEUED", 1)
+    assert job["error"].startswith("FileExistsError")
+    # Backs off at least half the base delay
+    backoff = get_settings().job_retry_base_seconds / 2
+    started_at = datetime.fromisoformat(job["started_at"])
+    assert datetime.fromisoformat(job["run_after"]) >= started_at + timedelta(seconds=backoff)
+    assert not client.portal.call(worker.run_once, "worker-b")
+
+    job_queue(_set_job, job["id"], run_after=datetime.utcnow() - timedelta(seconds=1))
+    assert client.portal.call(worker.run_once, "worker-b")
+    job = client.get(f"/api/jobs/{job['id']}").json()
+    assert (job["status"], job["attempts"]) == ("FAILED", 2)
+    assert job["finished_at"] is not None
+
+
+def test_cancel_running_job(client, job_queue, make_garment):
+    from app import worker
+    from app.services import job_service
+
+    job = _transition_job(client, make_garment)
+    garment_id = job["payload"]["garment_ids"][0]
+    claimed = job_queue(job_service.claim, "worker-a")
+
+    # Flagged only: the worker stops at its next heartbeat
+    response = client.post(f"/api/jobs/{job['id']}/cancel")
+    assert (response.json()["status"], response.json()["cancel_requested"]) == ("RUNNING", True)
+    with pytest.raises(job_service.JobCancelled):
+        job_queue(job_service.heartbeat, job["id"], "worker-a")
+
+    client.portal.call(worker.run_job, claimed, "worker-a")
+    job = client.get(f"/api/jobs/{job['id']}").json()
+    assert job["status"] == "CANCELLED"
+    assert job["finished_at"] is not None
+    assert client.get(f"/api/garments/{garment_id}").json()["lifecycle_stage"] == "CONCEPT"
+
+
+# --- Change feed ---
+
+
+def test_change_feed(client, budget, make_garment):
+    import json
+
+    from app.routers import events
+
+    async def next_frame(frames):
+        async with asyncio.timeout(5):
+            return await anext(frames)
+
+    garment = make_garment(with_supplier=False)
+    other = make_garment(with_supplier=False)
+    # Called on the app's event loop: the test client buffers whole responses,
+    # so it cannot read an endless stream
+    with budget("GET /api/events"):
+        response = client.portal.call(events.change_events, garment["id"])
+    frames = response.body_iterator
+    assert client.portal.call(next_frame, frames) == "retry: 3000\n\n"
+
+    # Only this garment's committed changes, in commit order
+    client.post(f"/api/garments/{other['id']}/transition", json={"target_stage": "DESIGN"})
+    assert client.post(
+        f"/api/garments/{garment['id']}/transition", json={"target_stage": "PRODUCTION"}
+    ).status_code == 409
+    client.put(f"/api/garments/{garment['id']}", json={"name": "Renamed"})
+    client.post(
+        f"/api/garments/{garment['id']}/transition",
+        json={"target_stage": "DESIGN"},
+        headers={"X-Client-Id": "tab-1"},
+    )
+
+    changes = [json.loads(client.portal.call(next_frame, frames)[6:]) for _ in range(2)]
+    assert [c["type"] for c in changes] == ["garment.updated", "garment.transitioned"]
+    assert changes[0]["garment"]["name"] == "Renamed"
+    assert changes[1]["garment_id"] == garment["id"]
+    assert (changes[1]["previous_stage"], changes[1]["lifecycle_stage"]) == ("CONCEPT", "DESIGN")
+    # The client that made a change can tell it apart
+    assert ("origin" not in changes[0], changes[1]["origin"]) == (True, "tab-1")
+    client.portal.call(frames.aclose)
@@ -4,6 +4,7 @@ import { Toaster } from "react-hot-toast";
 import { Layout } from "./components/layout/Layout";
 import { Dashboard } from "./pages/Dashboard";
 import { GarmentDetail } from "./pages/GarmentDetail";
+import { useChangeFeed } from "./hooks/useChangeFeed";
 
 const queryClient = new QueryClient({
   defaultOptions: {
@@ -14,9 +15,15 @@ const queryClient = new QueryClient({
   },
 });
 
+function ChangeFeed() {
+  useChangeFeed();
+  return null;
+}
+
 export default function App() {
   return (
     <QueryClientProvider client={queryClient}>
+      <ChangeFeed />
       <BrowserRouter>
         <Routes>
           <Route element={<Layout />}>
@@ -0,0 +1,73 @@
+import { useEffect } from "react";
+import { useQueryClient } from "@tanstack/react-query";
+import { CLIENT_ID } from "../lib/api";
+import { patchGarment, refetchListsFor, removeGarment } from "../lib/garmentCache";
+import type { ChangeEvent, GarmentDetail } from "../types";
+
+// Keeps cached garments current with changes made by other users, from the
+// server's change feed. Each event touches only the garment's detail and the
+// lists it is (or now belongs) in; this tab's own changes are skipped, since
+// its mutations already updated the cache. Nothing is replayed across
+// reconnects, so the queries on screen are refetched when the stream reopens.
+export function useChangeFeed() {
+  const qc = useQueryClient();
+
+  useEffect(() => {
+    const source = new EventSource("/api/events");
+    let connected = false;
+
+    source.onopen = () => {
+      // Only on a reconnect: what the first connection would have delivered
+      // was fetched after it opened. Inactive queries are only marked stale.
+      if (connected) {
+        qc.invalidateQueries({ queryKey: ["garments"] });
+        qc.invalidateQueries({ queryKey: ["dashboard"] });
+      }
+      connected = true;
+    };
+
+    source.onmessage = (message) => {
+      const event: ChangeEvent = JSON.parse(message.data);
+      if (event.origin === CLIENT_ID) return;
+      const id = event.garment_id;
+      if (id === undefined || event.truncated) {
+        qc.invalidateQueries({ queryKey: ["garments"] });
+        qc.invalidateQueries({ queryKey: ["dashboard"] });
+        return;
+      }
+      switch (event.type) {
+        case "garment.created":
+          if (event.garment) {
+            refetchListsFor(qc, id, event.garment.lifecycle_stage);
+            if (event.garment.parent_garment_id !== null) {
+              qc.invalidateQueries({ queryKey: ["garments", event.garment.parent_garment_id], exact: true });
+            }
+          }
+          qc.invalidateQueries({ queryKey: ["dashboard"] });
+          break;
+        case "garment.deleted":
+          removeGarment(qc, id);
+          qc.invalidateQueries({ queryKey: ["dashboard"] });
+          break;
+        case "garment.updated":
+          if (event.garment) patchGarment(qc, id, event.garment);
+          break;
+        case "garment.transitioned":
+          if (event.lifecycle_stage) {
+            const { lifecycle_stage, updated_at } = event;
+            qc.setQueryData<GarmentDetail>(["garments", id], (old) =>
+              old && { ...old, lifecycle_stage, updated_at: updated_at ?? old.updated_at },
+            );
+            refetchListsFor(qc, id, lifecycle_stage);
+          }
+          qc.invalidateQueries({ queryKey: ["dashboard"] });
+          break;
+        default:
+          // Child collections (materials, attributes, suppliers) are refetched
+          qc.invalidateQueries({ queryKey: ["garments", id], exact: true });
+      }
+    };
+
+    return () => source.close();
+  }, [qc]);
+}
@@ -0,0 +1,11 @@
+import { useQuery } from "@tanstack/react-query";
+import * as api from "../lib/api";
+
+// Counts over the whole catalog, maintained by the server; the garment list
+// is paginated and cannot be counted client-side
+export function useDashboardAggregates() {
+  return useQuery({
+    queryKey: ["dashboard", "aggregates"],
+    queryFn: api.getDashboardAggregates,
+  });
+}
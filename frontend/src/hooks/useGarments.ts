@@ -1,11 +1,15 @@
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import * as api from "../lib/api";
+import { refetchListsFor, removeGarment } from "../lib/garmentCache";
 import type { GarmentCreateRequest, GarmentTransitionRequest, AddMaterialRequest, AddAttributeRequest, AssociateSupplierRequest, SupplierTransitionRequest } from "../types";
 
+// Keyset pages of the list, followed with fetchNextPage
 export function useGarments(stage?: string) {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ["garments", { stage }],
-    queryFn: () => api.getGarments(stage),
+    queryFn: ({ pageParam }) => api.getGarments(stage, undefined, pageParam),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.nextCursor ?? undefined,
   });
 }
 
@@ -20,7 +24,10 @@ export function useCreateGarment() {
   const qc = useQueryClient();
   return useMutation({
     mutationFn: (data: GarmentCreateRequest) => api.createGarment(data),
-    onSuccess: () => qc.invalidateQueries({ queryKey: ["garments"] }),
+    onSuccess: (garment) => {
+      refetchListsFor(qc, garment.id, garment.lifecycle_stage);
+      qc.invalidateQueries({ queryKey: ["dashboard"] });
+    },
   });
 }
 
@@ -28,7 +35,10 @@ export function useDeleteGarment() {
   const qc = useQueryClient();
   return useMutation({
     mutationFn: (id: number) => api.deleteGarment(id),
-    onSuccess: () => qc.invalidateQueries({ queryKey: ["garments"] }),
+    onSuccess: (_, id) => {
+      removeGarment(qc, id);
+      qc.invalidateQueries({ queryKey: ["dashboard"] });
+    },
   });
 }
 
@@ -37,7 +47,11 @@ export function useTransitionGarment() {
   return useMutation({
     mutationFn: ({ id, data }: { id: number; data: GarmentTransitionRequest }) =>
       api.transitionGarment(id, data),
-    onSuccess: () => qc.invalidateQueries({ queryKey: ["garments"] }),
+    onSuccess: (garment, { id }) => {
+      qc.invalidateQueries({ queryKey: ["garments", id], exact: true });
+      refetchListsFor(qc, id, garment.lifecycle_stage);
+      qc.invalidateQueries({ queryKey: ["dashboard"] });
+    },
   });
 }
 
@@ -46,9 +60,10 @@ export function useCreateVariation() {
   return useMutation({
     mutationFn: ({ parentId, data }: { parentId: number; data: GarmentCreateRequest }) =>
       api.createVariation(parentId, data),
-    onSuccess: (_, { parentId }) => {
-      qc.invalidateQueries({ queryKey: ["garments"] });
-      qc.invalidateQueries({ queryKey: ["garments", parentId] });
+    onSuccess: (variation, { parentId }) => {
+      refetchListsFor(qc, variation.id, variation.lifecycle_stage);
+      qc.invalidateQueries({ queryKey: ["garments", parentId], exact: true });
+      qc.invalidateQueries({ queryKey: ["dashboard"] });
     },
   });
 }
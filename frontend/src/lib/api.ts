@@ -2,11 +2,17 @@ import type {
   Garment, GarmentDetail, GarmentCreateRequest, GarmentUpdateRequest,
   GarmentTransitionRequest, AddMaterialRequest, AddAttributeRequest,
   AssociateSupplierRequest, SupplierTransitionRequest, GarmentSupplierDetail,
-  Material, Attribute, Supplier, SampleSet,
+  Material, Attribute, Supplier, SampleSet, DashboardAggregates, Page,
 } from "../types";
 
 const API_BASE = "/api";
 
+// Identifies this tab to the server, which tags the change feed events caused
+// by its requests with it (see useChangeFeed)
+export const CLIENT_ID = Array.from(crypto.getRandomValues(new Uint8Array(8)), (b) =>
+  b.toString(16).padStart(2, "0"),
+).join("");
+
 class ApiError extends Error {
   code: string;
   constructor(code: string, detail: string) {
@@ -15,10 +21,11 @@ class ApiError extends Error {
   }
 }
 
-async function request<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+async function send(endpoint: string, options: RequestInit = {}): Promise<Response> {
   const response = await fetch(`${API_BASE}${endpoint}`, {
     headers: {
       "Content-Type": "application/json",
+      "X-Client-Id": CLIENT_ID,
       ...options.headers,
     },
     ...options,
@@ -28,18 +35,28 @@ async function request<T>(endpoint: string, options: RequestInit = {}): Promise<
     const body = await response.json().catch(() => ({ error: "UNKNOWN", detail: "An error occurred" }));
     throw new ApiError(body.error || "UNKNOWN", body.detail || "An error occurred");
   }
+  return response;
+}
 
+async function request<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+  const response = await send(endpoint, options);
   if (response.status === 204) return null as T;
   return response.json();
 }
 
+async function requestPage<T>(endpoint: string): Promise<Page<T>> {
+  const response = await send(endpoint);
+  return { items: await response.json(), nextCursor: response.headers.get("X-Next-Cursor") };
+}
+
 // Garments
-export const getGarments = (stage?: string, search?: string): Promise<Garment[]> => {
+export const getGarments = (stage?: string, search?: string, cursor?: string): Promise<Page<Garment>> => {
   const params = new URLSearchParams();
   if (stage) params.set("stage", stage);
   if (search) params.set("search", search);
+  if (cursor) params.set("cursor", cursor);
   const qs = params.toString();
-  return request(`/garments${qs ? `?${qs}` : ""}`);
+  return requestPage(`/garments${qs ? `?${qs}` : ""}`);
 };
 
 export const getGarment = (id: number): Promise<GarmentDetail> =>
@@ -98,6 +115,10 @@ export const getAttributes = (category?: string): Promise<Attribute[]> => {
   return request(`/attributes${qs}`);
 };
 
+// Dashboard
+export const getDashboardAggregates = (): Promise<DashboardAggregates> =>
+  request("/dashboard/aggregates");
+
 // Suppliers (reference data)
 export const getSuppliers = (): Promise<Supplier[]> =>
   request("/suppliers");
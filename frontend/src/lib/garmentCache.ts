@@ -0,0 +1,57 @@
+import type { InfiniteData, Query, QueryClient } from "@tanstack/react-query";
+import type { Garment, GarmentDetail, LifecycleStage, Page } from "../types";
+
+// Targeted updates of the cached garment queries, after this tab's mutations
+// and other users' changes from the change feed. ["garments", id] is a
+// detail and ["garments", { stage }] a paginated list (useGarments); a change
+// touches only the queries that show the garment, or whose filter it now
+// matches, rather than every list and search page.
+
+type GarmentList = InfiniteData<Page<Garment>>;
+
+function isList(query: Query): boolean {
+  const [root, filter] = query.queryKey;
+  return root === "garments" && typeof filter === "object" && filter !== null;
+}
+
+function shows(query: Query, id: number): boolean {
+  const list = query.state.data as GarmentList | undefined;
+  return !!list?.pages.some((page) => page.items.some((g) => g.id === id));
+}
+
+function admits(query: Query, stage: LifecycleStage): boolean {
+  const { stage: filter } = query.queryKey[1] as { stage?: string };
+  return !filter || filter === stage;
+}
+
+function hasVariation(query: Query, id: number): boolean {
+  const detail = query.state.data as GarmentDetail | undefined;
+  return !isList(query) && !!detail?.variations?.some((v) => v.id === id);
+}
+
+function mapLists(qc: QueryClient, id: number, update: (items: Garment[]) => Garment[]) {
+  qc.setQueriesData<GarmentList>({ predicate: (query) => isList(query) && shows(query, id) }, (old) =>
+    old && { ...old, pages: old.pages.map((page) => ({ ...page, items: update(page.items) })) },
+  );
+}
+
+// Field changes (name, description): patched in place, no refetch
+export function patchGarment(qc: QueryClient, id: number, fields: Partial<Garment>) {
+  qc.setQueryData<GarmentDetail>(["garments", id], (old) => old && { ...old, ...fields });
+  mapLists(qc, id, (items) => items.map((g) => (g.id === id ? { ...g, ...fields } : g)));
+}
+
+// A new garment, or one in a new stage: refetches the lists showing it and
+// those it may now appear in, and the details listing it as a variation
+export function refetchListsFor(qc: QueryClient, id: number, stage: LifecycleStage) {
+  qc.invalidateQueries({
+    predicate: (query) =>
+      isList(query) ? shows(query, id) || admits(query, stage) : hasVariation(query, id),
+  });
+}
+
+export function removeGarment(qc: QueryClient, id: number) {
+  qc.removeQueries({ queryKey: ["garments", id], exact: true });
+  mapLists(qc, id, (items) => items.filter((g) => g.id !== id));
+  qc.invalidateQueries({ predicate: (query) => hasVariation(query, id) });
+}
@@ -2,6 +2,7 @@ import { useState } from "react";
 import { Link } from "react-router-dom";
 import toast from "react-hot-toast";
 import { useGarments, useCreateGarment, useDeleteGarment } from "../hooks/useGarments";
+import { useDashboardAggregates } from "../hooks/useDashboard";
 import { LIFECYCLE_STAGES } from "../types";
 import type { LifecycleStage } from "../types";
 import { Badge } from "../components/ui/Badge";
@@ -14,7 +15,14 @@ export function Dashboard() {
   const [newName, setNewName] = useState("");
   const [newDesc, setNewDesc] = useState("");
 
-  const { data: garments, isLoading, error } = useGarments(stageFilter || undefined);
+  const { data, isLoading, error, hasNextPage, fetchNextPage, isFetchingNextPage } = useGarments(
+    stageFilter || undefined,
+  );
+  const garments = data?.pages.flatMap((page) => page.items);
+  // Counts come from the server: the list holds only the pages loaded so far
+  const { data: aggregates } = useDashboardAggregates();
+  const stageCounts = aggregates?.garments_by_stage;
+  const total = stageCounts && Object.values(stageCounts).reduce((sum, count) => sum + (count ?? 0), 0);
   const createMutation = useCreateGarment();
   const deleteMutation = useDeleteGarment();
 
@@ -66,6 +74,7 @@ export function Dashboard() {
           }`}
         >
           All
+          {total !== undefined && <span className="ml-1 opacity-75">{total}</span>}
         </button>
         {LIFECYCLE_STAGES.map((stage) => (
           <button
@@ -76,6 +85,7 @@ export function Dashboard() {
             }`}
           >
             {stage}
+            {stageCounts && <span className="ml-1 opacity-75">{stageCounts[stage] ?? 0}</span>}
           </button>
         ))}
       </div>
@@ -109,6 +119,17 @@ export function Dashboard() {
           ))}
         </div>
       )}
+      {hasNextPage && (
+        <div className="flex justify-center mt-6">
+          <button
+            onClick={() => fetchNextPage()}
+            disabled={isFetchingNextPage}
+            className="px-4 py-2 text-sm font-medium text-indigo-600 hover:text-indigo-800 disabled:opacity-50"
+          >
+            {isFetchingNextPage ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
 
       {/* Create modal */}
       <Modal isOpen={showCreate} onClose={() => setShowCreate(false)} title="Create Garment">
@@ -90,6 +90,36 @@ export interface SampleSet {
   updated_at: string;
 }
 
+// Matches backend/app/schemas/dashboard.py
+export interface DashboardAggregates {
+  garments_by_stage: Partial<Record<LifecycleStage, number>>;
+  suppliers_by_status: Partial<Record<SupplierStatus, number>>;
+  samples_by_status: Record<string, number>;
+}
+
+// One keyset page of a list endpoint; nextCursor comes from the X-Next-Cursor
+// header and is null on the last page
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+// One event from GET /api/events (backend/app/services/change_feed.py).
+// Events for many garments at once ("garments.changed") carry no garment_id;
+// truncated events carry ids only and the garment must be refetched. origin is
+// the X-Client-Id of the tab whose request made the change.
+export interface ChangeEvent {
+  type: string;
+  garment_id?: number;
+  garment?: Garment;
+  lifecycle_stage?: LifecycleStage;
+  previous_stage?: LifecycleStage;
+  updated_at?: string;
+  parent_garment_id?: number | null;
+  origin?: string;
+  truncated?: boolean;
+}
+
 // Request types
 export interface GarmentCreateRequest {
   name: string;